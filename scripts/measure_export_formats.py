@@ -0,0 +1,118 @@
+"""Compare the export formats on a full-universe export: size, write time, read time.
+
+The downloads were CSV only. `export_archive.FORMATS` adds Parquet (zstd) and Arrow
+IPC, which keep dtypes. This writes every instrument's detailed frame in each format
+and reports, summed over the universe: write time, bytes on disk, bytes once zipped the
+way the archive stores that format, and read time back into pandas. It also reports
+whether the report date and a float column came back with their dtypes.
+
+By default the frames are synthetic, shaped like the detailed frames (weekly rows since
+1986, a date, a few labels and a couple of hundred float columns), so no store is
+needed. With --store the real frames come from the indexer.
+
+On the synthetic universe (42 frames, 89k rows, 203 columns), CSV wrote in 6.2 s, took
+130 MB, or 52 MB deflated, and read back in 0.9 s with the dates as strings. Parquet
+wrote in 1.9 s, took 82 MB and read back in 0.6 s. Arrow wrote in 0.3 s, took 149 MB, or
+53 MB deflated, and read back in 0.1 s. Random two-place floats are close to the worst
+case for Parquet's encodings, so real frames should come out smaller than this.
+
+Usage (from the repo root):
+
+    PYTHONPATH=src .venv/bin/python scripts/measure_export_formats.py
+    PYTHONPATH=src .venv/bin/python scripts/measure_export_formats.py --store
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import export_archive
+
+SEED = 20260101
+INSTRUMENTS = 42
+FLOAT_COLUMNS = 200
+
+
+def synthetic_frames(instruments, rng):
+    index = pd.date_range("1986-01-07", end="2026-10-13", freq="W-TUE")
+    for i in range(instruments):
+        # Half positions (whole contracts, as floats since a gap is NaN), half indexes
+        # and z-scores to two places, which is what the detailed columns are.
+        half = FLOAT_COLUMNS // 2
+        positions = (rng.normal(0, 2000, (len(index), half)).cumsum(axis=0)).round()
+        scores = rng.uniform(0, 100, (len(index), FLOAT_COLUMNS - half)).round(2)
+        df = pd.DataFrame(np.hstack([positions, scores]),
+                          columns=[f"col {k}" for k in range(FLOAT_COLUMNS)])
+        df.insert(0, "Report Date", index)
+        df.insert(1, "Symbol", f"S{i}")
+        df.insert(2, "Name", f"Instrument {i}")
+        yield f"S{i}", df
+
+
+def store_frames():
+    from cotmetrics.indexer import get_indexer
+
+    indexer = get_indexer()
+    for code, stem in export_archive._instruments(indexer):
+        yield stem, indexer.collect_symbol_detailed_results(code)
+
+
+def read(path, fmt):
+    if fmt == "csv":
+        return pd.read_csv(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_pandas()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--store", action="store_true", help="use the indexer's frames")
+    ap.add_argument("--instruments", type=int, default=INSTRUMENTS)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    frames = list(store_frames() if args.store else
+                  synthetic_frames(args.instruments, np.random.default_rng(args.seed)))
+    date_col = frames[0][1].columns[0]
+    float_col = next(c for c in frames[0][1].columns if frames[0][1][c].dtype.kind == "f")
+    rows = sum(len(df) for _, df in frames)
+    print(f"{len(frames)} frames, {rows:,} rows, {frames[0][1].shape[1]} columns")
+    print(f"{'format':<10} {'write s':>8} {'bytes':>14} {'zipped':>14} {'read s':>8} "
+          f"{'date dtype':>16} {'float dtype':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, (ext, _, compression) in export_archive.FORMATS.items():
+            paths = [Path(tmp, f"{stem}{ext}") for stem, _ in frames]
+            start = time.perf_counter()
+            for path, (_, df) in zip(paths, frames):
+                export_archive.write_frame(df, path, fmt)
+            write_s = time.perf_counter() - start
+
+            archive = Path(tmp, f"{fmt}.zip")
+            with zipfile.ZipFile(archive, "w", compression) as zf:
+                for path in paths:
+                    zf.write(path, arcname=path.name)
+
+            start = time.perf_counter()
+            back = [read(path, fmt) for path in paths]
+            read_s = time.perf_counter() - start
+
+            size = sum(p.stat().st_size for p in paths)
+            print(f"{fmt:<10} {write_s:>8.2f} {size:>14,} {archive.stat().st_size:>14,} "
+                  f"{read_s:>8.2f} {str(back[0][date_col].dtype):>16} "
+                  f"{str(back[0][float_col].dtype):>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+"""Measure what a stacked figure costs to encode, send and parse, per date encoding.
+
+Plotly already packs numeric y-values as base64 typed arrays (`bdata`). What it cannot
+pack is a date: every point of every trace went out as a 19-character ISO string, and
+per-point bar colours as colour strings. `plot_traces.dated_x` sends an evenly spaced
+index as `x0` and `dx`, and `plot_traces.coded_marker` sends bar colours as an int8
+index into a colourscale. This compares, on one synthetic figure shaped like the Asset
+Graphs page with a whole asset class selected:
+
+  strings   dates and bar colours as strings, which is what the builders used to send
+  epoch     dates as float64 epoch-milliseconds typed arrays, the literal typed-array
+            encoding, for comparison: half the raw bytes of strings, but base64 of
+            distinct doubles barely compresses, so it is bigger after gzip
+  x0/dx     what the builders send now
+
+For each: encode time (Dash's own to_json), raw bytes, gzip bytes at Flask-Compress's
+default level, and, when node is on the PATH, parse time: JSON.parse plus turning every
+array back into numbers, which is the work the browser does before Plotly draws. The
+browser's own date parsing is slower than Date.parse, so the string row understates it.
+
+Synthetic and store-free. Usage (from the repo root):
+
+    PYTHONPATH=src .venv/bin/python scripts/measure_figure_encoding.py --markets 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash._utils import to_json
+
+from components import plot_traces
+from components.plot_layout import get_make_subplots_for_plots
+
+SEED = 20260101
+LINES, BARS = 4, 3
+REPEATS = 5
+
+# JSON.parse, then every array back into numbers: base64 typed arrays decoded, date
+# strings parsed, x0/dx expanded. Prints the median over REPEATS, in ms.
+NODE_PARSE = r"""
+const fs = require('fs');
+const text = fs.readFileSync(process.argv[2], 'utf8');
+const T = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array,
+           i1: Int8Array, u4: Uint32Array, u2: Uint16Array, u1: Uint8Array};
+function numbers(v) {
+    if (v && v.bdata) { const b = Buffer.from(v.bdata, 'base64');
+        return new T[v.dtype](b.buffer, b.byteOffset, b.length / T[v.dtype].BYTES_PER_ELEMENT); }
+    if (Array.isArray(v)) { return v.map(s => typeof s === 'string' ? Date.parse(s) : s); }
+    return v;
+}
+const times = [];
+for (let r = 0; r < REPEATS; r++) {
+    const t0 = process.hrtime.bigint();
+    const fig = JSON.parse(text);
+    for (const tr of fig.data) {
+        const y = numbers(tr.y);
+        let x = numbers(tr.x);
+        if (!x && tr.x0 !== undefined) { const s = Date.parse(tr.x0);
+            x = new Float64Array(y.length); for (let i = 0; i < y.length; i++) x[i] = s + i * tr.dx; }
+        if (tr.marker) numbers(tr.marker.color);
+    }
+    times.push(Number(process.hrtime.bigint() - t0) / 1e6);
+}
+times.sort((a, b) => a - b);
+console.log(times[Math.floor(times.length / 2)].toFixed(1));
+""".replace("REPEATS", str(REPEATS))
+
+
+def build(index, markets, rng):
+    fig = get_make_subplots_for_plots(markets, 1, None, [[{"secondary_y": True}]] * markets)
+    for r in range(1, markets + 1):
+        frame = pd.DataFrame(index=index)
+        for i in range(LINES):
+            frame[f"l{i}"] = rng.normal(0, 1, len(index)).cumsum().round(4)
+            plot_traces.add_trace_to_all(fig, frame, f"l{i}", r, 1, f"l{i}", "#abcdef", i)
+        for i in range(BARS):
+            frame[f"b{i}"] = (rng.normal(0, 1, len(index)).cumsum() * 1000).round()
+            plot_traces.add_trace_to_all(fig, frame, f"b{i}", r, 1, f"b{i}", "#abcdef", i,
+                                         is_bar=True)
+        codes = rng.integers(0, 5, len(index))
+        fig.add_trace(go.Bar(
+            **plot_traces.dated_x(index), y=rng.normal(0, 1, len(index)),
+            marker=plot_traces.coded_marker(codes, ["#22c55e", "#bbf7d0", "#ef4444",
+                                                    "#fecaca", "gray"])), row=r, col=1)
+    return fig
+
+
+def as_strings(fig):
+    """The figure as the builders used to send it."""
+    for trace in fig.data:
+        if trace.x is None and trace.x0 is not None:
+            trace.x, trace.x0, trace.dx = plot_traces.trace_dates(trace), None, None
+        colorscale = trace.marker.colorscale if trace.type == "bar" else None
+        if colorscale and trace.marker.color is not None:
+            stops = [c for _, c in colorscale]
+            trace.marker.update(color=[stops[k] for k in trace.marker.color],
+                                colorscale=None, cmin=None, cmax=None)
+    return fig
+
+
+def as_epoch(fig):
+    """Dates as float64 epoch milliseconds, which Plotly packs like any other number."""
+    for trace in as_strings(fig).data:
+        if trace.x is not None and np.asarray(trace.x).dtype.kind == "M":
+            trace.x = np.asarray(trace.x).astype("datetime64[ms]").astype(np.int64) * 1.0
+    fig.update_xaxes(type="date")
+    return fig
+
+
+def measure(fig, node):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        text = to_json(fig)
+    encode_ms = (time.perf_counter() - start) / REPEATS * 1000
+    raw = text.encode()
+    parse_ms = None
+    if node:
+        with tempfile.TemporaryDirectory() as tmp:
+            payload, script = Path(tmp, "figure.json"), Path(tmp, "parse.js")
+            payload.write_bytes(raw)
+            script.write_text(NODE_PARSE)
+            out = subprocess.run([node, str(script), str(payload)], capture_output=True,
+                                 text=True, check=True)
+            parse_ms = float(out.stdout.strip())
+    return encode_ms, len(raw), len(gzip.compress(raw, 6)), parse_ms
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--markets", type=int, default=12, help="one panel per market")
+    ap.add_argument("--years", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    index = pd.date_range(end="2026-10-13", periods=args.years * 52, freq="W-TUE")
+    node = shutil.which("node")
+
+    print(f"{args.markets} panels x {LINES} lines + {BARS + 1} bar series, "
+          f"{len(index)} weeks")
+    print(f"{'encoding':<10} {'encode ms':>10} {'raw bytes':>12} {'gzip bytes':>12} "
+          f"{'parse ms':>9}")
+    for label, variant in (("strings", as_strings), ("epoch", as_epoch),
+                           ("x0/dx", lambda f: f)):
+        fig = variant(build(index, args.markets, np.random.default_rng(args.seed)))
+        encode_ms, raw, zipped, parse_ms = measure(fig, node)
+        parse = f"{parse_ms:>9.1f}" if parse_ms is not None else f"{'n/a':>9}"
+        print(f"{label:<10} {encode_ms:>10.1f} {raw:>12,} {zipped:>12,} {parse}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""Measure a log viewer refresh, re-reading the whole log against an incremental tail.
+
+The Admin page's viewer used to read the main log from its first byte every refresh to
+keep the last LINES lines; it now polls a `log_tail.LogTail`, which reads the new bytes
+only, and the page sends the tab the new lines rather than the whole tail. This writes
+a synthetic log of the size the rotating handler allows, then reports, as the median of
+REPEATS, a whole-file read against the tail's first poll (the end of the file, read
+backwards) and a poll after a few lines were appended, with the bytes each one read.
+
+At 10 MB the whole-file read was 6 ms for each tab each tick; the first poll reads one
+64 KB block in 0.14 ms, and a poll after five new lines reads those 415 bytes, in 0.01 ms.
+
+Synthetic and store-free. Usage (from the repo root):
+
+    PYTHONPATH=src .venv/bin/python scripts/measure_log_tail.py --megabytes 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+
+import log_tail
+
+LINES = 100
+REPEATS = 5
+LINE = "2026-10-18 12:00:00,000 - cot_logger - INFO - refreshed release cache {} in 0.12s\n"
+
+
+def whole_file(path):
+    """The old read."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return "".join(deque(f, LINES))
+
+
+def median(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--megabytes", type=float, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cot.log")
+        with open(path, "w") as f:
+            i = 0
+            while f.tell() < args.megabytes * 1e6:
+                f.write(LINE.format(i))
+                i += 1
+
+        def first_poll():
+            tail = log_tail.LogTail(path, LINES)
+            tail.poll()
+            return tail
+
+        tail = first_poll()
+        first_bytes = tail.bytes_read
+
+        def append_and_poll():
+            with open(path, "a") as f:
+                f.writelines(LINE.format("new") for _ in range(5))
+            before = tail.bytes_read
+            start = time.perf_counter()
+            tail.poll()
+            return time.perf_counter() - start, tail.bytes_read - before
+
+        appended = [append_and_poll() for _ in range(REPEATS)]
+
+        print(f"{os.path.getsize(path) / 1e6:.1f} MB log, last {LINES} lines, "
+              f"median of {REPEATS}")
+        print(f"{'read':<26} {'ms':>8} {'bytes':>12}")
+        print(f"{'whole file':<26} {median(lambda: whole_file(path)):>8.2f} "
+              f"{os.path.getsize(path):>12}")
+        print(f"{'tail, first poll':<26} {median(first_poll):>8.2f} {first_bytes:>12}")
+        print(f"{'tail, 5 lines appended':<26} "
+              f"{np.median([t for t, _ in appended]) * 1000:>8.2f} "
+              f"{int(np.median([b for _, b in appended])):>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Measure the options panels' history work, the per-date loop against the summary.
+
+Both options panels used to read the symbol's whole history parquet on every render and
+walk its dates, filtering the frame to each one; they now read `options_history.load`,
+which reads the file once per version and summarises every day in one pass. This writes
+a synthetic history of DAYS daily 200-point curves, then reports, as the median of
+REPEATS, the old read-and-loop against a cold load (read, sort, summarise) and a warm
+one (the file unchanged, so a stat and a cache hit).
+
+At two years of days (500 curves, 100k rows) the old loop took 2.2 s per panel per
+render, most of it the string comparison filtering each date; a cold load is 15 ms and
+a warm one 0.01 ms.
+
+Synthetic and store-free. Usage (from the repo root):
+
+    PYTHONPATH=src .venv/bin/python scripts/measure_options_history.py --days 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import options_history
+
+SEED = 20260101
+REPEATS = 5
+POINTS = 200
+
+
+def history(days, rng):
+    dates = pd.bdate_range(end="2026-10-16", periods=days).strftime("%Y-%m-%d")
+    strikes = np.linspace(80, 120, POINTS)
+    return pd.DataFrame({
+        "Date": np.repeat(dates, POINTS),
+        "Expiry": pd.Timestamp("2026-11-20"),
+        "UnderlyingPrice": np.repeat(100 + rng.normal(0, 5, days), POINTS),
+        "SimulatedStrike": np.tile(strikes, days),
+        "IntrinsicValue_M": (np.tile(strikes, days) - 100) ** 2 + rng.random(days * POINTS),
+        "MaxPainStrike": 100.0,
+        "ETF_Proxy": "SPY",
+    })
+
+
+def old_loop(path):
+    """The old historical panel's read and per-date pass."""
+    df = pd.read_parquet(path)
+    out = []
+    for date in sorted(df["Date"].unique()):
+        daily = df[df["Date"] == date].sort_values("SimulatedStrike")
+        underlying = daily["UnderlyingPrice"].iloc[0]
+        i = daily["IntrinsicValue_M"].idxmin()
+        strike = daily.loc[i, "SimulatedStrike"]
+        current = np.interp(underlying, daily["SimulatedStrike"], daily["IntrinsicValue_M"])
+        out.append((strike, current - daily.loc[i, "IntrinsicValue_M"]))
+    return out
+
+
+def median(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ES_options_history.parquet")
+        history(args.days, np.random.default_rng(args.seed)).to_parquet(path)
+
+        def cold():
+            options_history._histories.clear()
+            return options_history.load(path)
+
+        cold()
+        print(f"{args.days} days x {POINTS} points, median of {REPEATS}")
+        print(f"{'read':<26} {'ms':>8}")
+        for label, fn in (("per-date loop", lambda: old_loop(path)),
+                          ("summary, cold", cold),
+                          ("summary, warm", lambda: options_history.load(path))):
+            print(f"{label:<26} {median(fn):>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
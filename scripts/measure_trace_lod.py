@@ -0,0 +1,83 @@
+"""Measure what thinning old history saves on a stacked page's response.
+
+OI Alignment sends every panel with its whole history, and opens on the last few years.
+`plot_traces.decimate_traces` keeps the opening window (plus a margin) at full
+resolution and thins what is older to each bucket's extremes. This reports, for a
+synthetic stack shaped like a long-history market, the bytes of the panels as sent
+before and after, raw and gzipped, and the bytes of the one-off Patch that sends the
+full history when a zoom reaches back for it.
+
+Synthetic and store-free: the series are seeded random walks on a weekly index, drawn
+with add_trace_to_all exactly as the panels draw them. Only line series are thinned, so
+a real stack, with bars and markers among its traces, saves somewhat less.
+
+Usage (from the repo root):
+
+    PYTHONPATH=src .venv/bin/python scripts/measure_trace_lod.py --years 45 --panels 9
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+
+from components import panel_stack, plot_traces
+from components.plot_layout import get_make_subplots_for_plots
+
+SEED = 20260101
+SERIES_PER_PANEL = 5
+OPENING_WEEKS = 156
+
+
+def synthetic_panel(index, rng):
+    fig = get_make_subplots_for_plots(1, 1, None, [[{"secondary_y": True}]])
+    frame = pd.DataFrame({f"s{i}": rng.normal(0, 1, len(index)).cumsum()
+                          for i in range(SERIES_PER_PANEL)}, index=index)
+    for i, col in enumerate(frame.columns):
+        plot_traces.add_trace_to_all(fig, frame, col, 1, 1, col, "#abcdef", i,
+                                     secondary=(i == SERIES_PER_PANEL - 1))
+    return fig
+
+
+def sizes(payload):
+    raw = payload.encode()
+    return len(raw), len(gzip.compress(raw))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--years", type=int, default=45)
+    ap.add_argument("--panels", type=int, default=9)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    index = pd.date_range(end="2026-10-13", periods=args.years * 52, freq="W-TUE")
+    lod_from = index[max(0, len(index) - OPENING_WEEKS - plot_traces.LOD_MARGIN_WEEKS)]
+
+    full, thinned, restore = [], [], []
+    for _ in range(args.panels):
+        fig = synthetic_panel(index, rng)
+        full.append(panel_stack.to_fragment(fig))
+        swapped = plot_traces.decimate_traces(fig, lod_from)
+        thinned.append(panel_stack.to_fragment(fig))
+        traces = json.loads(full[-1])["data"]
+        restore.append(json.dumps([{"x": traces[k].get("x"), "y": traces[k]["y"]}
+                                   for k in swapped]))
+
+    print(f"{args.panels} panels x {SERIES_PER_PANEL} lines, {len(index)} weeks, "
+          f"full resolution from {lod_from.date()}")
+    print(f"{'payload':<22} {'raw bytes':>12} {'gzip bytes':>12}")
+    for label, parts in (("stack, full history", full), ("stack, thinned", thinned),
+                         ("restore patch", restore)):
+        raw, zipped = sizes("[" + ",".join(parts) + "]")
+        print(f"{label:<22} {raw:>12,} {zipped:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,19 @@
+import io
+
 import cotmetrics.models as models
 import cotmetrics.utils as utils
 import dash
 import dash_bootstrap_components as dbc
-import requests
 from cotmetrics.database import cotDatabase
-from cotmetrics.indexer import get_indexer
 from dash import Dash, Input, Output, State, dcc, html, no_update
-from flask import request
+from flask import abort, request, send_file
 from flask_compress import Compress
 
+import components.plot_colors as plot_colors
+import export_archive
+import release_cache
+import visit_log
+import viz_config
 import viz_constants as vc
 
 utils.launch_logger.warning("Launch app_cot")
@@ -46,34 +51,38 @@ def record_visit():
         '/favicon.ico'
     ]
 
-    # Ignore internal Dash updates and assets to keep logs clean
+    # Ignore internal Dash updates and assets to keep logs clean. What is left is put on
+    # visit_log's queue and nothing more: the geolocation lookup and the SQLite write
+    # happen on its writer thread, so neither can hold up the page.
     if not any(request.path.startswith(path) for path in ignored_paths):
         ip_addr = request.headers.get('X-Forwarded-For', request.remote_addr)
+        visit_log.record(ip_addr, request.path, request.headers.get('User-Agent'))
 
-        # Default values
-        city, country = "Internal", "Local"
-
-        # Skip lookup for localhost/internal IPs
-        if ip_addr not in ['127.0.0.1', 'localhost']:
-            try:
-                # Use ip-api.com (Limit: 45 requests per minute)
-                response = requests.get(f"http://ip-api.com/json/{ip_addr}", timeout=0.5).json()
-                if response.get('status') == 'success':
-                    city = response.get('city')
-                    country = response.get('country')
-            except Exception:
-                city, country = "Lookup", "Error"
-
-        cotDatabase.log_visit(
-            ip_addr,
-            request.path,
-            request.headers.get('User-Agent'),
-            city,
-            country
-        )
 
-        msg = f"IP: {ip_addr} | Path: {request.path}"
-        utils.cot_logger.info(msg)
+@app.server.route('/download/<kind>.zip')
+def download_archive(kind):
+    # The Options page's data downloads. A plain route rather than a dcc.Download
+    # callback so the archive streams from disk instead of travelling as base64 in a
+    # callback response. export_archive writes it once per COT release, and its sha256
+    # is the ETag, so a browser that already has this week's archive gets a 304.
+    fmt = request.args.get('format', 'csv')
+    if kind not in export_archive.ARCHIVES or fmt not in export_archive.FORMATS:
+        abort(404)
+    download_name = export_archive.download_name(kind, fmt)
+    try:
+        path, digest = export_archive.artifact(export_archive.archive_name(kind, fmt),
+                                               build=False)
+        return send_file(path, mimetype='application/zip', as_attachment=True,
+                         download_name=download_name, etag=digest, max_age=0)
+    except (KeyError, FileNotFoundError):
+        # No export of this week yet, or, in a worker that is not the refresher, its
+        # export already pruned by the refresher's newer one. Exporting is minutes of
+        # work, so it is started in the background and this reader gets the ZIP built
+        # in memory, as the callbacks always made it.
+        export_archive.start_export()
+        return send_file(io.BytesIO(export_archive.archive_bytes(kind, fmt=fmt)),
+                         mimetype='application/zip', as_attachment=True,
+                         download_name=download_name, max_age=0)
 
 
 navbar = dbc.Navbar(
@@ -171,6 +180,12 @@ app.layout = html.Div(
                 # now, and a value restored from sessionStorage would be a claim about
                 # a previous one.
                 dcc.Store(id='cot_release_store'),
+                # Every palette's colours, and the tints the traces derive from them,
+                # for recolor_figure in assets/clientside.js. Static: palettes are
+                # configuration, so this is built once when the app starts.
+                dcc.Store(id='palette_swatch_store', data=plot_colors.swatch_table(
+                    {name: viz_config.get_palette(name) for name in viz_config.get_palette_names()},
+                    viz_config.get_palette(None))),
                 dcc.Location(id='url', refresh=False),
                 navbar,
                 dash.page_container
@@ -237,7 +252,7 @@ def update_graphs_date(n, current_text, current_release):
     replacing a real date with "unavailable" on a tab that was showing one would make
     the badge flicker on exactly the day it matters most.
     """
-    get_indexer().refresh_if_stale()
+    release_cache.refresh_if_stale()
 
     release = cotDatabase.latest_update_timestamp()
     if release is None:
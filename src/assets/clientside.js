@@ -11,6 +11,30 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
             }
             return window.dash_clientside.no_update;
         },
+        /**
+         * The Admin log viewer's text after one update from the server.
+         *
+         * The server sends the lines the viewer has not had yet (update_log_diff in
+         * admin.py). Most ticks they go on the end of what is shown, and the front is
+         * trimmed so the viewer keeps its last `keep` lines. When the server's tail
+         * started over (the log rotated, or this tab is new) `whole` is set and the
+         * lines replace the text instead.
+         */
+        apply_log_diff: function(diff, current) {
+            if (!diff) {
+                return window.dash_clientside.no_update;
+            }
+            var added = diff.lines.join('');
+            if (diff.whole || typeof current !== 'string') {
+                return added;
+            }
+            // Every line ends in a newline, so the split has one empty piece at the end.
+            var lines = (current + added).split('\n');
+            if (lines.length - 1 > diff.keep) {
+                lines = lines.slice(lines.length - 1 - diff.keep);
+            }
+            return lines.join('\n');
+        },
         export_heatmap_csv: function(n_clicks) {
             if (n_clicks) {
                 dash_ag_grid.getApiAsync("heatmap-matrix-grid").then(function(grid) {
@@ -329,6 +353,18 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
                 }
             }
 
+            // An evenly spaced series sends its dates as a start and a step rather
+            // than one by one (see dated_x in components/plot_traces.py).
+            function xValues(trace, n) {
+                var xs = asArray(trace.x);
+                if (xs || trace.x0 === undefined || !trace.dx) { return xs; }
+                var t0 = new Date(trace.x0).getTime();
+                if (isNaN(t0)) { return null; }
+                var out = new Float64Array(n);
+                for (var i = 0; i < n; i++) { out[i] = t0 + i * trace.dx; }
+                return out;
+            }
+
             var layout = figure.layout;
             var key;
             var update = {};
@@ -392,15 +428,15 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
 
             var ranges = {};
             (figure.data || []).forEach(function(trace) {
-                var xs = asArray(trace.x);
-                if (!xs || !xs.length) { return; }
-
                 // Candlesticks carry their extremes on high/low rather than y.
                 var isCandle = trace.type === 'candlestick';
                 var hi = asArray(isCandle ? trace.high : trace.y);
                 var lo = asArray(isCandle ? trace.low : trace.y);
                 if (!hi || !lo) { return; }
 
+                var xs = xValues(trace, hi.length);
+                if (!xs || !xs.length) { return; }
+
                 var lo_v = Infinity, hi_v = -Infinity, seen = false;
                 for (var i = 0; i < xs.length; i++) {
                     var t = new Date(xs[i]).getTime();
@@ -438,7 +474,8 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
                 try { Plotly.relayout(gd, update); } catch (e) { return noUpdate; }
             }
 
-            // The rightmost visible date, for the panel below the chart.
+            // The visible window: the right edge for the panel below the chart, the
+            // left for the page to send history it thinned (see restore_full_detail).
             //
             // It travels on this store rather than the server reading relayoutData
             // itself, because the Plotly.relayout above fires a *second* relayoutData
@@ -446,7 +483,97 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
             // to relayoutData is superseded by that second event and its answer is
             // dropped before it reaches the DOM. Only a real x-zoom writes here, so
             // nothing supersedes it.
-            return {xEnd: String(xEnd), stamp: Date.now()};
+            return {xStart: String(xStart), xEnd: String(xEnd), stamp: Date.now()};
+        },
+        /**
+         * Repaint a chart in another palette without asking the server for it.
+         *
+         * The server tags every figure with the palette it was drawn in: one list of
+         * swatches per palette slot (base colour, the %OI overlay tint, the category
+         * sibling, the divergence fill), under layout.meta.palette_swatches. The table
+         * holds the same lists for every configured palette. Slot for slot and swatch for
+         * swatch, that is a string-to-string map, and a recolour is a walk over the
+         * traces replacing any colour the map knows.
+         *
+         * Only trace colours are touched, plus the title. Layout text, gridlines and
+         * shapes are drawn in fixed colours, and two palettes put their open interest
+         * slot on exactly the app's text colours, so walking the layout would repaint
+         * the axes. The Analysis title is the one palette-coloured piece of layout: its
+         * verdict colour sits in an inline style inside the title text.
+         *
+         * Returns a new figure, leaving the one Dash passed in alone, and no_update
+         * when nothing would change. That includes every call made by the figure's own
+         * arrival in the palette it was drawn in, which is nearly all of them. A real
+         * recolour does reset any zoom, since a figure handed back carries its stored
+         * ranges; palettes are picked on the Options page, so in practice the chart
+         * being recoloured is one that has just been drawn.
+         */
+        recolor_figure: function(paletteName, figure, table) {
+            var noUpdate = window.dash_clientside.no_update;
+            var meta = figure && figure.layout && figure.layout.meta;
+            var from = meta && meta.palette_swatches;
+            if (!from || !table || !table.palettes) { return noUpdate; }
+            var to = table.palettes[paletteName] || table['default'];
+            if (!to) { return noUpdate; }
+
+            var map = {};
+            var changed = false;
+            for (var s = 0; s < from.length && s < to.length; s++) {
+                for (var w = 0; w < from[s].length && w < to[s].length; w++) {
+                    // First claim wins: a palette that repeats a colour across slots
+                    // cannot say which role a trace in that colour was playing.
+                    if (from[s][w] in map) { continue; }
+                    map[from[s][w]] = to[s][w];
+                    if (from[s][w] !== to[s][w]) { changed = true; }
+                }
+            }
+            if (!changed) { return noUpdate; }
+
+            function swap(value) {
+                if (typeof value === 'string') {
+                    var hit = map[value.toLowerCase()];
+                    return hit === undefined ? value : hit;
+                }
+                // Per-point colour arrays. A numeric array is a colorscale input, and a
+                // packed {dtype, bdata} one is never a colour.
+                if (Array.isArray(value) && value.length && typeof value[0] === 'string') {
+                    return value.map(swap);
+                }
+                return value;
+            }
+            // Copies only the objects on the way to a colour. Data arrays are shared,
+            // not cloned: a multi-panel stack is megabytes of them.
+            function recolor(node) {
+                var out = {};
+                for (var key in node) {
+                    var v = node[key];
+                    if (/color$/i.test(key)) {
+                        out[key] = swap(v);
+                    } else if (v && typeof v === 'object' && !Array.isArray(v) && !('bdata' in v)) {
+                        out[key] = recolor(v);
+                    } else {
+                        out[key] = v;
+                    }
+                }
+                return out;
+            }
+
+            var layout = Object.assign({}, figure.layout, {
+                meta: Object.assign({}, meta, {palette_swatches: to})
+            });
+            var title = layout.title;
+            if (title && typeof title === 'object') {
+                title = recolor(title);
+                if (typeof title.text === 'string') {
+                    title.text = title.text.replace(/color:\s*(#[0-9a-fA-F]{6})/g,
+                        function(match, hex) { return 'color:' + swap(hex); });
+                }
+                layout.title = title;
+            }
+            return Object.assign({}, figure, {
+                data: (figure.data || []).map(recolor),
+                layout: layout
+            });
         }
     }
 });
@@ -0,0 +1,94 @@
+"""
+board_snapshot.py
+
+Every market's latest reading for one (lookback, model), swept once per release and
+shared by everything on the Home page.
+
+The page read the board twice over. The strips and the accordion titles came from
+`cotmetrics.movers.get_board`, which walks every instrument's frame; the accordion
+bodies came from `signal_cards.build_asset_class_cards`, which fetched each class's
+frames again and ran the tape synthesis once per card. Expanding all nine classes on a
+cold cache re-read all 42 frames a second time and synthesised every market twice when
+a bias filter was on, and each read is the indexer's 2.9 MB frame.
+
+A `BoardSnapshot` is the one sweep. It fetches every frame (concurrently, through
+frame_fetch), takes from each what the page draws, and lets go of the frame:
+
+  rows      the board rows, in get_board's shape and order, without any filter;
+  bias      each market's tape bias, which both the filter chips and the cards read;
+  last_row  each market's last row as a one-row frame, which is all a card draws.
+
+The rows are get_board's own, unfiltered, which runs no synthesis and reads the frames
+the fetch has just cached, so they cannot drift from what get_board would say. A filter
+is applied to the snapshot (`board_rows`) with the bias taken in the sweep, rather than
+by asking get_board again, which would synthesise every market a second time.
+
+Kept per release in a ReleaseCache, so a new week empties it with everything else.
+"""
+from dataclasses import dataclass, field
+
+import cotmetrics.models as models
+
+import frame_fetch
+import release_cache
+
+_snapshots = release_cache.ReleaseCache("board snapshots", maxsize=12)
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    """One sweep of every market, for `lookback` under `model`."""
+    lookback: str
+    model_key: str
+    rows: list = field(default_factory=list)
+    bias: dict = field(default_factory=dict)
+    last_row: dict = field(default_factory=dict)
+
+    def board_rows(self, filter_types=None):
+        """get_board's rows, for `filter_types`: copies, so a caller may annotate them."""
+        from cotmetrics.movers import _wanted_biases
+
+        wanted = _wanted_biases(filter_types)
+        return [dict(r) for r in self.rows if wanted is None or self.bias[r["asset"]] in wanted]
+
+
+def build(lookback, model, indexer=None):
+    """Sweep every market into a BoardSnapshot. Uncached: see `snapshot`.
+
+    The rows are get_board's, which reads the process's indexer: `indexer` has to be
+    that one, as it is unless a test passes its own.
+    """
+    from cotmetrics.movers import get_board
+    from cotmetrics.synthesis import generate_exhaustive_tape_synthesis
+
+    if indexer is None:
+        from cotmetrics.indexer import get_indexer
+        indexer = get_indexer()
+    model = model if isinstance(model, models.PositioningModel) else models.resolve(model)
+
+    markets = [(ac, asset) for ac in indexer.get_asset_classes()
+               for asset in indexer.get_assets_for_asset_class(ac)]
+    frames = frame_fetch.fetch_frames_for([asset for _, asset in markets], lookback,
+                                          model.basis, indexer=indexer)
+    bias, last_row = {}, {}
+    for ac, asset in markets:
+        df = frames[asset]
+        if df is None or df.empty:
+            continue
+        symbol = indexer.get_instrument_symbol_from_name(asset)
+        # The synthesis reads the frame for the price trend, so it runs here, once,
+        # rather than once for the filter and again on the card.
+        bias[asset] = generate_exhaustive_tape_synthesis(
+            df.iloc[-1], symbol_str=symbol, df=df).get("tape_bias", "neutral")
+        last_row[asset] = df.iloc[[-1]]
+    # Unfiltered, so it runs no synthesis of its own, and over frames the fetch above
+    # has just put in the indexer's cache.
+    rows = get_board(lookback=lookback, model=model)
+    return BoardSnapshot(lookback, model.key, rows, bias, last_row)
+
+
+def snapshot(lookback, model):
+    """This release's BoardSnapshot for `lookback` under `model`, swept on first use."""
+    model = model if isinstance(model, models.PositioningModel) else models.resolve(model)
+    key = (release_cache.current_db_time(), lookback, model.key)
+    return _snapshots.get(key, lambda: build(lookback, model))
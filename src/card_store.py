@@ -0,0 +1,148 @@
+"""
+card_store.py
+
+The Home page's rendered card trees, kept on disk so they outlive the process.
+
+`home._cards_cache` holds each accordion body as a component tree in memory, and that is
+where a reader's expand is served from. But memory is per process: every restart, and
+every gunicorn worker, starts with it empty, so the first readers after a deploy on a
+release Friday each paid for a full sweep and render in whichever worker they landed
+on, and `_prewarm_cache` did the same work again in every one of them.
+
+The trees are what Dash sends anyway, so they are kept here as that JSON, one file per
+key under STORE_DIR, and any process on the machine reads what any other wrote:
+
+    <release>/<sha1 of the key>.json
+
+A file is written under a temporary name and renamed into place, so a reader in another
+worker sees a whole tree or none. Two workers that miss the same key together both
+build it and the second rename wins, which is the same trade ReleaseCache makes.
+
+The release is the directory as well as part of the key: writing the first tree of a
+new week removes the older weeks' directories, never a newer one. Within a release the store is bounded by
+MAX_BYTES, oldest-used first; a hit touches its file's mtime, so "used" is by any
+process. A file that cannot be read is treated as a miss and written again.
+
+What `get` returns from disk is the JSON itself, dicts in the component shape
+(`{"type", "namespace", "props"}`), which the Dash renderer draws exactly as it draws
+the components they were serialized from.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import cotmetrics.constants as const
+import cotmetrics.utils as utils
+from plotly.io.json import to_json_plotly
+
+STORE_DIR = Path(const.CACHE_DIR) / "home_cards"
+
+# A class's cards run from a few KB (a filtered, empty class) to ~150 KB (a dozen cards),
+# so 64 MB holds every class under every lookback, model and palette a release sees many
+# times over. It is a bound against a long week of filter combinations, not a working set.
+MAX_BYTES = 64 * 1024 * 1024
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _release_tag(db_time):
+    return "".join(c for c in str(db_time) if c.isalnum()) or "unknown"
+
+
+def path_for(key, directory=None):
+    """Where the tree for `key` lives. The key leads with `db_time`, as a ReleaseCache's."""
+    name = hashlib.sha1(json.dumps(list(key), default=str).encode()).hexdigest()
+    return Path(directory or STORE_DIR) / _release_tag(key[0]) / f"{name}.json"
+
+
+def _read(path):
+    """The tree at `path`, or None when there is none or it is not whole JSON."""
+    try:
+        with open(path, "rb") as f:
+            tree = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        utils.cot_logger.warning(f"card store: {path.name} unreadable, rebuilding: {e}")
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        # Pruned by another process since it was read; the tree in hand is still whole.
+        pass
+    return tree
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    tmp.write_text(data)
+    tmp.replace(path)
+
+
+def _prune(release, max_bytes):
+    """Drop older releases' directories, then this one's least recently used trees.
+
+    Only older ones: a worker that has not yet adopted the new week still writes the
+    last week's trees, and must not take the new week's directory with it. The tags are
+    the release timestamps' digits, so they order as the releases do.
+    """
+    root = release.parent
+    for old in root.iterdir():
+        if old.is_dir() and old.name < release.name:
+            shutil.rmtree(old, ignore_errors=True)
+
+    files = []
+    for path in release.glob("*.json"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((st.st_mtime_ns, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def get(key, build, directory=None, max_bytes=None):
+    """The tree for `key` off disk, or `build()`'s, written to disk for the next process.
+
+    A build that cannot be serialized or written is still returned; the store is an
+    optimisation and the page should not fail over it.
+    """
+    path = path_for(key, directory)
+    tree = _read(path)
+    with _lock:
+        _stats["hits" if tree is not None else "misses"] += 1
+    if tree is not None:
+        return tree
+
+    value = build()
+    try:
+        _write(path, to_json_plotly(value))
+        with _lock:
+            _prune(path.parent, MAX_BYTES if max_bytes is None else max_bytes)
+    except (OSError, TypeError, ValueError) as e:
+        utils.cot_logger.error(f"card store: {path.name} not written: {e}")
+    return value
+
+
+def stats(directory=None):
+    """This process's hits and misses, and what is on disk, in ReleaseCache.stats' shape."""
+    files = list(Path(directory or STORE_DIR).glob("*/*.json"))
+    size = 0
+    for path in files:
+        try:
+            size += path.stat().st_size
+        except FileNotFoundError:
+            pass
+    with _lock:
+        return {"name": "home cards (disk)", "entries": len(files), "maxsize": None,
+                "bytes": size, "max_bytes": MAX_BYTES, **_stats}
@@ -24,9 +24,9 @@ import pandas as pd
 import plotly.graph_objects as go
 
 import viz_constants as vc
-from components.plot_colors import darken_hex, lighten_hex, relative_luminance
+from components.plot_colors import sibling_color
 from components.plot_layout import visible_weeks
-from components.plot_traces import add_legend_lines, add_trace_to_all
+from components.plot_traces import add_legend_lines, add_trace_to_all, coded_marker, dated_x
 
 # One drawable category: the cotmetrics spec (which knows the column names), plus the
 # presentation the palette resolved for it.
@@ -61,17 +61,6 @@ def category_series(report, selected_keys, palette, frame=None):
     return out
 
 
-def sibling_color(base):
-    """The second colour on a palette slot: lighter, or darker when already bright.
-
-    Direction is chosen by luminance rather than fixed, because a single direction
-    fails on the shipped palettes. See the note above CATEGORY_TINT_LIGHTEN.
-    """
-    if relative_luminance(base) > vc.CATEGORY_BRIGHT_LUMINANCE:
-        return darken_hex(base, vc.CATEGORY_TINT_DARKEN)
-    return lighten_hex(base, vc.CATEGORY_TINT_LIGHTEN)
-
-
 def _legend(fig, series, showlegend, palette, show_price, show_oi=False):
     if not showlegend:
         return fig
@@ -339,12 +328,12 @@ def get_category_momentum_columns(fig, df, series, lookback_header, row, col, pa
     for column in cols:
         values = df[column]
         fig.add_trace(go.Bar(
-            x=df.index,
+            **dated_x(df.index),
             y=values,
             name=column,
             showlegend=False,
-            marker_color=[vc.CATEGORY_DIVERGING_DOWN if (v is not None and v < 0)
-                          else vc.CATEGORY_DIVERGING_UP for v in values],
+            marker=coded_marker(values.lt(0),
+                                [vc.CATEGORY_DIVERGING_UP, vc.CATEGORY_DIVERGING_DOWN]),
             marker_line_width=0,
         ), row=row, col=col)
 
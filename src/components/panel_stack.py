@@ -0,0 +1,219 @@
+"""A stacked figure assembled from one-panel fragments, and the Patch between two stacks.
+
+A stacked page used to draw every panel into one make_subplots grid in a single pass,
+so adding a tenth panel to nine redrew all ten, and the response carried all ten again.
+Here each panel is drawn on its own, into a 1x1 figure, and kept as a JSON fragment.
+The stack is the fragments placed into a grid: traces, shapes and annotations have their
+axis references rewritten to the grid cell the panel lands in, and the panel's own axis
+settings (range, title, tick format) are carried onto that cell's axes. Nothing about the
+data is touched, so placing a cached fragment costs a dictionary walk, not a redraw.
+
+The same bookkeeping is what makes the stack patchable. Each panel's traces are one
+contiguous block in `figure["data"]`, in selection order, so going from one selection to
+another is deleting the blocks that left, inserting the blocks that arrived, and
+re-pointing the survivors at their new cells. `stack_patch` writes that as a Dash Patch,
+whose size follows the panels that changed rather than the panels on screen. The layout
+is still sent whole: the grid's domains all move when a row is added, and without trace
+arrays a layout is small.
+
+Fragments are drawn at (1, 1). A panel whose legend entries depended on being first in
+the stack now always makes them, and `assemble` shows each legend entry once however
+many panels supplied it, which is what the once-only rules were arranging by hand.
+"""
+import json
+
+from components.plot_shapes import commit_shapes, span_columns
+
+# Where an axis sits and what it is tied to belong to the grid, not to the panel drawn
+# into it. Everything else on a panel's axis (range, title, ticks) is the panel's.
+GRID_AXIS_KEYS = ("domain", "anchor", "overlaying", "matches")
+
+# A fragment is drawn into a 1x1 grid, so these are the only axes it can have: the
+# shared x, the primary y and, for panels with a price or OI overlay, the secondary y.
+_FRAGMENT_AXES = {"xaxis": "x", "yaxis": "y", "yaxis2": "y2"}
+
+# Layout keys a fragment carries that are not a panel setting to copy across.
+_NOT_COPIED = {"template", "shapes", "annotations"} | set(_FRAGMENT_AXES)
+
+
+def to_fragment(fig):
+    """A one-panel figure as a cacheable JSON string. The template is dropped: the
+    stack's layout supplies one, and it is most of the bytes of a small figure. Bands
+    the shaders queued are written first, since the fragment is the finished panel."""
+    out = json.loads(commit_shapes(fig).to_json())
+    out.get("layout", {}).pop("template", None)
+    return json.dumps(out)
+
+
+def _short(axis_name):
+    """'xaxis3' -> 'x3', the form traces and shapes refer to an axis by."""
+    return axis_name.replace("axis", "", 1)
+
+
+def _long(ref):
+    """'y5' -> 'yaxis5', the form the layout keys an axis by."""
+    return ref[0] + "axis" + ref[1:]
+
+
+def _remap(ref, refs):
+    """Rewrite one axis reference, keeping a ' domain' suffix and leaving 'paper' be."""
+    if not isinstance(ref, str):
+        return ref
+    head, sep, tail = ref.partition(" ")
+    return refs.get(head, head) + sep + tail
+
+
+def panel_refs(grid, row, col, secondary):
+    """`{'x': 'x3', 'y': 'y5', 'y2': 'y6'}`: a fragment's axes, as the grid cell's.
+
+    Read off the grid rather than computed, because make_subplots numbers y-axes in grid
+    order with the secondary axes interleaved: where a cell's y lands depends on how
+    many cells before it have a secondary.
+    """
+    sub = grid.get_subplot(row, col)
+    refs = {"x": _short(sub.xaxis.plotly_name), "y": _short(sub.yaxis.plotly_name)}
+    if secondary:
+        refs["y2"] = _short(grid.get_subplot(row, col, secondary_y=True).yaxis.plotly_name)
+    return refs
+
+
+def _is_legend_entry(trace):
+    # add_legend_lines and add_legend_markers draw a single None point so that an entry
+    # can exist without a series behind it.
+    return trace.get("x") == [None]
+
+
+class Stack:
+    """A grid with fragments placed into it.
+
+    `grid` is a layout-only go.Figure, so the page can still run its usual layout
+    helpers over it (x-window, height, title) before `figure` joins the pieces. Traces,
+    shapes and annotations stay plain dicts: validating a few hundred regime rects back
+    into graph objects would cost more than drawing them did.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.data = []
+        self.shapes = []
+        self.annotations = []
+        self.panels = []
+
+    def figure(self):
+        layout = json.loads(self.grid.to_json())["layout"]
+        layout["shapes"] = self.shapes
+        layout["annotations"] = list(layout.get("annotations", [])) + self.annotations
+        return {"data": self.data, "layout": layout}
+
+    def state(self, plots):
+        """What `stack_patch` needs to know about this stack once it is in the browser."""
+        return {"plots": list(plots), "panels": self.panels}
+
+
+def assemble(grid, fragments, num_cols):
+    """Place `fragments` (JSON strings, in selection order) into `grid`, row-major."""
+    stack = Stack(grid)
+    seen_entries = set()
+
+    for i, frag in enumerate(fragments):
+        frag = json.loads(frag)
+        row, col = divmod(i, num_cols)
+        layout = frag.get("layout", {})
+        refs = panel_refs(grid, row + 1, col + 1, "yaxis2" in layout)
+
+        for name, short in _FRAGMENT_AXES.items():
+            if name in layout and short in refs:
+                grid.layout[_long(refs[short])].update(
+                    {k: v for k, v in layout[name].items() if k not in GRID_AXIS_KEYS})
+        grid.update_layout({k: v for k, v in layout.items() if k not in _NOT_COPIED})
+
+        shown = []
+        traces = frag.get("data", [])
+        for k, trace in enumerate(traces):
+            trace["xaxis"] = refs.get(trace.get("xaxis", "x"), trace.get("xaxis"))
+            trace["yaxis"] = refs.get(trace.get("yaxis", "y"), trace.get("yaxis"))
+            if _is_legend_entry(trace) and trace.get("showlegend"):
+                entry = json.dumps({key: v for key, v in trace.items()
+                                    if key not in ("xaxis", "yaxis")}, sort_keys=True)
+                if entry in seen_entries:
+                    trace["showlegend"] = False
+                else:
+                    seen_entries.add(entry)
+                    shown.append(k)
+            stack.data.append(trace)
+
+        for kind, into in (("shapes", stack.shapes), ("annotations", stack.annotations)):
+            for item in layout.get(kind, []):
+                for key in ("xref", "yref"):
+                    if key in item:
+                        item[key] = _remap(item[key], refs)
+                into.append(item)
+
+        stack.panels.append({"traces": len(traces), "refs": refs, "shown": shown,
+                             "entries": [k for k, t in enumerate(traces)
+                                         if _is_legend_entry(t)]})
+
+    # Each panel shaded its own rows. A band every panel in a column shaded alike, a
+    # price regime under a stack of price panels say, is drawn once down the column.
+    stack.shapes = span_columns(stack.shapes, grid.layout)
+    return stack
+
+
+def stack_patch(old, new, figure):
+    """A Dash Patch that turns the figure drawn for `old` into `figure`, or None.
+
+    `old` and `new` are `Stack.state` dicts. None means the change is not one a patch
+    expresses and the caller should send the figure: the panels that stay have been
+    reordered, or a panel appears twice.
+    """
+    from dash import Patch
+
+    old_plots, new_plots = old["plots"], new["plots"]
+    if len(set(old_plots)) != len(old_plots) or len(set(new_plots)) != len(new_plots):
+        return None
+    if [p for p in old_plots if p in new_plots] != [p for p in new_plots if p in old_plots]:
+        return None
+
+    def starts(panels):
+        out, at = [], 0
+        for panel in panels:
+            out.append(at)
+            at += panel["traces"]
+        return out
+
+    old_starts, new_starts = starts(old["panels"]), starts(new["panels"])
+    patch = Patch()
+
+    # Deletions from the highest index down, so each one leaves the indices below it,
+    # including the ones still to be deleted, where they were.
+    for i in reversed(range(len(old_plots))):
+        if old_plots[i] not in new_plots:
+            first = old_starts[i]
+            for k in reversed(range(first, first + old["panels"][i]["traces"])):
+                del patch["data"][k]
+
+    # With the leavers gone the survivors are contiguous and in order, so inserting the
+    # arrivals in ascending final position puts every trace at its final index.
+    for j, plot in enumerate(new_plots):
+        if plot not in old_plots:
+            first = new_starts[j]
+            for k in range(first, first + new["panels"][j]["traces"]):
+                patch["data"].insert(k, figure["data"][k])
+
+    for j, plot in enumerate(new_plots):
+        if plot not in old_plots:
+            continue
+        before, after = old["panels"][old_plots.index(plot)], new["panels"][j]
+        first = new_starts[j]
+        if before["refs"] != after["refs"]:
+            for k in range(first, first + after["traces"]):
+                patch["data"][k]["xaxis"] = figure["data"][k]["xaxis"]
+                patch["data"][k]["yaxis"] = figure["data"][k]["yaxis"]
+        # The first panel to offer a legend entry shows it, so removing that panel hands
+        # the entry to the next one down.
+        for k in after["entries"]:
+            if (k in before["shown"]) != (k in after["shown"]):
+                patch["data"][first + k]["showlegend"] = k in after["shown"]
+
+    patch["layout"] = figure["layout"]
+    return patch
@@ -92,6 +92,17 @@ def hex_to_rgba(hex_color, alpha):
     return f"rgba({r}, {g}, {b}, {alpha})"
 
 
+def sibling_color(base):
+    """The second colour on a palette slot: lighter, or darker when already bright.
+
+    Direction is chosen by luminance rather than fixed, because a single direction
+    fails on the shipped palettes. See the note above CATEGORY_TINT_LIGHTEN.
+    """
+    if relative_luminance(base) > vc.CATEGORY_BRIGHT_LUMINANCE:
+        return darken_hex(base, vc.CATEGORY_TINT_DARKEN)
+    return lighten_hex(base, vc.CATEGORY_TINT_LIGHTEN)
+
+
 # ── palette -> the app's verdict colours ──────────────────────────────────────
 
 # Neutral dimmed colour for a cell, or a bar, with nothing to say.
@@ -123,3 +134,55 @@ def grid_colors(color_palette):
         bull_near=hex_to_rgba(bull, vc.INDEX_RAMP_ALPHA_APPROACH),
         bear_near=hex_to_rgba(bear, vc.INDEX_RAMP_ALPHA_APPROACH),
     )
+
+
+# ── palette -> the browser's recolouring table ────────────────────────────────
+#
+# A palette change used to re-run every chart callback on the page: every frame re-read,
+# every panel rebuilt, every regime rect recomputed and the whole figure shipped again,
+# to move five colours. `recolor_figure` in assets/clientside.js does it in the browser
+# instead, by swapping colour strings in the figure it already has.
+#
+# It needs to know which strings are palette colours. Matching on the five base colours
+# alone is not enough, because the traces also draw colours DERIVED from a slot (the
+# %OI overlay tint, the category siblings, the divergence fill), and those would be left
+# in the old palette. So the derivations are done here, once, by the same functions the
+# traces use, and the browser only ever compares strings. Two copies of the colour maths,
+# one in Python and one in JavaScript, would drift the first time a tint constant moved.
+#
+# Matching is on exact strings, not on RGB. The regime rects and the capitulation
+# markers are a fixed rgba(0, 255, 0, ...) whatever the palette, and the CMR palette's
+# bull slot is #00FF00: a match on channels would repaint those with the reader's bull.
+
+def slot_swatches(color_palette):
+    """`[[base, overlay tint, sibling, divergence fill], ...]`, one list per slot.
+
+    Position is the role: slot 0 is Commercials and bear, 3 is price and bull, 4 is
+    open interest. Everything is lower-cased, as Plotly echoes back whatever case it
+    was given and the browser compares strings.
+    """
+    return [[str(c).lower(),
+             lighten_hex(c, vc.BASIS_OVERLAY_TINT).lower(),
+             sibling_color(c).lower(),
+             hex_to_rgba(c, vc.BASIS_DIVERGENCE_ALPHA)]
+            for c in color_palette]
+
+
+def swatch_table(palettes, default_palette):
+    """What the browser maps through: `slot_swatches` for every configured palette.
+
+    `palettes` is `{name: colours}`. `default` is what an unknown or empty name
+    resolves to, the same fallback `viz_config.get_palette` applies server-side.
+    """
+    return {"palettes": {name: slot_swatches(p) for name, p in palettes.items()},
+            "default": slot_swatches(default_palette)}
+
+
+def tag_palette(fig, color_palette):
+    """Record on the figure which palette its colours came from.
+
+    The browser maps FROM these swatches, so a figure with no tag is never recoloured,
+    and one that has been is re-tagged with the palette it now shows.
+    """
+    fig.update_layout(meta={"palette_swatches": slot_swatches(color_palette)})
+    return fig
@@ -13,6 +13,7 @@ not have to drag the indexer in to get it.
     components.plot_colors    hex maths, no figure involved
     components.plot_layout    subplot grids, axis ranges, heights, the layout pass
     components.plot_traces    one function per panel, plus shared trace primitives
+    components.plot_shapes    shaded bands, queued per figure and committed once
     components.plot_options   the max-pain curve and its premium/discount history
 """
 
@@ -24,6 +25,7 @@ from components.plot_colors import (  # noqa: F401
     grid_colors,
     hex_to_rgba,
     lighten_hex,
+    tag_palette,
 )
 from components.plot_layout import (  # noqa: F401
     get_figure_height,
@@ -12,6 +12,7 @@ from dash import html
 from plotly.subplots import make_subplots
 
 import viz_constants as vc
+from components.plot_shapes import commit_shapes
 
 
 def get_nice_dtick(span, num_ticks=4):
@@ -218,10 +219,13 @@ def get_update_layout_for_plots(fig, num_rows, num_cols, main_title=None, hover_
             if getattr(trace, 'type', '') == 'candlestick':
                 is_price_trace = True
             elif getattr(trace, 'name', '') == 'Price':
-                # Ignore dummy legend traces which have x=[None]
+                # Ignore dummy legend traces which have x=[None]. A real series may
+                # carry its dates as x0/dx instead of x (see plot_traces.dated_x).
                 x_data = getattr(trace, 'x', None)
                 if x_data is not None and len(x_data) > 0 and x_data[0] is not None:
                     is_price_trace = True
+                elif x_data is None and getattr(trace, 'x0', None) is not None:
+                    is_price_trace = True
 
             if is_price_trace:
                 y_axis = getattr(trace, 'yaxis', None)
@@ -316,5 +320,7 @@ def get_update_layout_for_plots(fig, num_rows, num_cols, main_title=None, hover_
         )
 
     fig.update_layout(**layout_updates)
+    # The shaders queue their bands on the figure; this is the end of assembly.
+    commit_shapes(fig)
 
     return fig
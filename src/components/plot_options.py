@@ -3,55 +3,58 @@
 These sit apart from the COT panels because they are not COT metrics at all. They read
 the options cache, they are keyed by an asset name rather than a positioning frame, and
 their x-axis is a strike ladder rather than a date index.
+
+Both read the symbol's history through `options_history`, which reads the file once per
+version of it and summarises every day in one pass; neither filters it by date here. The
+premium/discount history needs only the summary, which the options scheduler writes out
+after each refresh, so it reads that and never the curves.
 """
 
 from cotmetrics.indexer import get_indexer
 
+import options_history
 import viz_constants as vc
 
 
-def get_max_pain_plot(fig, asset_name, row, col):
-    """
-    Plots the Notional Intrinsic Value curves of all options across different days.
-    Simulates the aesthetic of the "Maximum Pain" wash-out graph.
-    """
-    import numpy as np
-    import pandas as pd
-    import plotly.graph_objects as go
-
+def _options_history(fig, asset_name, row, col, read=options_history.for_symbol):
+    """The asset's OptionsHistory from `read`, or None (with a note on the panel if it
+    has none)."""
     instrument = get_indexer().get_instrument_from_name(asset_name)
     if not instrument:
-        return fig
+        return None
 
-    symbol = instrument.symbol
-    from pathlib import Path
-
-    import cotmetrics.constants as const
-
-    cache_dir = Path(const.CACHE_DIR) / "options"
-    history_file = cache_dir / f"{symbol}_options_history.parquet"
+    try:
+        history = read(instrument.symbol)
+    except Exception:
+        return None
 
-    if not history_file.exists():
+    if history is None:
         fig.add_annotation(
             text="No Options Data Available for this Asset.",
             xref="x domain", yref="y domain", x=0.5, y=0.5, showarrow=False,
             row=row, col=col
         )
-        return fig
+        return None
+    if history.summary.empty:
+        return None
+    return history
 
-    try:
-        df = pd.read_parquet(history_file)
-    except Exception:
-        return fig
 
-    if df.empty:
+def get_max_pain_plot(fig, asset_name, row, col):
+    """
+    Plots the Notional Intrinsic Value curves of all options across different days.
+    Simulates the aesthetic of the "Maximum Pain" wash-out graph.
+    """
+    import plotly.graph_objects as go
+
+    history = _options_history(fig, asset_name, row, col)
+    if history is None:
         return fig
 
     # We want to plot one curve per date
-    dates = sorted(df['Date'].unique())
     # To prevent visual clutter, only take the last 7 dates if there are many
-    if len(dates) > 7:
-        dates = dates[-7:]
+    days = history.summary.iloc[-7:]
+    dates = list(days["Date"])
 
     # Color scale from light blue to dark blue/purple to indicate aging
     import plotly.colors as pcolors
@@ -63,10 +66,9 @@ def get_max_pain_plot(fig, asset_name, row, col):
     last_max_pain_iv = 0
     last_current_iv = 0
 
-    for i, date in enumerate(dates):
-        daily_df = df[df['Date'] == date].sort_values('SimulatedStrike')
-        if daily_df.empty:
-            continue
+    for i, day in enumerate(days.itertuples(index=False)):
+        date = day.Date
+        daily_df = history.curves.iloc[day.start:day.stop]
 
         color = colors[i]
         is_last = (date == last_date)
@@ -84,10 +86,9 @@ def get_max_pain_plot(fig, asset_name, row, col):
             hovertemplate=f"Date: {date}<br>Strike: %{{x:,.2f}}<br>IV: $%{{y:,.1f}}M<extra></extra>"
         ), row=row, col=col)
 
-        # Find minimum
-        min_idx = daily_df['IntrinsicValue_M'].idxmin()
-        min_strike = daily_df.loc[min_idx, 'SimulatedStrike']
-        min_iv = daily_df.loc[min_idx, 'IntrinsicValue_M']
+        # The minimum, from the summary
+        min_strike = day.MaxPain
+        min_iv = day.MinIV
 
         # Highlight minimum
         fig.add_trace(go.Scatter(
@@ -102,12 +103,12 @@ def get_max_pain_plot(fig, asset_name, row, col):
         ), row=row, col=col)
 
         if is_last:
-            last_underlying = daily_df['UnderlyingPrice'].iloc[0]
+            last_underlying = day.UnderlyingPrice
             last_max_pain = min_strike
             last_max_pain_iv = min_iv
 
-            # Interpolate the IV at the exact underlying price
-            last_current_iv = np.interp(last_underlying, daily_df['SimulatedStrike'], daily_df['IntrinsicValue_M'])
+            # The IV at the exact underlying price, interpolated on the curve
+            last_current_iv = day.CurrentIV
 
     # Add vertical line for Current Underlying Price
     if last_underlying > 0:
@@ -145,75 +146,24 @@ def get_max_pain_historical_plot(fig, asset_name, row, col, showlegend=True):
     Plots the historical Price Premium/Discount to Max Pain and the Delta Intrinsic Value
     over time, simulating the Substack-style chart.
     """
-    import numpy as np
     import pandas as pd
     import plotly.graph_objects as go
 
-    instrument = get_indexer().get_instrument_from_name(asset_name)
-    if not instrument:
+    history = _options_history(fig, asset_name, row, col,
+                               read=options_history.summary_for_symbol)
+    if history is None:
         return fig
 
-    symbol = instrument.symbol
-    from pathlib import Path
-
-    import cotmetrics.constants as const
-
-    cache_dir = Path(const.CACHE_DIR) / "options"
-    history_file = cache_dir / f"{symbol}_options_history.parquet"
-
-    if not history_file.exists():
-        fig.add_annotation(
-            text="No Options Data Available for this Asset.",
-            xref="x domain", yref="y domain", x=0.5, y=0.5, showarrow=False,
-            row=row, col=col
-        )
-        return fig
-
-    try:
-        df = pd.read_parquet(history_file)
-    except Exception:
+    # Days without a usable underlying price have no premium to draw
+    summary = history.summary
+    days = summary[summary["UnderlyingPrice"].notna() & (summary["UnderlyingPrice"] != 0)]
+    if days.empty:
         return fig
 
-    if df.empty:
-        return fig
-
-    dates = []
-    premiums = []
-    delta_ivs = []
-
-    # Process each day
-    unique_dates = sorted(df['Date'].unique())
-    expiry_str = ""
-
-    for date in unique_dates:
-        daily_df = df[df['Date'] == date].sort_values('SimulatedStrike')
-        if daily_df.empty:
-            continue
-
-        underlying = daily_df['UnderlyingPrice'].iloc[0]
-        if pd.isna(underlying) or underlying == 0:
-            continue
-
-        expiry_str = str(daily_df['Expiry'].iloc[0])[:10]  # Grab just the date part
-
-        # Find max pain (min IV)
-        min_idx = daily_df['IntrinsicValue_M'].idxmin()
-        min_strike = daily_df.loc[min_idx, 'SimulatedStrike']
-        min_iv = daily_df.loc[min_idx, 'IntrinsicValue_M']
-
-        # Calculate premium/discount %
-        premium_pct = ((underlying - min_strike) / min_strike) * 100
-
-        # Calculate current IV at underlying price
-        current_iv = np.interp(underlying, daily_df['SimulatedStrike'], daily_df['IntrinsicValue_M'])
-        delta_iv = current_iv - min_iv
-
-        dates.append(pd.to_datetime(date))
-        premiums.append(premium_pct)
-        delta_ivs.append(delta_iv)
-
-    if not dates:
-        return fig
+    dates = list(pd.to_datetime(days["Date"]))
+    premiums = days["PremiumPct"].tolist()
+    delta_ivs = days["DeltaIV"].tolist()
+    expiry_str = str(days["Expiry"].iloc[-1])[:10]  # Grab just the date part
 
     # Calculate symmetric bounds for the secondary axis so the zero-lines naturally align
     # This prevents Plotly from auto-scaling and distorting the primary [-15, 15] range
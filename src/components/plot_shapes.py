@@ -0,0 +1,188 @@
+"""Background bands: collected per figure, merged, and written to the layout once.
+
+The regime, Spearman and setup shaders each shade runs of weeks with a translucent
+rect. They used to write those rects straight into `fig.layout.shapes`, one per run per
+subplot, resolving each subplot's axes by drawing a throwaway `add_vrect` and reading
+its refs back, and reassigning the whole shape list on every call. Plotly validates
+every shape again on each reassignment, so the cost grew with the square of the shapes
+already there, and a six-panel stack with regimes and setups sent the browser thousands
+of rects to lay out on every relayout.
+
+Now a figure carries a `ShapeLayer`, and the shaders add bands to it:
+
+  - a subplot's axis refs are read off the grid once, not resolved per call;
+  - bands of the same fill on the same subplot that overlap or touch become one rect;
+  - a band every row of a column carries, on a column whose x-axes are matched, becomes
+    one paper-height rect rather than one per row.
+
+The layer is written to the layout once, by `commit_shapes`, which the layout pass
+(`plot_layout.get_update_layout_for_plots`) and `panel_stack.to_fragment` both call, so
+a page that ends its figure with either gets its bands without asking. The column
+merge is also available on its own, as `span_columns`, for the OI Alignment stack,
+whose panels are drawn apart and only meet in `panel_stack.assemble`.
+"""
+
+import json
+
+# What every band is, beyond where it sits and what colour it is.
+BAND = dict(type="rect", y0=0, y1=1, layer="below", line_width=0)
+
+
+def coalesce(segments):
+    """`segments` as `(x0, x1)` pairs, sorted, with any that overlap or touch merged.
+
+    Only a shared edge or an overlap merges: two runs a week apart stay two bands, since
+    the week between them is exactly what the reader is meant to see.
+    """
+    merged = []
+    for x0, x1 in sorted(segments):
+        if merged and x0 <= merged[-1][1]:
+            if x1 > merged[-1][1]:
+                merged[-1][1] = x1
+        else:
+            merged.append([x0, x1])
+    return [tuple(seg) for seg in merged]
+
+
+def _short(axis_name):
+    """'yaxis5' -> 'y5'."""
+    return axis_name.replace("axis", "", 1)
+
+
+def _long(ref):
+    """'y5' -> 'yaxis5'."""
+    return ref[0] + "axis" + ref[1:]
+
+
+def _get(obj, key):
+    """`obj[key]` or None, for a plotly layout object and its JSON dict alike."""
+    try:
+        return obj[key]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _columns(layout):
+    """`{x_root: {y_ref: (lo, hi)}}`: the primary y-axes of each column, by its x-axis.
+
+    A column is the set of x-axes tied together by `matches`, which is what
+    make_subplots' shared_xaxes sets up; its rows are the y-axes anchored on them.
+    Secondary y-axes overlay a primary one and are not rows of their own.
+    """
+    columns = {}
+    for name in [k for k in layout if k.startswith("yaxis")]:
+        yaxis = layout[name]
+        if _get(yaxis, "overlaying") or not _get(yaxis, "domain"):
+            continue
+        anchor = _get(yaxis, "anchor") or "x"
+        root = _get(_get(layout, _long(anchor)), "matches") or anchor
+        lo, hi = _get(yaxis, "domain")
+        columns.setdefault(root, {})[_short(name)] = (lo, hi)
+    return columns
+
+
+def span_columns(shapes, layout):
+    """`shapes` with each band every row of a column carries drawn once, paper-high.
+
+    A band qualifies when it spans its subplot's full height (`yref` 'yN domain', 0 to
+    1) and a band identical but for its axes sits on every other row of the same
+    column. The merged band takes the column's root x-axis and runs from the bottom of
+    its lowest row to the top of its highest, gutters included. Anything else, and any
+    column of one row, is passed through as it was. Order is kept: a merged band takes
+    the place of the first of the bands it replaces.
+    """
+    columns = _columns(layout)
+    roots = {}
+    for root, rows in columns.items():
+        for y in rows:
+            roots[y] = root
+
+    def spot(shape):
+        yref = shape.get("yref")
+        if (not isinstance(yref, str) or not yref.endswith(" domain")
+                or shape.get("y0", 0) != 0 or shape.get("y1", 1) != 1):
+            return None
+        y = yref.split(" ", 1)[0]
+        root = roots.get(y)
+        if root is None or len(columns[root]) < 2:
+            return None
+        rest = {k: v for k, v in shape.items() if k not in ("xref", "yref")}
+        return (root, json.dumps(rest, sort_keys=True, default=str)), y
+
+    groups = {}
+    spots = []
+    for shape in shapes:
+        at = spot(shape)
+        spots.append(at)
+        if at is not None:
+            groups.setdefault(at[0], set()).add(at[1])
+
+    out, placed = [], set()
+    for shape, at in zip(shapes, spots):
+        if at is None or groups[at[0]] != set(columns[at[0][0]]):
+            out.append(shape)
+            continue
+        if at[0] in placed:
+            continue
+        placed.add(at[0])
+        domains = columns[at[0][0]].values()
+        out.append(dict(shape, xref=at[0][0], yref="paper",
+                        y0=min(lo for lo, _ in domains), y1=max(hi for _, hi in domains)))
+    return out
+
+
+class ShapeLayer:
+    """The bands a figure has been given so far, not yet in its layout."""
+
+    def __init__(self, fig):
+        self._fig = fig
+        self._refs = {}
+        # (fillcolor, xref, yref) -> segments, in the order bands were first asked for,
+        # which is the order they are drawn in.
+        self._bands = {}
+
+    def refs(self, row, col):
+        """`(xref, yref)` of the subplot at (row, col), or None for an empty cell."""
+        if (row, col) not in self._refs:
+            sub = self._fig.get_subplot(row, col)
+            self._refs[(row, col)] = None if sub is None else (
+                _short(sub.xaxis.plotly_name), _short(sub.yaxis.plotly_name) + " domain")
+        return self._refs[(row, col)]
+
+    def add_vrects(self, segments, fillcolor, subplots):
+        """Shade each `(x0, x1)` of `segments` on each (row, col) of `subplots`."""
+        for row, col in subplots:
+            refs = self.refs(row, col)
+            if refs is not None:
+                self._bands.setdefault((fillcolor, *refs), []).extend(segments)
+
+    def shapes(self):
+        """The bands as layout shape dicts, merged."""
+        rects = [dict(BAND, x0=x0, x1=x1, xref=xref, yref=yref, fillcolor=fillcolor)
+                 for (fillcolor, xref, yref), segments in self._bands.items()
+                 for x0, x1 in coalesce(segments)]
+        return span_columns(rects, self._fig.layout)
+
+
+def shape_layer(fig):
+    """`fig`'s ShapeLayer, made on first use."""
+    layer = getattr(fig, "_shape_layer", None)
+    if layer is None:
+        layer = fig._shape_layer = ShapeLayer(fig)
+    return layer
+
+
+def commit_shapes(fig):
+    """Write `fig`'s pending bands into its layout, after the shapes already there.
+
+    One assignment for the whole figure. Safe to call more than once, and on a figure
+    that never had a band.
+    """
+    layer = getattr(fig, "_shape_layer", None)
+    if layer is None:
+        return fig
+    fig._shape_layer = None
+    shapes = layer.shapes()
+    if shapes:
+        fig.update_layout(shapes=list(fig.layout.shapes or ()) + shapes)
+    return fig
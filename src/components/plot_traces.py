@@ -15,6 +15,7 @@ import plotly.graph_objects as go
 import viz_constants as vc
 from components.plot_colors import hex_to_rgba, lighten_hex
 from components.plot_layout import get_nice_dtick
+from components.plot_shapes import shape_layer
 
 
 def update_legend(fig, showlegend, color_palette, show_price):
@@ -51,11 +52,53 @@ def add_open_interest_legend(fig, color_palette):
     return fig
 
 
+# A weekly series' dates are most of its bytes. Plotly packs numeric y-values into a
+# base64 typed array on the way out, but a date has no typed-array form and goes out as
+# a 19-character string, per point, per trace, and the browser parses every one of them
+# back. A date axis reads a start `x0` and a step `dx` in milliseconds just as well, so a
+# series on an evenly spaced index ships its dates as two numbers. An index with a gap
+# (a skipped report, the early semi-monthly history) sends its dates as before. The
+# browser's y-autoscale reads both forms (see autoscale_y_axes in assets/clientside.js).
+def dated_x(index):
+    """The x of a trace over `index`, as keyword arguments: `x0` and `dx`, or `x`."""
+    if isinstance(index, pd.DatetimeIndex) and index.tz is None and len(index) > 2:
+        ms = index.values.astype("datetime64[ms]").astype(np.int64)
+        steps = np.diff(ms)
+        if steps[0] > 0 and (steps == steps[0]).all():
+            return {"x0": index[0].isoformat(), "dx": int(steps[0])}
+    return {"x": index}
+
+
+def trace_dates(trace):
+    """A trace's x as an array, whether it was sent as `x` or as `x0` and `dx`."""
+    if trace.x is not None:
+        return np.asarray(trace.x)
+    if trace.x0 is None or not trace.dx or trace.y is None:
+        return None
+    steps = np.arange(len(trace.y)) * np.timedelta64(int(trace.dx), "ms")
+    return np.datetime64(trace.x0, "ms") + steps
+
+
+def coded_marker(codes, colors):
+    """Per-point colours as a typed array of indices into `colors`, plus the colourscale
+    that maps each index back to its colour.
+
+    A list of colour strings is ten-odd bytes a point and cannot be packed; an int8 index
+    is one before base64. Each index lands exactly on a stop of the scale, so nothing is
+    interpolated and every point gets precisely the colour it was given.
+    """
+    top = max(len(colors) - 1, 1)
+    scale = [[i / top, c] for i, c in enumerate(colors)]
+    if len(colors) == 1:
+        scale.append([1, colors[0]])
+    return dict(color=np.asarray(codes, dtype=np.int8), colorscale=scale, cmin=0, cmax=top)
+
+
 def add_trace_to_all(fig, df, col_name, row, col, name, color, zorder, visible=True, is_bar=False, secondary=False, showlegend=False, opacity=1, dash=None):
     """ Global Legend Toggle Logic: Show legend only once, but use legendgroups to link all 5 plots"""
     if is_bar:
         fig.add_trace(go.Bar(
-            x=df.index,
+            **dated_x(df.index),
             y=df[col_name],
             name=name,
             legendgroup=name.lower(),
@@ -74,7 +117,7 @@ def add_trace_to_all(fig, df, col_name, row, col, name, color, zorder, visible=T
         if dash:
             line_dict["dash"] = dash
         fig.add_trace(go.Scattergl(
-            x=df.index,
+            **dated_x(df.index),
             y=df[col_name],
             name=name,
             legendgroup=name.lower(),
@@ -89,35 +132,135 @@ def add_trace_to_all(fig, df, col_name, row, col, name, color, zorder, visible=T
         )
 
 
-def fast_add_vrects(fig, segments, fillcolor, subplots):
+# Level of detail for long histories. A panel opens on its last few years, but every
+# series ships its whole history so the range buttons and a pan to the left have
+# something to show: on a weekly market that goes back to the eighties, nine points in
+# ten are off screen. `decimate_traces` keeps the weeks on screen at full resolution and
+# thins what is older to the lowest and highest point of each LOD_BUCKET weeks, which
+# is what a line that old looks like at the width it is drawn at anyway: the extremes a
+# reader looks for survive, the wiggle between them does not. The page sends the full
+# series when a zoom reaches back past the cut (see OI Alignment's zoom sink).
+LOD_BUCKET = 8
+# Weeks of full resolution kept to the left of the opening window, so a short pan or
+# a drag of the crosshair does not immediately land on thinned history.
+LOD_MARGIN_WEEKS = 26
+
+
+def lod_indices(y, keep_from, bucket=LOD_BUCKET):
+    """The positions of `y` to keep: all of them from `keep_from` on, the min and max of
+    each `bucket` before it.
+
+    A bucket that is all NaN keeps one NaN, so a gap in the history stays a gap instead
+    of being bridged by a line. The first point is always kept, so the series still
+    starts where it did and the x-range the range buttons compute does not move.
+    """
+    y = np.asarray(y, dtype=float)
+    keep_from = min(max(int(keep_from), 0), len(y))
+    head = keep_from - keep_from % bucket
+    keep = [np.array([0])] if head else []
+    if head:
+        blocks = y[:head].reshape(-1, bucket)
+        empty = np.isnan(blocks).all(axis=1)
+        filled = np.where(np.isnan(blocks), np.inf, blocks)
+        lo = filled.argmin(axis=1)
+        hi = np.where(np.isnan(blocks), -np.inf, blocks).argmax(axis=1)
+        lo[empty] = 0
+        hi[empty] = 0
+        offsets = np.arange(0, head, bucket)
+        keep += [offsets + lo, offsets + hi]
+    keep.append(np.arange(head, len(y)))
+    return np.unique(np.concatenate(keep))
+
+
+def decimate_traces(fig, keep_from_date, bucket=LOD_BUCKET):
+    """Thin the history before `keep_from_date` out of `fig`'s line series, in place.
+
+    Only a plain dated line is thinned. A bar, a candle or a marker is a reading at that
+    week, not a point on a curve, and a trace with per-point text or customdata would
+    lose the hover it was drawn for. Returns the indices of the traces it thinned, which
+    is what the page has to swap back for the full series.
+    """
+    thinned = []
+    for k, trace in enumerate(fig.data):
+        if trace.type not in ("scatter", "scattergl"):
+            continue
+        if trace.mode and "markers" in trace.mode:
+            continue
+        if trace.text is not None or trace.customdata is not None:
+            continue
+        x = trace_dates(trace)
+        if x is None or x.dtype.kind != "M" or trace.y is None:
+            continue
+        keep_from = int(np.searchsorted(x, np.datetime64(keep_from_date)))
+        if keep_from < 2 * bucket:
+            continue
+        idx = lod_indices(trace.y, keep_from, bucket)
+        if len(idx) == len(x):
+            continue
+        # The thinned x is uneven, so it cannot go as x0/dx. Weekly reports fall on
+        # midnight, and a bare date is half the bytes of the timestamp Plotly would write.
+        kept = x[idx]
+        days = kept.astype("datetime64[D]")
+        trace.x = np.datetime_as_string(days) if (kept == days).all() else kept
+        trace.y = np.asarray(trace.y)[idx]
+        thinned.append(k)
+    return thinned
+
+
+# Every shaded band on these charts is a run of consecutive weeks where some mask holds.
+# The three shaders used to find their runs three ways, two with a pandas groupby over
+# cumulative-sum run ids and one by walking the indices in Python, and all three paid
+# for it per mask per panel. Padded with False at both ends, a mask changes value an
+# even number of times, and the changes alternate: a run opens, a run closes. So one
+# comparison of the mask against itself shifted by one finds every run at once.
+def _as_bool(mask):
+    if getattr(mask, "dtype", None) is not None and mask.dtype.kind == "b":
+        return np.asarray(mask)
+    if hasattr(mask, "to_numpy"):
+        return mask.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(mask, dtype=bool)
+
+
+def mask_runs(mask):
+    """`(starts, ends)`: the first and last position of every run of True in `mask`.
+
+    Both are int arrays of positions, ends inclusive. A missing value counts as False.
     """
-    Dramatically faster way to add many vertical rectangles to subplots
-    by bypassing individual validation and layout updates.
-    subplots: list of (row, col) tuples
+    padded = np.concatenate(([False], _as_bool(mask), [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return changes[::2], changes[1::2] - 1
+
+
+def mask_runs_batch(masks):
+    """`mask_runs` for several masks of one length, from a single pass over all of them.
+
+    The masks are laid end to end with a False between each, so a run can neither open
+    before its own mask nor carry over into the next one.
+    """
+    if not masks:
+        return []
+    width = len(masks[0]) + 1
+    padded = np.zeros(len(masks) * width + 1, dtype=bool)
+    for i, mask in enumerate(masks):
+        padded[i * width + 1:(i + 1) * width] = _as_bool(mask)
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    opens, closes = changes[::2], changes[1::2]
+    rows = opens // width
+    starts, ends = opens - rows * width, closes - 1 - rows * width
+    cuts = np.searchsorted(rows, np.arange(1, len(masks)))
+    return list(zip(np.split(starts, cuts), np.split(ends, cuts)))
+
+
+def fast_add_vrects(fig, segments, fillcolor, subplots):
+    """Shade each `(x0, x1)` of `segments` on each (row, col) of `subplots`.
+
+    The rects are queued on the figure's plot_shapes.ShapeLayer rather than written to
+    the layout, which merges them and writes them once when the figure is finished:
+    `plot_layout.get_update_layout_for_plots` and `panel_stack.to_fragment` both do.
     """
     if not segments or not subplots:
         return
-
-    shapes = list(fig.layout.shapes) if fig.layout.shapes else []
-    resolved_refs = []
-    for r, c in subplots:
-        fig.add_vrect(x0=0, x1=1, row=r, col=c)
-        dummy = fig.layout.shapes[-1]
-        resolved_refs.append((dummy.xref, dummy.yref))
-        fig.layout.shapes = fig.layout.shapes[:-1]
-
-    for start_date, end_date in segments:
-        for xref, yref in resolved_refs:
-            shapes.append(dict(
-                type="rect",
-                x0=start_date, x1=end_date,
-                y0=0, y1=1,
-                xref=xref, yref=yref,
-                fillcolor=fillcolor,
-                layer="below",
-                line_width=0
-            ))
-    fig.update_layout(shapes=shapes)
+    shape_layer(fig).add_vrects(segments, fillcolor, subplots)
 
 
 def get_open_interest_percent_plot(fig, df, row, col, color_palette, show_price=True):
@@ -206,29 +349,16 @@ def get_spearman_plot(fig, df, row, col, color_palette, show_price=True):
             bullish_mask = df[const.COMMS_SPEARMAN_REGIME_SHIFT]
             bearish_mask = pd.Series(False, index=df.index)
 
-        bull_segments = []
-        bull_id = (bullish_mask != bullish_mask.shift()).cumsum()
-        for _, block in df[bullish_mask].groupby(bull_id[bullish_mask].values):
-            if not block.empty:
-                x0 = block.index[0]
-                x1 = block.index[-1]
-                if x0 == x1:
-                    x0 = x0 - pd.Timedelta(days=3)
-                    x1 = x1 + pd.Timedelta(days=3)
-                bull_segments.append((x0, x1))
-        fast_add_vrects(fig, bull_segments, "rgba(0, 255, 0, 0.2)", [(row, col)])
-
-        bear_segments = []
-        bear_id = (bearish_mask != bearish_mask.shift()).cumsum()
-        for _, block in df[bearish_mask].groupby(bear_id[bearish_mask].values):
-            if not block.empty:
-                x0 = block.index[0]
-                x1 = block.index[-1]
-                if x0 == x1:
-                    x0 = x0 - pd.Timedelta(days=3)
-                    x1 = x1 + pd.Timedelta(days=3)
-                bear_segments.append((x0, x1))
-        fast_add_vrects(fig, bear_segments, "rgba(255, 0, 0, 0.2)", [(row, col)])
+        # A one-week run would be a zero-width rect, so it is widened to a visible band.
+        half_week = pd.Timedelta(days=3)
+        runs = mask_runs_batch([bullish_mask, bearish_mask])
+        for (starts, ends), fillcolor in zip(runs, ("rgba(0, 255, 0, 0.2)",
+                                                     "rgba(255, 0, 0, 0.2)")):
+            x0, x1 = df.index[starts], df.index[ends]
+            single = starts == ends
+            x0 = x0.where(~single, x0 - half_week)
+            x1 = x1.where(~single, x1 + half_week)
+            fast_add_vrects(fig, list(zip(x0, x1)), fillcolor, [(row, col)])
 
     fig.update_yaxes(
         title="correlation",
@@ -420,12 +550,12 @@ def get_basis_overlay_plot(fig, df_raw, df_norm, value_col, row, col, color_pale
     # Band first so both lines draw over it. `fill='tonexty'` fills against the trace
     # added immediately before, so the invisible raw baseline has to come first.
     fig.add_trace(go.Scatter(
-        x=df_raw.index, y=df_raw[value_col],
+        **dated_x(df_raw.index), y=df_raw[value_col],
         mode='lines', line=dict(width=0),
         hoverinfo='skip', showlegend=False, legendgroup="basis divergence",
     ), row=row, col=col, secondary_y=False)
     fig.add_trace(go.Scatter(
-        x=df_norm.index, y=df_norm[value_col],
+        **dated_x(df_norm.index), y=df_norm[value_col],
         mode='lines', line=dict(width=0),
         fill='tonexty', fillcolor=hex_to_rgba(color_palette[0], vc.BASIS_DIVERGENCE_ALPHA),
         hoverinfo='skip', showlegend=is_first, legendgroup="basis divergence",
@@ -560,14 +690,14 @@ def get_cot_macd_subplot(fig, df, row, col, color_palette, show_price=True):
         (hist < 0) & (hist >= prev_hist)    # Below zero but trending up
     ]
     # Apply the mapping, defaulting to gray for the very first row
-    choices = [STRONG_BULL, WEAK_BULL, STRONG_BEAR, WEAK_BEAR]
-    hist_colors = np.select(conditions, choices, default='gray')
+    choices = [STRONG_BULL, WEAK_BULL, STRONG_BEAR, WEAK_BEAR, 'gray']
+    hist_codes = np.select(conditions, range(4), default=4)
 
     # Add the Histogram (The Momentum Velocity)
     fig.add_trace(go.Bar(
-        x=df.index,
+        **dated_x(df.index),
         y=df[const.COMM_MACD_HIST],
-        marker_color=hist_colors,
+        marker=coded_marker(hist_codes, choices),
         name='MACD Hist',
         opacity=0.8,
         showlegend=False
@@ -575,7 +705,7 @@ def get_cot_macd_subplot(fig, df, row, col, color_palette, show_price=True):
 
     # Add the Fast MACD Line
     fig.add_trace(go.Scatter(
-        x=df.index,
+        **dated_x(df.index),
         y=df[const.COMM_MACD_LINE],
         mode='lines',
         line=dict(color='#3b82f6', width=2),
@@ -585,7 +715,7 @@ def get_cot_macd_subplot(fig, df, row, col, color_palette, show_price=True):
 
     # Add the Slow Signal Line
     fig.add_trace(go.Scatter(
-        x=df.index,
+        **dated_x(df.index),
         y=df[const.COMM_MACD_SIGNAL],
         mode='lines',
         line=dict(color='#f59e0b', width=2, dash='dot'),
@@ -935,35 +1065,23 @@ def add_trend_regime_highlighting(fig, df, ma, uptrend_mask, downtrend_mask, tar
     """
 
     # ---------------------------------------------------------
-    # 1. Process Uptrends
+    # 1. Process Uptrends and Downtrends
     # ---------------------------------------------------------
-    # 1. Process Uptrends
-    # ---------------------------------------------------------
-    up_segments = []
-    up_regime_id = (uptrend_mask != uptrend_mask.shift()).cumsum()
-    for _, block in df[uptrend_mask].groupby(up_regime_id[uptrend_mask].values):
-        if block.index[0] != block.index[-1]:
-            up_segments.append((block.index[0], block.index[-1]))
-
-    fast_add_vrects(fig, up_segments, "rgba(0, 255, 0, 0.05)", [(r, c) for r, c, _ in target_subplots])
-
-    # ---------------------------------------------------------
-    # 2. Process Downtrends
-    # ---------------------------------------------------------
-    down_segments = []
-    down_regime_id = (downtrend_mask != downtrend_mask.shift()).cumsum()
-    for _, block in df[downtrend_mask].groupby(down_regime_id[downtrend_mask].values):
-        if block.index[0] != block.index[-1]:
-            down_segments.append((block.index[0], block.index[-1]))
-
-    fast_add_vrects(fig, down_segments, "rgba(255, 0, 0, 0.05)", [(r, c) for r, c, _ in target_subplots])
+    # A single week's regime is noise, not a trend, so one-week runs are not shaded.
+    (up_starts, up_ends), (down_starts, down_ends) = mask_runs_batch([uptrend_mask, downtrend_mask])
+    subplots = [(r, c) for r, c, _ in target_subplots]
+    for starts, ends, fillcolor in ((up_starts, up_ends, "rgba(0, 255, 0, 0.05)"),
+                                    (down_starts, down_ends, "rgba(255, 0, 0, 0.05)")):
+        kept = ends > starts
+        fast_add_vrects(fig, list(zip(df.index[starts[kept]], df.index[ends[kept]])),
+                        fillcolor, subplots)
 
     # ---------------------------------------------------------
     # 3. Plot the Moving Average
     # ---------------------------------------------------------
     for r, c, is_secondary in target_subplots:
         fig.add_trace(go.Scatter(
-            x=ma.index,
+            **dated_x(ma.index),
             y=ma,
             mode='lines',
             line=dict(
@@ -1004,37 +1122,15 @@ def get_setup_highlighting(fig, df, comm_col_str, lrg_col_str, sml_col_str, mode
     green_mask &= valid_mask
     red_mask &= valid_mask
 
-    # Get the integer row numbers where conditions are True (ignoring the 0th index to allow i-1)
-    green_indices = np.where(green_mask)[0]
-    red_indices = np.where(red_mask)[0]
-
-    def _add_vrects(indices, fillcolor):
-        if len(indices) == 0:
-            return
-
-        # Group contiguous indices
-        segments = []
-        start = indices[0]
-        prev = indices[0]
-
-        for i in indices[1:]:
-            if i == prev + 1:
-                prev = i
-            else:
-                segments.append((start, prev))
-                start = i
-                prev = i
-        segments.append((start, prev))
-
-        date_segments = []
-        for start_idx, end_idx in segments:
-            safe_start = start_idx - 1 if start_idx > 0 else 0
-            if safe_start < end_idx:
-                date_segments.append((dates[safe_start], dates[end_idx]))
-
-        fast_add_vrects(fig, date_segments, fillcolor, [(row, col)])
-
-    _add_vrects(green_indices, "rgba(0, 255, 0, 0.15)")
-    _add_vrects(red_indices, "rgba(255, 0, 0, 0.15)")
+    # Each band opens a week early, at the report before the setup appeared, so a
+    # one-week setup still has a width. The first row has no week before it, so a setup
+    # that is only the first row has nothing to shade.
+    runs = mask_runs_batch([green_mask, red_mask])
+    for (starts, ends), fillcolor in zip(runs, ("rgba(0, 255, 0, 0.15)",
+                                                 "rgba(255, 0, 0, 0.15)")):
+        starts = np.maximum(starts - 1, 0)
+        kept = starts < ends
+        fast_add_vrects(fig, list(zip(dates[starts[kept]], dates[ends[kept]])),
+                        fillcolor, [(row, col)])
 
     return fig
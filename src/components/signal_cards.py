@@ -17,6 +17,7 @@ from cotmetrics.synthesis import _collect_active_signals, generate_exhaustive_ta
 # pyrefly: ignore [missing-import]
 from dash import dcc, html
 
+import board_snapshot
 import viz_constants as vc
 
 # ---------------------------------------------------------------------------
@@ -531,7 +532,13 @@ def build_signal_panel(df, asset, color_palette, target_date=None, is_equity=Fal
 
 
 def build_mobile_asset_card(df, asset, color_palette, lookback,
-                             model=None, is_equity=False, filter_types=[]):
+                             model=None, is_equity=False, filter_types=[], tape_bias=None):
+    """One market's card off the last row of `df`.
+
+    `tape_bias` is the synthesis' verdict when the caller already has it (the board
+    snapshot computes it for every market); without it the synthesis runs here, off
+    `df`, which then has to reach back far enough for the price trend.
+    """
     from datetime import datetime
 
 
@@ -629,8 +636,10 @@ def build_mobile_asset_card(df, asset, color_palette, lookback,
 
     bearish_setup or (len(active_bear_signals) > len(active_bull_signals))
 
-    synthesis = generate_exhaustive_tape_synthesis(latest, symbol_str, df=df)
-    tape_bias = synthesis.get("tape_bias", "neutral").upper()
+    if tape_bias is None:
+        tape_bias = generate_exhaustive_tape_synthesis(latest, symbol_str, df=df).get(
+            "tape_bias", "neutral")
+    tape_bias = tape_bias.upper()
 
     if "TAPE_BIAS_BULL" in filter_types and "TAPE_BIAS_BEAR" in filter_types:
         if tape_bias.lower() not in ("bullish", "bearish"):
@@ -883,18 +892,26 @@ def build_accordion_skeleton(asset_classes):
 
 
 def build_asset_class_cards(cot_indexer, ac, lookback, color_palette, model=None, filter_types=[]):
+    """The class's cards, off the release's board snapshot rather than its frames.
+
+    The snapshot holds each market's last row and tape bias, which is everything a card
+    draws, and is the same sweep the strips and the accordion titles read, so opening
+    every class reads no frame the board has not already read.
+    """
     model = model if isinstance(model, models.PositioningModel) else models.resolve(model)
+    snapshot = board_snapshot.snapshot(lookback, model)
 
     instruments = cot_indexer.get_assets_for_asset_class(ac)
     ac_cards = []
     for name in instruments:
-        df = cot_indexer.get_symbols_data(name, lookback, model.basis)
+        df = snapshot.last_row.get(name)
         code = cot_indexer.get_instrument_symbol_from_name(name)
         symbol = cot_indexer.instruments[code].symbol if code in cot_indexer.instruments else name
         is_equity = cot_indexer.is_equity(name)
         card = build_mobile_asset_card(
             df, symbol, color_palette, lookback, model=model,
-            is_equity=is_equity, filter_types=filter_types
+            is_equity=is_equity, filter_types=filter_types,
+            tape_bias=snapshot.bias.get(name)
         )
         if card is not None:
             ac_cards.append(dbc.Col(card, xs=12, sm=6, md=4, lg=3, xl=2))
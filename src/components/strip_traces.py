@@ -42,6 +42,8 @@ from dataclasses import dataclass
 
 import cotmetrics.constants as const
 import cotmetrics.models as models
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
 import viz_constants as vc
@@ -272,15 +274,75 @@ class StripRow:
     prior: float = None  # where the index stood MOMENTUM_PERIOD weeks ago
 
 
-def _num(value):
-    """A matrix cell as a float, or None. Cells arrive rounded, absent or NaN."""
-    if value is None:
-        return None
-    try:
-        f = float(value)
-    except (TypeError, ValueError):
-        return None
-    return None if f != f else f
+@dataclass(frozen=True)
+class StripColumns:
+    """A board's markets as arrays, one entry per market: the strip's working form.
+
+    `build_rows` filters and orders a whole board with it in a handful of array
+    operations, and `build_figure` draws every trace from it, where both used to walk
+    a list of rows once per field. Absent numbers are NaN rather than None here; the
+    StripRows built from it turn them back into None.
+    """
+    label: np.ndarray        # object: the market's name
+    asset_class: np.ndarray  # object
+    comm: np.ndarray         # float: the Commercial index, NaN where it has none
+    prior: np.ndarray        # float: the index MOMENTUM_PERIOD weeks ago, clamped, or NaN
+    state: np.ndarray        # object: the model's setup state, SETUP_NONE for none
+    is_equity: np.ndarray    # bool
+    legs: dict               # leg_key -> float array, for each leg the model draws
+    gates: dict              # leg_key -> bool array, `is_gate_leg` for each market
+
+    def __len__(self):
+        return len(self.comm)
+
+    def take(self, index):
+        """The markets at `index` (an index array or a mask), in that order."""
+        return StripColumns(
+            label=self.label[index], asset_class=self.asset_class[index],
+            comm=self.comm[index], prior=self.prior[index], state=self.state[index],
+            is_equity=self.is_equity[index],
+            legs={leg: v[index] for leg, v in self.legs.items()},
+            gates={leg: g[index] for leg, g in self.gates.items()})
+
+    @classmethod
+    def from_rows(cls, rows, model):
+        """The MARKET rows of `rows` as columns, so a hand-written list draws too."""
+        markets = [r for r in rows if r.kind == "market"]
+        legs = {leg: {} for leg in model.spec_legs}
+        for i, row in enumerate(markets):
+            for leg, value, gate in row.legs:
+                if leg in legs:
+                    legs[leg][i] = (value, gate)
+        n = len(markets)
+
+        def leg_array(leg, slot, dtype):
+            return np.array([legs[leg].get(i, (np.nan, False))[slot] for i in range(n)],
+                            dtype=dtype)
+
+        # dtype=float turns a None into NaN on the way in.
+        return cls(
+            label=np.array([r.label for r in markets], dtype=object),
+            asset_class=np.array([r.asset_class for r in markets], dtype=object),
+            comm=np.array([r.comm for r in markets], dtype=float),
+            prior=np.array([r.prior for r in markets], dtype=float),
+            state=np.array([r.state for r in markets], dtype=object),
+            is_equity=np.array([r.is_equity for r in markets], dtype=bool),
+            legs={leg: leg_array(leg, 0, float) for leg in legs},
+            gates={leg: leg_array(leg, 1, bool) for leg in legs})
+
+
+def _floats(df, column):
+    """A matrix column as floats, NaN where a cell is absent or not a number. Cells
+    arrive rounded, absent or NaN, and the frame may not carry the column at all."""
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+
+
+def _objects(df, column):
+    if column not in df:
+        return np.full(len(df), None, dtype=object)
+    return df[column].to_numpy(dtype=object)
 
 
 def is_gate_leg(comm, leg_value, model, is_equity):
@@ -301,6 +363,36 @@ def is_gate_leg(comm, leg_value, model, is_equity):
     return False
 
 
+def gate_mask(comm, leg_values, model, is_equity):
+    """`is_gate_leg` over whole arrays. NaN compares false both ways, so a market
+    missing either number never counts, as a None never does there."""
+    return ~is_equity & (((comm >= model.high) & (leg_values <= model.low))
+                         | ((comm <= model.low) & (leg_values >= model.high)))
+
+
+def strip_columns(df, model):
+    """Every market of one Signal Matrix frame as `StripColumns`, in the frame's order."""
+    cols = LEG_COLUMNS[model.key]
+    comm = _floats(df, cols["comm"])
+    move = _floats(df, MOVE_COLUMN[model.key])
+    equity = pd.Series(_objects(df, const.IS_EQUITY_COL))
+    is_equity = (equity.notna() & equity.astype(bool)).to_numpy(dtype=bool)
+    state = pd.Series(_objects(df, SETUP_COLUMN[model.key])).fillna(const.SETUP_NONE)
+    legs = {leg: _floats(df, cols[leg]) for leg in model.spec_legs if leg in cols}
+    return StripColumns(
+        label=_objects(df, "Asset"),
+        asset_class=_objects(df, "Asset Class"),
+        comm=comm,
+        # Clamped, because the index is bounded and the change is a point difference:
+        # a market that ran from 2 to 98 would put its prior mark off the axis otherwise.
+        # NaN survives the clip, so a market with no move has no prior.
+        prior=np.clip(comm - move, 0.0, 100.0),
+        state=state.to_numpy(dtype=object),
+        is_equity=is_equity,
+        legs=legs,
+        gates={leg: gate_mask(comm, v, model, is_equity) for leg, v in legs.items()})
+
+
 def keeps(row, show, side):
     """Whether the filters let this market through."""
     states = SHOW_STATES.get(show)
@@ -313,6 +405,32 @@ def keeps(row, show, side):
     return True
 
 
+def keep_mask(columns, show, side):
+    """`keeps` for every market of `columns` at once."""
+    states = SHOW_STATES.get(show)
+    mask = (np.ones(len(columns), dtype=bool) if states is None
+            else np.isin(columns.state, list(states)))
+    if side == SIDE_BULL:
+        mask &= columns.comm > const.INDEX_NEUTRAL
+    elif side == SIDE_BEAR:
+        mask &= columns.comm < const.INDEX_NEUTRAL
+    return mask
+
+
+def _market_rows(columns):
+    """One StripRow per market of `columns`, in order, with NaN back to None."""
+    legs = [[(leg, None if v != v else v, g)
+             for v, g in zip(values.tolist(), columns.gates[leg].tolist())]
+            for leg, values in columns.legs.items()]
+    return [StripRow(kind="market", label=label, asset_class=asset_class, comm=comm,
+                     legs=tuple(market_legs), state=state, is_equity=is_equity,
+                     prior=None if prior != prior else prior)
+            for label, asset_class, comm, state, is_equity, prior, *market_legs in zip(
+                columns.label.tolist(), columns.asset_class.tolist(),
+                columns.comm.tolist(), columns.state.tolist(),
+                columns.is_equity.tolist(), columns.prior.tolist(), *legs)]
+
+
 def build_rows(df, model, sort_by_index=True, show=SHOW_ALL, side=SIDE_BOTH):
     """`(rows, skipped)` for one Signal Matrix frame.
 
@@ -324,58 +442,35 @@ def build_rows(df, model, sort_by_index=True, show=SHOW_ALL, side=SIDE_BOTH):
     knows the filter it asked for, and a class left empty by one loses its header rather
     than sitting there as a heading over nothing.
     """
-    cols = LEG_COLUMNS[model.key]
-    state_col = SETUP_COLUMN[model.key]
-    move_col = MOVE_COLUMN[model.key]
-
-    by_class = {}
-    skipped = []
-    for record in df.to_dict("records"):
-        comm = _num(record.get(cols["comm"]))
-        asset = record.get("Asset")
-        if comm is None:
-            skipped.append(asset)
-            continue
-        is_equity = bool(record.get(const.IS_EQUITY_COL))
-        legs = []
-        for leg in model.spec_legs:
-            if leg not in cols:
-                continue
-            value = _num(record.get(cols[leg]))
-            legs.append((leg, value, is_gate_leg(comm, value, model, is_equity)))
-        move = _num(record.get(move_col))
-        market = StripRow(kind="market", label=asset,
-                          asset_class=record.get("Asset Class"),
-                          comm=comm, legs=tuple(legs),
-                          state=record.get(state_col) or const.SETUP_NONE,
-                          is_equity=is_equity,
-                          # Clamped, because the index is bounded and the change is a
-                          # point difference: a market that ran from 2 to 98 would put
-                          # its prior mark off the axis otherwise.
-                          prior=None if move is None
-                          else min(100.0, max(0.0, comm - move)))
-        if not keeps(market, show, side):
-            continue
-        by_class.setdefault(market.asset_class, []).append(market)
+    columns = strip_columns(df, model)
+    placed = ~np.isnan(columns.comm)
+    skipped = columns.label[~placed].tolist()
+    board = columns.take(placed & keep_mask(columns, show, side))
+
+    # Classes in the order their first surviving market appears, which is the frame's
+    # class order. Within each, descending, so the crowded-long end of each group sits
+    # at the top of it and the crowded-short end at the bottom. The printed reports keep
+    # a fixed order inside each class, which means finding the extremes is a full read
+    # of it. lexsort is stable, so ties keep the frame's order either way.
+    classes, _ = pd.factorize(board.asset_class, use_na_sentinel=False)
+    within = -board.comm if sort_by_index else board.label.astype(str)
+    order = np.lexsort((within, classes))
+    markets = _market_rows(board.take(order))
 
     rows = []
-    for asset_class, markets in by_class.items():
-        # A blank row before each class after the first. The separator rule alone left
-        # the groups touching, so the break read as a line through a continuous list
-        # rather than as space between two lists. The rule now sits in the middle of the
-        # gap, with air on both sides of it.
-        if rows:
-            rows.append(StripRow(kind="spacer", label="", asset_class=asset_class))
-        # Descending, so the crowded-long end of each group sits at the top of it and
-        # the crowded-short end at the bottom. The printed reports keep a fixed order
-        # inside each class, which means finding the extremes is a full read of it.
-        if sort_by_index:
-            markets = sorted(markets, key=lambda r: r.comm, reverse=True)
-        else:
-            markets = sorted(markets, key=lambda r: r.label)
-        rows.append(StripRow(kind="class", label=asset_class,
-                             asset_class=asset_class))
-        rows.extend(markets)
+    for market, cls, previous in zip(markets, classes[order],
+                                     np.concatenate(([-1], classes[order][:-1]))):
+        if cls != previous:
+            # A blank row before each class after the first. The separator rule alone
+            # left the groups touching, so the break read as a line through a
+            # continuous list rather than as space between two lists. The rule now sits
+            # in the middle of the gap, with air on both sides of it.
+            if rows:
+                rows.append(StripRow(kind="spacer", label="",
+                                     asset_class=market.asset_class))
+            rows.append(StripRow(kind="class", label=market.asset_class,
+                                 asset_class=market.asset_class))
+        rows.append(market)
     return rows, skipped
 
 
@@ -472,32 +567,45 @@ def _block_spans(rows):
     return spans
 
 
-def _verdict_colour(row, colors):
-    """The model's colour for a row it has something to say about, else None. See the
-    module docstring on why it is the row's state and not the value that decides."""
+def _verdict_colours(colors):
+    """`{state: colour}` for the states the model has something to say about."""
     return {const.SETUP_BULL: colors.bull,
             const.SETUP_BEAR: colors.bear,
             const.SETUP_NEAR_BULL: colors.bull_near,
-            const.SETUP_NEAR_BEAR: colors.bear_near}.get(row.state)
+            const.SETUP_NEAR_BEAR: colors.bear_near}
 
 
-def _mark_colour(row, colors, palette):
-    """Colour for a market's lollipop head: the verdict, or the app's neutral dim.
+def _verdict_colour(row, colors):
+    """The model's colour for a row it has something to say about, else None. See the
+    module docstring on why it is the row's state and not the value that decides."""
+    return _verdict_colours(colors).get(row.state)
+
+
+def _by_verdict(state, colours, default):
+    """Per market of the `state` array, its colour from `colours`, else `default`."""
+    return np.select([state == s for s in colours], list(colours.values()), default)
+
+
+def _head_colours(state, colors):
+    """Colour for each market's lollipop head: the verdict, or the app's neutral dim.
 
     Green and red are the model's words — bull setup and bear setup, the same pair the
     gate bands speak — so a row the model has nothing to say about must not borrow
     either. See the QUIET_STEM comment for the two colours this tier wore first and
     why each failed.
     """
-    return _verdict_colour(row, colors) or colors.dim
+    return _by_verdict(state, _verdict_colours(colors), colors.dim)
 
 
-def _stem_colour(row, colors, palette):
+def _mark_colour(row, colors, palette):
+    """`_head_colours` for one row, as the figure colours it."""
+    return str(_head_colours(np.array([row.state], dtype=object), colors)[0])
+
+
+def _stem_colours(state, colors):
     """The stem is one step fainter than its head, whichever tier the head is in."""
-    verdict = _verdict_colour(row, colors)
-    if verdict:
-        return _fill(verdict)
-    return QUIET_STEM
+    fills = {s: _fill(c) for s, c in _verdict_colours(colors).items()}
+    return _by_verdict(state, fills, QUIET_STEM)
 
 
 def _fill(colour, alpha=STEM_ALPHA):
@@ -604,11 +712,15 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
     """The strip, as one figure.
 
     `rows` comes from build_rows. Nothing here reads a store, so a caller can hand it
-    hand-written rows.
+    hand-written rows. Its markets are gathered into one `StripColumns` up front and
+    every trace takes its arrays from that, rather than re-walking the rows per field.
     """
     fig = go.Figure()
 
-    markets = [(i, r) for i, r in enumerate(rows) if r.kind == "market"]
+    # Every market mark is drawn from these arrays: `ys` is each market's row, and
+    # `board` its values, in the same order.
+    ys = np.array([i for i, r in enumerate(rows) if r.kind == "market"], dtype=int)
+    board = StripColumns.from_rows(rows, model)
     headers = [(i, r) for i, r in enumerate(rows) if r.kind == "class"]
 
     # Bands first, so every mark lands on top of them. Only the two extremes are
@@ -649,13 +761,11 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
     # BETWEEN rows, never around a block. A rule under the last market of a class would
     # close the block off just above the gap that already separates it from the next one,
     # and a rule above the first would double the heading bar's own bottom edge.
-    market_ys = [i for i, r in enumerate(rows) if r.kind == "market"]
+    rule = dict(color=hex_to_rgba(vc.BRIGHTER_TEXT_COLOR, ROW_RULE_ALPHA), width=1)
     shapes += [
         dict(type="line", xref="paper", yref="y", x0=0, x1=1, y0=i + 0.5, y1=i + 0.5,
-             layer="below",
-             line=dict(color=hex_to_rgba(vc.BRIGHTER_TEXT_COLOR, ROW_RULE_ALPHA),
-                       width=1))
-        for i in market_ys if i + 1 in set(market_ys)
+             layer="below", line=rule)
+        for i in ys[:-1][np.diff(ys) == 1].tolist()
     ]
 
     # The heading's own bar, across the full width at HEADER_BAND_ALPHA.
@@ -682,34 +792,34 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
     # blocks separates them on its own.
     fig.update_layout(shapes=shapes)
 
-    if markets:
+    if len(board):
+        y = ys.tolist()
+        verdict = np.isin(board.state, list(_verdict_colours(colors)))
         # The stem: a hairline bar from neutral to the value, in the head's colour one
         # step fainter. It carries no hover of its own — a 3px target is misery to
         # hit, and the head at its end says the same thing.
         fig.add_trace(go.Bar(
-            x=[r.comm - const.INDEX_NEUTRAL for _, r in markets],
-            base=[const.INDEX_NEUTRAL] * len(markets),
-            y=[i for i, _ in markets],
+            x=(board.comm - const.INDEX_NEUTRAL).tolist(),
+            base=[const.INDEX_NEUTRAL] * len(board),
+            y=y,
             orientation="h",
             width=STEM_WIDTH,
-            marker=dict(color=[_stem_colour(r, colors, palette) for _, r in markets],
-                        line_width=0),
+            marker=dict(color=_stem_colours(board.state, colors).tolist(), line_width=0),
             hoverinfo="skip",
             showlegend=False,
         ))
         # The head: the value itself, carrying the hover. One shape for every row, so
         # a quiet row reads as the same object rather than as a special case — smaller
         # and fainter on the quiet tier, so the verdicts outrank it at a glance.
-        heads = [_mark_colour(r, colors, palette) for _, r in markets]
+        heads = _head_colours(board.state, colors).tolist()
         fig.add_trace(go.Scatter(
-            x=[r.comm for _, r in markets],
-            y=[i for i, _ in markets],
+            x=board.comm.tolist(),
+            y=y,
             mode="markers",
             marker=dict(symbol="circle",
-                        size=[HEAD_SIZE if _verdict_colour(r, colors) else
-                              QUIET_HEAD_SIZE for _, r in markets],
+                        size=np.where(verdict, HEAD_SIZE, QUIET_HEAD_SIZE).tolist(),
                         color=heads, line=dict(width=1, color=heads)),
-            hovertext=[_hover(r, model) for _, r in markets],
+            hovertext=[_hover(r, model) for r in rows if r.kind == "market"],
             hoverinfo="text",
             showlegend=False,
         ))
@@ -719,8 +829,8 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
     # No connector to the current mark. The reference charts that do this well draw the
     # two positions and let the row pair them, and 42 connectors is a lot of line for a
     # move that is usually a few points wide.
-    prior = [(i, r.prior) for i, r in markets if r.prior is not None]
-    if prior:
+    has_prior = ~np.isnan(board.prior)
+    if has_prior.any():
         # `color`, not just `line.color`. An OPEN symbol draws its outline from
         # marker.color; marker.line is a second stroke around that. Setting only the
         # line left marker.color unset, so Plotly fell back to the template colorway
@@ -728,7 +838,7 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
         # key beside them was the colour this actually sets. Nothing errors when a
         # colour is omitted, it just quietly becomes the theme's.
         fig.add_trace(go.Scatter(
-            x=[v for _, v in prior], y=[i for i, _ in prior],
+            x=board.prior[has_prior].tolist(), y=ys[has_prior].tolist(),
             mode="markers",
             marker=dict(symbol="circle-open", size=6, color=colors.dim,
                         line=dict(width=1.2, color=colors.dim)),
@@ -739,19 +849,19 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
     # reader can switch one off. Drawn as a tick rather than a dot: it marks a position
     # on the same axis as the bar, and a dot would read as a second measure. Lit when
     # the ROW is (see TICK_ALPHA_LIT); the per-leg gate flag stays on the hover.
+    lit = board.state != const.SETUP_NONE
     for leg in model.spec_legs:
-        points = [(i, value,
-                   _leg_colour(leg, r.state != const.SETUP_NONE, palette))
-                  for i, r in markets
-                  for lg, value, _ in r.legs if lg == leg and value is not None]
-        if not points:
+        values = board.legs[leg]
+        drawn = ~np.isnan(values)
+        if not drawn.any():
             continue
-        colours = [c for _, _, c in points]
+        colours = np.where(lit[drawn], _leg_colour(leg, True, palette),
+                           _leg_colour(leg, False, palette)).tolist()
         # Both, for the reason the prior mark documents: a `line-*` symbol happens to
         # draw from marker.line, so leaving marker.color unset looked fine here and was
         # one symbol change away from silently becoming a template colour.
         fig.add_trace(go.Scatter(
-            x=[v for _, v, _ in points], y=[i for i, _, _ in points],
+            x=values[drawn].tolist(), y=ys[drawn].tolist(),
             mode="markers",
             marker=dict(symbol="line-ns", size=9, color=colours,
                         line=dict(width=1.6, color=colours)),
@@ -823,8 +933,8 @@ def build_figure(rows, model, colors, palette, background=vc.BACKGROUND_COLOR):
         tickfont=dict(size=10), showgrid=False, zeroline=False))
     fig.update_yaxes(
         range=[len(rows) - 0.5, -0.5],
-        tickvals=[i for i, _ in markets],
-        ticktext=[_tick_label(r, colors) for _, r in markets],
+        tickvals=ys.tolist(),
+        ticktext=[_tick_label(r, colors) for r in rows if r.kind == "market"],
         tickfont=dict(size=10),
         # Explicit, because the margin is now sized to the text. Plotly leaves about a
         # pixel between a tick label and the plot when `ticks=""`, which went unnoticed
@@ -0,0 +1,146 @@
+"""
+db_pool.py
+
+Read connections to the app's SQLite database, pooled per process, in WAL mode.
+
+The readers of `cotDatabase.db_name` each opened a connection of their own per call:
+the Raw Data Viewer per callback, the Admin page per refresh through
+`cotDatabase.get_visitor_stats`. Opening one is a file open, a schema read and a
+journal check, every time, and under the default rollback journal a reader and the
+visit log's writer (visit_log.py) lock each other out for the length of the other's
+statement.
+
+Here a process keeps up to POOL_SIZE read connections and hands them out with
+`reader()`. They open the file read-only (`mode=ro`, plus `query_only`), so a pooled
+connection cannot be the one that writes. The first use in a process switches the
+database to WAL, which is a property of the file and so holds for the writer as well:
+readers then see the last committed state without waiting on a write in progress, and
+the writer never waits on them. The same first use creates the indexes the readers
+here query by (see INDEXES); the schema itself stays cotmetrics'.
+
+A pool belongs to the process that made it. A forked worker that inherits one starts a
+fresh pool rather than sharing file handles with its parent, which SQLite forbids.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import cotmetrics.utils as utils
+import pandas as pd
+
+POOL_SIZE = 4
+BUSY_TIMEOUT_SECONDS = 5
+
+# Created on a pool's first use, if missing. The Admin page aggregates over a window of
+# recent visits by hour and by country (visit_stats.py); with both columns in one index
+# those queries read the index alone, never the table, and only the window's slice of
+# it, so their cost follows the window rather than the size of the log.
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_visitor_logs_timestamp_country "
+    "ON visitor_logs (timestamp, country)",
+)
+
+
+class ReadPool:
+    """Up to `size` read-only connections to `db_name`, reused across threads."""
+
+    def __init__(self, db_name, size=POOL_SIZE):
+        self.db_name = str(db_name)
+        self.size = size
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._prepared = False
+        self.opened = 0
+
+    def _prepare(self):
+        """WAL and the indexes, once per process, on a short-lived writable connection."""
+        with self._lock:
+            if self._prepared:
+                return
+            conn = sqlite3.connect(self.db_name, timeout=BUSY_TIMEOUT_SECONDS)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in INDEXES:
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        # A table cotmetrics has not created yet. The next process to
+                        # start will try again; reads work without the index.
+                        utils.cot_logger.warning(f"db pool: {e}")
+                conn.commit()
+            except sqlite3.Error as e:
+                utils.cot_logger.warning(f"db pool: could not switch to WAL: {e}")
+            finally:
+                conn.close()
+            self._prepared = True
+
+    def _open(self):
+        uri = Path(self.db_name).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               timeout=BUSY_TIMEOUT_SECONDS)
+        conn.execute("PRAGMA query_only=1")
+        self.opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """A read connection, returned to the pool when the block ends."""
+        if self._pid != os.getpid():
+            # Forked: the parent's connections are not ours to use or to close.
+            self._pid = os.getpid()
+            self._idle = queue.LifoQueue(maxsize=self.size)
+            self._prepared = False
+        self._prepare()
+        idle = self._idle
+        try:
+            conn = idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        broken = False
+        try:
+            yield conn
+        except (sqlite3.DatabaseError, pd.errors.DatabaseError):
+            # A connection that failed mid-read is not handed to the next caller.
+            broken = True
+            raise
+        finally:
+            if broken:
+                conn.close()
+            else:
+                try:
+                    idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool(db_name=None):
+    """This process's pool for `db_name`, `cotDatabase.db_name` unless given."""
+    if db_name is None:
+        from cotmetrics.database import cotDatabase
+        db_name = cotDatabase.db_name
+    with _pools_lock:
+        if db_name not in _pools:
+            _pools[db_name] = ReadPool(db_name)
+        return _pools[db_name]
+
+
+@contextmanager
+def reader(db_name=None):
+    """`with reader() as conn:` a pooled read-only connection to the app database."""
+    with pool(db_name).connection() as conn:
+        yield conn
@@ -0,0 +1,380 @@
+"""
+export_archive.py
+
+The data downloads, materialised once per COT release and served as static files.
+
+The "CFTC Data" and "Real Test Data" buttons on the Options page used to be Dash
+callbacks that walked every instrument, rendered each frame to CSV and deflated the lot
+into a BytesIO, on every click, for a file that is the same for every reader all week.
+The Positioning page's CSV re-ran `get_positioning_table_by_asset_class` on every click
+as well. Nothing any of them export changes between releases.
+
+So a release is exported once, into a directory under CACHE_DIR/exports named for it:
+
+    <release>/<format>/<kind>/<symbol>_<kind>.<ext>   summary, detailed, real_test
+    <release>/positioning/<lookback>.parquet          every class, the newest report
+    <release>/cftc[_<format>].zip, real_test[...]     what the Options buttons download
+    <release>/manifest.json                           bytes and sha256 of all the above
+
+Each frame is written in every format of `FORMATS`. CSV is what the downloads always
+were. Parquet (zstd) and Arrow IPC keep the dtypes, so a notebook reading them gets
+dates as dates and floats as floats without re-parsing, and both are a fraction of the
+CSV's size and write time; scripts/measure_export_formats.py has the numbers.
+
+The per-instrument frames are rendered on a thread pool. The directory is built under a
+temporary name and renamed into place once the manifest is written, so a reader, or
+another worker process, sees a whole export or none; the previous releases' directories
+are removed after, and only older ones: a newer release is never touched. The export
+runs on a background thread (`start_export`), from the post-release warm-up
+(`release_cache.warm`) and from the first download that finds none. A download never
+waits for it: until the export is there it answers from the indexer as the callbacks
+used to, `archive_bytes` for a ZIP and the positioning query for the table.
+
+Under several gunicorn workers (shared_index.py) the locks are per process, so only the
+refresher builds and prunes. A follower serves the refresher's export once it is there
+for the release the follower is on, and answers from its own indexer until then, or
+while it is a week behind.
+
+`app_cot` serves the ZIPs from a plain Flask route with the manifest's sha256 as the
+ETag, so a repeat download is a 304 and a first one streams from disk.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import cotmetrics.constants as const
+import cotmetrics.utils as utils
+import pandas as pd
+import pyarrow as pa
+
+import options_history
+import release_cache
+import shared_index
+
+EXPORT_DIR = Path(const.CACHE_DIR) / "exports"
+MANIFEST = "manifest.json"
+WORKERS = min(8, os.cpu_count() or 1)
+
+# kind -> the CotIndexer method that produces one instrument's frame of it.
+FRAMES = {
+    "summary": "collect_symbol_summary_results",
+    "detailed": "collect_symbol_detailed_results",
+    "real_test": "create_real_test_event_asset_list",
+}
+
+
+def _to_csv(df, dest):
+    df.to_csv(dest, index=False)
+
+
+def _to_parquet(df, dest):
+    df.to_parquet(dest, index=False, compression="zstd")
+
+
+def _to_arrow(df, dest):
+    # Uncompressed IPC, so a reader can memory-map it; the archive deflates it instead.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_file(dest, table.schema) as writer:
+        writer.write_table(table)
+
+
+# format -> (extension, writer(df, path or binary file), how the archive stores it).
+# Parquet is stored, not deflated: it is zstd already, and deflating it again costs time
+# and saves nothing.
+FORMATS = {
+    "csv": (".csv", _to_csv, zipfile.ZIP_DEFLATED),
+    "parquet": (".parquet", _to_parquet, zipfile.ZIP_STORED),
+    "arrow": (".arrow", _to_arrow, zipfile.ZIP_DEFLATED),
+}
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+
+# archive -> (download name prefix, the kinds it holds, per instrument in this order).
+ARCHIVES = {
+    "cftc": ("COT_Full_Data", ("summary", "detailed")),
+    "real_test": ("COT_Real_Test_Data", ("real_test",)),
+}
+
+_lock = threading.Lock()
+# Held while an export thread is running, so a warm-up that calls once per lookback, or
+# downloads arriving together, start one thread between them.
+_exporting = threading.Lock()
+
+
+def _instruments(indexer):
+    """`(instrument_code, file stem)` for every asset, in the order the archives list them."""
+    out = []
+    for asset_class in sorted(indexer.get_asset_classes()):
+        for asset in indexer.get_assets_for_asset_class(asset_class):
+            stem = indexer.get_instrument_symbol_from_name(asset).replace(' ', '_')
+            out.append((indexer.get_instrument_code_from_name(asset), stem))
+    return out
+
+
+def _release_tag(db_time):
+    return "".join(c for c in str(db_time) if c.isalnum()) or "unknown"
+
+
+def file_name(stem, kind, fmt="csv"):
+    """An instrument's file of `kind`, as it is named inside the archives."""
+    return f"{stem}_{kind}{FORMATS[fmt][0]}"
+
+
+def archive_name(kind, fmt="csv"):
+    """'cftc.zip' for the CSVs, as it always was; 'cftc_parquet.zip' and so on."""
+    return f"{kind}.zip" if fmt == "csv" else f"{kind}_{fmt}.zip"
+
+
+def write_frame(df, dest, fmt):
+    """Write `df` to `dest` (a path or a binary file) as `fmt`."""
+    FORMATS[fmt][1](df, dest)
+
+
+def _write_typed(df, path, fmt):
+    try:
+        write_frame(df, path, fmt)
+    except (TypeError, ValueError, pa.ArrowException) as e:
+        # A column pyarrow cannot type is logged rather than fatal: the CSV of the same
+        # frame is still written, and the archive of this format just goes without it.
+        utils.cot_logger.error(f"export: no {fmt} for {path.name}: {e}")
+        path.unlink(missing_ok=True)
+
+
+def _export_instrument(indexer, root, code, stem):
+    """Write one instrument's files in every format; empty frames write nothing."""
+    for kind, method in FRAMES.items():
+        df = getattr(indexer, method)(code)
+        if df.empty:
+            continue
+        for fmt in FORMATS:
+            path = root / fmt / kind / file_name(stem, kind, fmt)
+            if fmt == "csv":
+                write_frame(df, path, fmt)
+            else:
+                _write_typed(df, path, fmt)
+
+
+# Filled in when the table is read (`positioning_table`), not baked in: the options
+# summaries they come from are rewritten every few hours, the export once a week.
+OPTIONS_COLUMNS = ["Max Pain", "Delta IV"]
+
+
+def _export_positioning(indexer, root, lookback):
+    df = indexer.get_positioning_table_by_asset_class(
+        tuple(indexer.get_asset_classes()), lookback, None)
+    df = df.drop(columns=OPTIONS_COLUMNS, errors="ignore")
+    _write_typed(df.reset_index(drop=True), root / "positioning" / f"{lookback}.parquet",
+                 "parquet")
+
+
+def _write_archive(root, kind, fmt, kinds, instruments):
+    with zipfile.ZipFile(root / archive_name(kind, fmt), "w", FORMATS[fmt][2]) as zf:
+        for _, stem in instruments:
+            for frame_kind in kinds:
+                path = root / fmt / frame_kind / file_name(stem, frame_kind, fmt)
+                if path.exists():
+                    zf.write(path, arcname=path.name)
+
+
+def _digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def write_export(root, indexer, db_time, workers=WORKERS):
+    """Export the release `indexer` is on into the (empty) directory `root`.
+
+    The manifest is written last: a directory without one is not an export.
+    """
+    root = Path(root)
+    for fmt in FORMATS:
+        for kind in FRAMES:
+            (root / fmt / kind).mkdir(parents=True, exist_ok=True)
+    (root / "positioning").mkdir(exist_ok=True)
+
+    instruments = _instruments(indexer)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as pool:
+        jobs = [pool.submit(_export_instrument, indexer, root, code, stem)
+                for code, stem in instruments]
+        jobs += [pool.submit(_export_positioning, indexer, root, lookback)
+                 for lookback in release_cache.LOOKBACKS]
+        for job in jobs:
+            job.result()
+        jobs = [pool.submit(_write_archive, root, name, fmt, kinds, instruments)
+                for name, (_, kinds) in ARCHIVES.items() for fmt in FORMATS]
+        for job in jobs:
+            job.result()
+
+        paths = sorted(p for p in root.rglob("*") if p.is_file())
+        digests = pool.map(_digest, paths)
+        files = {p.relative_to(root).as_posix(): {"bytes": p.stat().st_size, "sha256": d}
+                 for p, d in zip(paths, digests)}
+
+    manifest = {"release": str(db_time), "built": datetime.now().isoformat(timespec="seconds"),
+                "files": files}
+    (root / MANIFEST).write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    return manifest
+
+
+def release_dir(indexer=None, build=True):
+    """This release's export directory, exported first if it is not on disk yet.
+
+    `indexer` is the process's CotIndexer unless one is passed in. With `build` False,
+    or in a worker that is not the refresher, a missing export is None rather than
+    built.
+    """
+    if indexer is None:
+        from cotmetrics.indexer import get_indexer
+        indexer = get_indexer()
+
+    db_time = indexer.last_known_db_time
+    root = EXPORT_DIR / _release_tag(db_time)
+    if (root / MANIFEST).exists():
+        return root
+    if not build or shared_index.following():
+        return None
+    with _lock:
+        if (root / MANIFEST).exists():
+            return root
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        started = datetime.now()
+        partial = Path(tempfile.mkdtemp(dir=EXPORT_DIR, prefix=f".{root.name}_"))
+        try:
+            manifest = write_export(partial, indexer, db_time)
+            if root.exists():
+                # Another process finished first; its export is the same release.
+                shutil.rmtree(partial)
+            else:
+                os.rename(partial, root)
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        size = sum(f["bytes"] for f in manifest["files"].values())
+        utils.cot_logger.info(f"export: {root.name}, {len(manifest['files'])} files, "
+                              f"{size / 1e6:.1f} MB in "
+                              f"{(datetime.now() - started).total_seconds():.1f}s")
+        # The tags are the release timestamps' digits, so they order as releases do.
+        for old in EXPORT_DIR.iterdir():
+            if old.is_dir() and not old.name.startswith(".") and old.name < root.name:
+                shutil.rmtree(old, ignore_errors=True)
+    return root
+
+
+def manifest(indexer=None):
+    """This release's manifest: `{"release", "built", "files": {name: {bytes, sha256}}}`.
+
+    None in a worker that is not the refresher while the release has no export yet.
+    """
+    root = release_dir(indexer)
+    return None if root is None else json.loads((root / MANIFEST).read_text())
+
+
+def artifact(name, indexer=None, build=True):
+    """`(path, sha256)` of the export file `name`, as the manifest lists it.
+
+    Raises KeyError for a name the manifest does not have, which is every name a
+    request could make up: only listed files are ever served. A release not exported
+    yet raises KeyError too, with `build` False or in a worker that may not build it.
+    """
+    root = release_dir(indexer, build)
+    if root is None:
+        raise KeyError(name)
+    entry = json.loads((root / MANIFEST).read_text())["files"][name]
+    return root / name, entry["sha256"]
+
+
+def archive_path(kind, indexer=None, fmt="csv"):
+    """This release's ZIP of `kind` (an `ARCHIVES` key) in `fmt`."""
+    return artifact(archive_name(kind, fmt), indexer)[0]
+
+
+def archive_bytes(kind, indexer=None, fmt="csv"):
+    """The ZIP `archive_path` would serve, built in memory from `indexer`'s frames.
+
+    The fallback for a worker that has no export of its release to serve: what the
+    Options callbacks did on every click, now only in the minutes around a new week.
+    """
+    if indexer is None:
+        from cotmetrics.indexer import get_indexer
+        indexer = get_indexer()
+
+    _, kinds = ARCHIVES[kind]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", FORMATS[fmt][2]) as zf:
+        for code, stem in _instruments(indexer):
+            for frame_kind in kinds:
+                df = getattr(indexer, FRAMES[frame_kind])(code)
+                if df.empty:
+                    continue
+                data = io.BytesIO()
+                try:
+                    write_frame(df, data, fmt)
+                except (TypeError, ValueError, pa.ArrowException) as e:
+                    utils.cot_logger.error(f"export: no {fmt} for {stem} {frame_kind}: {e}")
+                    continue
+                zf.writestr(file_name(stem, frame_kind, fmt), data.getvalue())
+    return buffer.getvalue()
+
+
+def positioning_table(lookback, indexer=None):
+    """The newest report's positioning table for every class, as exported, or None.
+
+    Max Pain and Delta IV are the options summaries' as of now, as the page shows them.
+    Never exports: the caller has a query to fall back on that costs less than a whole
+    export, so a download in the minutes before the warm-up finishes just runs it.
+    """
+    try:
+        path, _ = artifact(f"positioning/{lookback}.parquet", indexer, build=False)
+    except KeyError:
+        return None
+    return options_history.with_max_pain(pd.read_parquet(path))
+
+
+def download_name(kind, fmt="csv"):
+    """What the browser saves an archive as: the kind, the format unless it is CSV, and
+    today's date."""
+    prefix, _ = ARCHIVES[kind]
+    fmt_part = "" if fmt == "csv" else f"_{FORMAT_LABELS[fmt].split()[0]}"
+    return f"{prefix}{fmt_part}_{datetime.now().strftime('%Y-%m-%d')}.zip"
+
+
+def _export_in_background():
+    try:
+        release_dir()
+    except Exception as e:
+        utils.cot_logger.error(f"export: failed: {e}")
+    finally:
+        _exporting.release()
+
+
+def start_export():
+    """Export this release on a thread of its own; True if this call started one.
+
+    False in a follower worker, which never exports, and while an export thread is
+    already running.
+    """
+    if shared_index.following() or not _exporting.acquire(blocking=False):
+        return False
+    threading.Thread(target=_export_in_background, name="release-export",
+                     daemon=True).start()
+    return True
+
+
+def _warm_export(_lookback, _model_key):
+    # On a thread of its own: writing every instrument out takes far longer than any
+    # page's default view, and the warmers registered after this one should not queue
+    # behind it.
+    start_export()
+
+
+release_cache.register_warmer("exports", _warm_export, by_model=False)
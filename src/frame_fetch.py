@@ -0,0 +1,53 @@
+"""
+frame_fetch.py
+
+Load many `get_symbols_data` frames at once, on a bounded pool of threads.
+
+Three pages build one thing per instrument in a loop that reads the instrument's frame
+first: the Asset Graphs stack, the Aggregation sum and the Home board (board_snapshot.py).
+Each of them read serially inside its own loop, so selecting a whole class paid for every
+cold read one after the other, and the overlay view on Asset Graphs paid twice per market.
+A cold read is mostly parquet I/O and pandas work that releases the GIL, so the reads
+overlap well even in one process.
+
+The pool is shared and module-level rather than one per call. A per-call pool bounds
+one callback; this bounds the process, so two readers selecting the Currencies class at
+once cannot put 22 reads on the store together. FETCH_WORKERS is small on purpose: past
+a handful of concurrent reads the store's disk is the bottleneck, not the thread count.
+
+The indexer's own lru_cache still does the caching. This only changes when the misses
+happen, so a warm frame comes back from it exactly as it did before.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import cotmetrics.constants as const
+
+FETCH_WORKERS = 6
+
+_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="frame-fetch")
+
+
+def fetch_frames(keys, indexer=None):
+    """`{(name, lookback, basis): frame}` for every key, fetched concurrently.
+
+    Keys are deduplicated before anything is submitted, so two entries for the same
+    frame cost one read. A frame the indexer has no data for comes back as whatever the
+    indexer returned (None or empty) and callers keep their own handling of that. An
+    exception in any read is raised here, as it would have been from the serial loop.
+    """
+    if indexer is None:
+        from cotmetrics.indexer import get_indexer
+        indexer = get_indexer()
+
+    unique = list(dict.fromkeys(tuple(k) for k in keys))
+    if len(unique) <= 1:
+        return {k: indexer.get_symbols_data(*k) for k in unique}
+
+    futures = {k: _pool.submit(indexer.get_symbols_data, *k) for k in unique}
+    return {k: f.result() for k, f in futures.items()}
+
+
+def fetch_frames_for(names, lookback, basis=const.BASIS_RAW, indexer=None):
+    """`{name: frame}` for one lookback and basis: the shape every page loop needs."""
+    frames = fetch_frames([(n, lookback, basis) for n in names], indexer=indexer)
+    return {n: frames[(n, lookback, basis)] for n in names}
@@ -0,0 +1,209 @@
+"""
+frame_snapshot.py
+
+Every `get_symbols_data` frame of one COT release, written once as Arrow files that any
+process on the machine can map.
+
+In one process the indexer's lru_cache is where the derived frames live: 42 instruments
+x 3 lookbacks x 2 bases, ~2.9 MB each, ~730 MB when the board is warm. Under several
+gunicorn workers (see shared_index.py) that cache would be per worker, so every worker
+would compute every frame it is asked for and hold its own copy of each. Instead one
+process, the elected refresher, computes them once per release and publishes them here,
+and the workers read them back.
+
+    <release>/<n>.arrow       one frame, uncompressed Arrow IPC, so it can be mapped
+    <release>/manifest.json   the release and which file holds which frame
+    current.json              the release to read: written last, replaced atomically
+
+A release is written into a temporary directory and renamed into place, and only then
+does current.json move, so a reader sees a whole snapshot or the previous one. Older
+releases are removed after the pointer has moved; a reader still holding one of their
+files keeps its mapping until it lets go, which is what unlinking a mapped file does.
+
+A read maps the file and converts it to a DataFrame. The mapped pages are the OS page
+cache, shared by every worker; the converted frame is the worker's own, so each worker
+keeps only the frames it is using (`Snapshot.frame`, byte-bounded) rather than every
+frame of the board. Conversion is a copy out of memory already mapped, a few ms a
+frame, where computing the frame is the indexer's whole derivation.
+
+Frames round-trip exactly, index, dtypes and column order included, except for
+`DataFrame.attrs`, which Arrow does not carry; they are kept in the schema metadata and
+put back. A frame Arrow cannot type is left out of the snapshot and logged, and a reader
+asking for it gets None, which callers take to mean "compute it yourself".
+"""
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import cotmetrics.constants as const
+import cotmetrics.models as models
+import cotmetrics.utils as utils
+import pyarrow as pa
+
+import release_cache
+
+SNAPSHOT_DIR = Path(const.CACHE_DIR) / "frame_snapshot"
+MANIFEST = "manifest.json"
+CURRENT = "current.json"
+ATTRS_KEY = b"cot_analyzer.attrs"
+
+# What a worker keeps converted. A page works on one class or one market at a time, so
+# this is a selection's frames with room for a second, not the board.
+FRAME_CACHE_BYTES = 192 * 1024 * 1024
+
+_frames = release_cache.ReleaseCache(
+    "shared frames", max_bytes=FRAME_CACHE_BYTES,
+    weigh=lambda df: int(df.memory_usage(index=True).sum()) if df is not None else 0)
+_pointers = release_cache.ReleaseCache("frame snapshot pointers", maxsize=4)
+
+
+def _release_tag(db_time):
+    return "".join(c for c in str(db_time) if c.isalnum()) or "unknown"
+
+
+def _frame_key(name, lookback, basis):
+    return f"{name}|{lookback}|{basis}"
+
+
+def frame_keys(indexer):
+    """`(name, lookback, basis)` of every frame a page can ask for."""
+    bases = sorted({model.basis for model in models.MODELS})
+    return [(asset, lookback, basis)
+            for ac in indexer.get_asset_classes()
+            for asset in indexer.get_assets_for_asset_class(ac)
+            for lookback in release_cache.LOOKBACKS
+            for basis in bases]
+
+
+def write_frame(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    if df.attrs:
+        meta = dict(table.schema.metadata or {})
+        meta[ATTRS_KEY] = json.dumps(df.attrs, default=str).encode()
+        table = table.replace_schema_metadata(meta)
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_frame(path):
+    """The frame written to `path`, read through a memory map."""
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    df = table.to_pandas()
+    attrs = (table.schema.metadata or {}).get(ATTRS_KEY)
+    if attrs:
+        df.attrs = json.loads(attrs)
+    return df
+
+
+def _replace_text(path, text):
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def write_snapshot(root, indexer, db_time, frame=None):
+    """Write every frame of `indexer` into the (empty) directory `root`; returns the
+    manifest. `frame(name, lookback, basis)` is `indexer.get_symbols_data` unless given.
+    The manifest is written last: a directory without one is not a snapshot.
+    """
+    frame = frame or indexer.get_symbols_data
+    root = Path(root)
+    frames = {}
+    for n, (name, lookback, basis) in enumerate(frame_keys(indexer)):
+        key = _frame_key(name, lookback, basis)
+        df = frame(name, lookback, basis)
+        if df is None:
+            continue
+        path = root / f"{n}.arrow"
+        try:
+            write_frame(df, path)
+        except (TypeError, ValueError, pa.ArrowException) as e:
+            # Left out rather than fatal: a worker computes this one frame itself.
+            utils.cot_logger.error(f"frame snapshot: {key} not written: {e}")
+            path.unlink(missing_ok=True)
+            continue
+        frames[key] = path.name
+
+    manifest = {"release": str(db_time), "built": datetime.now().isoformat(timespec="seconds"),
+                "frames": frames}
+    (root / MANIFEST).write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    return manifest
+
+
+def publish(indexer, frame=None, directory=None):
+    """Publish the release `indexer` is on, unless it already is; returns its directory.
+
+    Run by one process at a time (shared_index holds the refresher's lock around it);
+    the rename and the pointer keep readers safe, not writers from each other.
+    """
+    directory = Path(directory or SNAPSHOT_DIR)
+    db_time = indexer.last_known_db_time
+    root = directory / _release_tag(db_time)
+    if not (root / MANIFEST).exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        started = datetime.now()
+        partial = Path(tempfile.mkdtemp(dir=directory, prefix=f".{root.name}_"))
+        try:
+            manifest = write_snapshot(partial, indexer, db_time, frame=frame)
+            if root.exists():
+                shutil.rmtree(root)
+            os.rename(partial, root)
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        size = sum(p.stat().st_size for p in root.glob("*.arrow"))
+        utils.cot_logger.info(f"frame snapshot: {root.name}, {len(manifest['frames'])} frames, "
+                              f"{size / 1e6:.0f} MB in "
+                              f"{(datetime.now() - started).total_seconds():.1f}s")
+
+    _replace_text(directory / CURRENT, json.dumps({"release": str(db_time), "dir": root.name}))
+    for old in directory.iterdir():
+        if old != root and old.is_dir():
+            shutil.rmtree(old, ignore_errors=True)
+    return root
+
+
+class Snapshot:
+    """One published release, as a reader sees it."""
+
+    def __init__(self, root, manifest):
+        self.root = Path(root)
+        self.release = manifest["release"]
+        self.files = manifest["frames"]
+
+    def frame(self, name, lookback, basis=const.BASIS_RAW):
+        """The frame, or None when the snapshot does not have it."""
+        file = self.files.get(_frame_key(name, lookback, basis))
+        if file is None:
+            return None
+        return _frames.get((self.release, name, lookback, basis),
+                           lambda: read_frame(self.root / file))
+
+
+def current(directory=None):
+    """The Snapshot current.json names, or None when nothing has been published.
+
+    Read again only when the pointer is replaced, so asking on every frame read costs
+    a stat.
+    """
+    directory = Path(directory or SNAPSHOT_DIR)
+    pointer = directory / CURRENT
+    try:
+        st = os.stat(pointer)
+    except FileNotFoundError:
+        return None
+    return _pointers.get((str(pointer), st.st_mtime_ns, st.st_size),
+                         lambda: _read_pointer(directory))
+
+
+def _read_pointer(directory):
+    try:
+        pointer = json.loads((directory / CURRENT).read_text())
+        root = directory / pointer["dir"]
+        manifest = json.loads((root / MANIFEST).read_text())
+    except (OSError, ValueError, KeyError):
+        return None
+    return Snapshot(root, manifest)
@@ -0,0 +1,209 @@
+"""
+grid_pages.py
+
+Pages of rows for an AG Grid on the infinite row model, cut from a read-only frame.
+
+The Raw Data Viewer used to hand the browser an instrument's whole history in one
+`rowData` payload: every row, every column, with every date column re-formatted on the
+way out. That is thousands of rows by a couple of hundred columns, serialised, sent and
+parsed before the grid could draw its first line, and all of it again on every switch
+between instruments. On the infinite row model the grid asks for the block of rows it
+is about to show (`getRowsRequest`: start, end, the sort model and the filter model),
+and the page answers with just that block (`getRowsResponse`).
+
+This module is the answer, and knows nothing about Dash:
+
+  - a `GridView` is the frame as the grid shows it, prepared once: dates as ISO
+    strings and a plain index. It is a private copy, so a view a page caches cannot be
+    edited by whoever handed the frame in, and it hands out copies of rows only;
+  - `get_rows(view, request)` filters and sorts it the way the grid's models say and
+    returns the requested slice. The row order for one sort and filter is kept on the
+    view, so the grid scrolling on through it pays for a slice and nothing else.
+
+Sorting and filtering follow the grid's own client-side behaviour closely enough that
+switching row models changes nothing a reader can see: text filters are case-blind,
+blanks sort last, and a column that is not in the view is ignored rather than an error.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# What the grid asks for at a time; the page sets its cacheBlockSize from this.
+BLOCK_ROWS = 100
+
+# Row orders kept per view, for the sort and filter models readers have asked for.
+ORDERS_PER_VIEW = 8
+
+
+class GridView:
+    """One frame as the grid shows it, with the row orders readers have asked of it."""
+
+    def __init__(self, df):
+        # ISO dates sort as strings exactly as they do as dates, so the grid's sort on
+        # them needs no special case.
+        frame = df.reset_index(drop=True).copy()
+        for col in frame.select_dtypes(include=["datetime64", "datetimetz"]).columns:
+            frame[col] = frame[col].dt.strftime(DATE_FORMAT)
+        self._frame = frame
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frame)
+
+    @property
+    def columns(self):
+        return list(self._frame.columns)
+
+    def column_defs(self):
+        """A column definition per column, with the filter its dtype calls for."""
+        return [{"field": col,
+                 "filter": ("agNumberColumnFilter"
+                            if pd.api.types.is_numeric_dtype(values)
+                            and not pd.api.types.is_bool_dtype(values)
+                            else "agTextColumnFilter")}
+                for col, values in self._frame.items()]
+
+    def row_order(self, sort_model=None, filter_model=None):
+        """Positions of the rows that pass the filter, in the sort's order.
+
+        Kept for the last ORDERS_PER_VIEW models, so scrolling on through one sort and
+        filter costs a slice.
+        """
+        key = repr((sort_model or [], sorted((filter_model or {}).items())))
+        with self._lock:
+            if key in self._orders:
+                self._orders.move_to_end(key)
+                return self._orders[key]
+
+        frame = self._frame
+        order = np.flatnonzero(filter_mask(frame, filter_model))
+        sort = [s for s in (sort_model or []) if s.get("colId") in frame.columns]
+        if sort and len(order):
+            rows = frame.iloc[order].sort_values(
+                by=[s["colId"] for s in sort],
+                ascending=[s.get("sort") != "desc" for s in sort],
+                kind="stable", na_position="last")
+            order = rows.index.to_numpy()
+
+        with self._lock:
+            self._orders[key] = order
+            while len(self._orders) > ORDERS_PER_VIEW:
+                self._orders.popitem(last=False)
+        return order
+
+    def rows(self, positions):
+        """The rows at `positions` as records, NaN as None, since NaN is not JSON."""
+        block = self._frame.iloc[positions]
+        return block.astype(object).where(block.notna(), None).to_dict("records")
+
+
+def _text_condition(values, condition):
+    kind = condition.get("type")
+    if kind == "blank":
+        return values.isna() | (values.astype(str) == "")
+    if kind == "notBlank":
+        return values.notna() & (values.astype(str) != "")
+    text = values.astype(str).str.lower().where(values.notna())
+    needle = str(condition.get("filter", "")).lower()
+    if kind == "equals":
+        mask = text == needle
+    elif kind == "notEqual":
+        mask = text != needle
+    elif kind == "startsWith":
+        mask = text.str.startswith(needle)
+    elif kind == "endsWith":
+        mask = text.str.endswith(needle)
+    elif kind == "notContains":
+        mask = ~text.str.contains(needle, regex=False).astype("boolean")
+    else:  # "contains", the grid's default
+        mask = text.str.contains(needle, regex=False)
+    # A blank cell contains nothing, so it passes notContains and fails the rest.
+    return mask.astype("boolean").fillna(kind == "notContains").astype(bool)
+
+
+def _number_condition(values, condition):
+    kind = condition.get("type")
+    values = pd.to_numeric(values, errors="coerce")
+    if kind == "blank":
+        return values.isna()
+    if kind == "notBlank":
+        return values.notna()
+    value = condition.get("filter")
+    if value is None:
+        return pd.Series(True, index=values.index)
+    value = float(value)
+    if kind == "notEqual":
+        return values != value
+    if kind == "lessThan":
+        return values < value
+    if kind == "lessThanOrEqual":
+        return values <= value
+    if kind == "greaterThan":
+        return values > value
+    if kind == "greaterThanOrEqual":
+        return values >= value
+    if kind == "inRange":
+        return (values >= value) & (values <= float(condition.get("filterTo", value)))
+    return values == value
+
+
+def _date_condition(values, condition):
+    # The view holds ISO strings, and the grid sends 'YYYY-MM-DD hh:mm:ss'.
+    kind = condition.get("type")
+    if kind in ("blank", "notBlank"):
+        return _text_condition(values, condition)
+    dated = values.notna()
+    values = values.where(dated, "").astype(str)
+    low = str(condition.get("dateFrom") or "")[:10]
+    if kind == "inRange":
+        mask = (values >= low) & (values <= str(condition.get("dateTo") or low)[:10])
+    elif kind == "lessThan":
+        mask = values < low
+    elif kind == "greaterThan":
+        mask = values > low
+    elif kind == "notEqual":
+        mask = values != low
+    else:
+        mask = values == low
+    return mask & dated
+
+
+_CONDITIONS = {"text": _text_condition, "number": _number_condition,
+               "date": _date_condition}
+
+
+def _column_mask(values, model):
+    """One column's filter model, simple or combined, as a boolean Series."""
+    test = _CONDITIONS.get(model.get("filterType"), _text_condition)
+    conditions = model.get("conditions")
+    if conditions is None and "condition1" in model:
+        # The pre-v29 shape of a combined filter.
+        conditions = [model["condition1"], model["condition2"]]
+    if conditions is None:
+        return test(values, model)
+    masks = [test(values, c) for c in conditions]
+    combine = np.logical_or if model.get("operator") == "OR" else np.logical_and
+    return pd.Series(combine.reduce(masks), index=values.index)
+
+
+def filter_mask(df, filter_model):
+    """A boolean array over `df`'s rows for the grid's filter model."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, model in (filter_model or {}).items():
+        if col in df.columns:
+            mask &= _column_mask(df[col], model).to_numpy(dtype=bool)
+    return mask
+
+
+def get_rows(view, request):
+    """`{"rowData", "rowCount"}` for one `getRowsRequest` against `view`."""
+    request = request or {}
+    order = view.row_order(request.get("sortModel"), request.get("filterModel"))
+    start = max(0, int(request.get("startRow") or 0))
+    end = int(request.get("endRow") or start + BLOCK_ROWS)
+    return {"rowData": view.rows(order[start:end]), "rowCount": int(len(order))}
@@ -0,0 +1,150 @@
+"""
+log_tail.py
+
+The last lines of a growing log file, kept up to date by reading only what was added.
+
+The Admin page's log viewer re-read the main log from its first byte on every refresh,
+every 30 seconds per open tab, to keep its last 100 lines: the cost of a tick was the
+size of the file, which the rotating handler lets reach megabytes. A `LogTail` instead
+remembers where it stopped (a byte offset) and which file it stopped in (device and
+inode), and on each `poll`:
+
+  - reads nothing if the file has not grown;
+  - reads only the appended bytes if it has;
+  - starts over from the end if the file at the path is a different one (the handler
+    rotated it) or is shorter than the offset (something truncated it). Starting over
+    reads backwards from the end in BLOCK_BYTES steps until it has the last n lines, so
+    the first read costs the tail, not the file. On a rotation, the end of the file that
+    was rotated away is read first if it is still at `<path>.1`, so lines written just
+    before the rotation are not skipped.
+
+It also numbers the lines, so a reader can ask for only the lines after the last one it
+was given (`since`), and the page sends the browser those rather than the whole tail
+each tick. The numbering restarts under a new `generation` whenever the tail starts
+over, which tells a reader holding an old number to take the whole tail instead. A
+generation is a random token rather than a counter, so a number handed out by one
+worker process is never mistaken for one of another's.
+
+One LogTail per path per process, from `for_path`, shared by every tab.
+"""
+import os
+import threading
+import uuid
+from collections import deque
+
+BLOCK_BYTES = 64 * 1024
+
+
+class LogTail:
+    """The last `n` complete lines of the file at `path`."""
+
+    def __init__(self, path, n=100):
+        self.path = str(path)
+        self.n = n
+        self._lock = threading.Lock()
+        self._file_id = None
+        self._offset = 0
+        self._partial = b""
+        self._lines = deque(maxlen=n)
+        self._count = 0          # lines appended since the generation started
+        self.generation = None
+        self.bytes_read = 0
+
+    def _take(self, data):
+        """Append the complete lines in `data`; keep an unfinished last line for later."""
+        parts = (self._partial + data).split(b"\n")
+        self._partial = parts.pop()
+        for line in parts:
+            self._lines.append(line.decode("utf-8", "replace") + "\n")
+        self._count += len(parts)
+
+    def _read(self, f, start, end):
+        f.seek(start)
+        data = f.read(end - start)
+        self.bytes_read += len(data)
+        return data
+
+    def _tail_bytes(self, f, size):
+        """At least the last n lines ending at `size`, read backwards in blocks."""
+        pos, data = size, b""
+        while pos > 0 and data.count(b"\n") <= self.n:
+            step = min(BLOCK_BYTES, pos)
+            data = self._read(f, pos - step, pos) + data
+            pos -= step
+        if pos > 0:
+            # Started mid-line; the first line is not whole.
+            data = data.split(b"\n", 1)[1]
+        return data
+
+    def _rotated_remainder(self):
+        """What was appended to the old file after the last poll, if it was rotated to
+        `<path>.1` and is still there; else nothing."""
+        old = self.path + ".1"
+        try:
+            st = os.stat(old)
+            if (st.st_dev, st.st_ino) != self._file_id or st.st_size <= self._offset:
+                return b""
+            with open(old, "rb") as f:
+                return self._read(f, self._offset, st.st_size)
+        except OSError:
+            return b""
+
+    def poll(self):
+        """Catch up with the file. Raises FileNotFoundError if there is none."""
+        with self._lock:
+            with open(self.path, "rb") as f:
+                # The open file's, not the path's: a rotation between the two would
+                # pair one file's identity with the other's bytes.
+                st = os.fstat(f.fileno())
+                file_id = (st.st_dev, st.st_ino)
+                if file_id == self._file_id and st.st_size >= self._offset:
+                    if st.st_size > self._offset:
+                        self._take(self._read(f, self._offset, st.st_size))
+                        self._offset = st.st_size
+                    return
+                rotated = self._file_id is not None and file_id != self._file_id
+                if rotated:
+                    self._take(self._rotated_remainder())
+                # Across a rotation the new file starts empty, or nearly, so the old
+                # file's last lines stay in front of it rather than blanking the viewer.
+                carried = list(self._lines) if rotated else []
+                self._file_id = file_id
+                self.generation = uuid.uuid4().hex[:12]
+                self._lines.clear()
+                self._lines.extend(carried)
+                self._count = len(carried)
+                self._partial = b""
+                self._take(self._tail_bytes(f, st.st_size))
+                self._offset = st.st_size
+
+    def text(self):
+        with self._lock:
+            return "".join(self._lines)
+
+    def since(self, generation, count):
+        """`(generation, count, lines, whole)`: the lines after the reader's `count`.
+
+        `whole` is True when the reader cannot be brought up to date by appending, either
+        because its numbering is from another generation or because more lines came in
+        than the tail still holds; `lines` is then the whole tail.
+        """
+        with self._lock:
+            behind = self._count - count if count is not None else None
+            if (generation != self.generation or behind is None
+                    or not 0 <= behind <= len(self._lines)):
+                return self.generation, self._count, list(self._lines), True
+            lines = list(self._lines)[len(self._lines) - behind:] if behind else []
+            return self.generation, self._count, lines, False
+
+
+_tails = {}
+_tails_lock = threading.Lock()
+
+
+def for_path(path, n=100):
+    """This process's LogTail of `path`."""
+    key = (str(path), n)
+    with _tails_lock:
+        if key not in _tails:
+            _tails[key] = LogTail(path, n)
+        return _tails[key]
@@ -73,10 +73,16 @@ def store_poll_loop():
     only when refresh_if_stale returns True, because a browser tab's navbar poll can
     win that race and consume the True, and an email that depends on who happened to
     poll first is an email that goes missing on a busy Friday.
+
+    Under --workers every worker runs one, and each tick asks shared_index who it is.
+    The refresher does all of the above and publishes the week's frames; the others
+    only move to what it has published, and never send the email. A worker that finds
+    the refresher's lease free on a tick (the refresher died) becomes the refresher.
     """
     from cotmetrics.database import cotDatabase
-    from cotmetrics.indexer import get_indexer
 
+    import release_cache
+    import shared_index
     import weekly_email_trigger
 
     # The pid is here because which process this lands in is the whole correctness
@@ -87,9 +93,22 @@ def store_poll_loop():
     while True:
         time.sleep(STORE_POLL_SECONDS)
         try:
-            if get_indexer().refresh_if_stale():
+            if shared_index.active() and not shared_index.try_lead():
+                if release_cache.refresh_if_stale():
+                    utils.cot_logger.info("Store poller: adopted the published COT week.")
+                continue
+
+            # Through release_cache rather than the indexer directly, so the page caches
+            # are emptied in the same step the indexer moves to the new week, and the
+            # default views are rebuilt behind it before the first visitor asks for one.
+            if release_cache.refresh_if_stale():
                 utils.cot_logger.info("Store poller: picked up a new COT week.")
 
+            # The refresher's retry: the publish after a rebuild runs on the warm-up
+            # thread, and one that failed there is tried again here. A no-op once the
+            # week is out, and in the single-process mode.
+            shared_index.publish()
+
             # After the refresh, never before: refresh_if_stale blocks until the index
             # matches the store, so by here the matrix the email builds is the new
             # week's rather than a mix.
@@ -130,6 +149,17 @@ def daily_options_update_scheduler():
             except Exception as e:
                 utils.cot_logger.error(f"Scheduled update failed: {e}")
 
+            # After every refresh, even a failed one: whatever histories it did append
+            # to get summaries, so the options panels and the Positioning table read
+            # those rather than summarising the curves on a request. Its own try, so a
+            # summary failure is never reported as the refresh failing.
+            try:
+                import options_history
+                index = options_history.write_summaries()
+                utils.cot_logger.info(f"Options summaries written for {len(index)} symbols.")
+            except Exception as e:
+                utils.cot_logger.error(f"Options summaries not written: {e}")
+
             # Sleep for 3 hours before checking/polling again
             sleep_seconds = 3 * 3600
         else:
@@ -141,6 +171,56 @@ def daily_options_update_scheduler():
         time.sleep(sleep_seconds)
 
 
+# gthread workers: a worker serves this many requests at once, as the dev server's
+# threads did. Callbacks that sweep the board can take minutes on a cold release, so the
+# timeout is the rebuild's, not a web request's.
+WORKER_THREADS = 4
+WORKER_TIMEOUT = 300
+
+
+def serve_workers(port, workers):
+    """Serve the app from `workers` gunicorn workers, sharing one index (shared_index.py).
+
+    The master never imports the app or builds an indexer; it forks and supervises.
+    Before it starts, one child process brings the index up to date and publishes the
+    week's frames, so a cold cache is rebuilt once rather than by every worker at once
+    and each worker boots onto a published snapshot. Each worker then enters the shared
+    mode and starts its own store poller, as the single process does.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    import shared_index
+
+    started = time.time()
+    prepare = multiprocessing.Process(target=shared_index.prepare, name="shared-index-prepare")
+    prepare.start()
+    prepare.join()
+    if prepare.exitcode:
+        # Not fatal: the refresher publishes on its first tick, and until then each
+        # worker computes the frames it is asked for as the single process would.
+        utils.cot_logger.error(f"Shared index: prepare exited {prepare.exitcode}.")
+    else:
+        utils.cot_logger.info(f"Shared index: published in {time.time() - started:.1f}s.")
+
+    def post_fork(server, worker):
+        shared_index.start_worker()
+        threading.Thread(target=store_poll_loop, name="store-poller", daemon=True).start()
+
+    class CotAnalyzer(BaseApplication):
+        def load_config(self):
+            for key, value in {"bind": f"0.0.0.0:{port}", "workers": workers,
+                               "worker_class": "gthread", "threads": WORKER_THREADS,
+                               "timeout": WORKER_TIMEOUT, "post_fork": post_fork}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app_cot import server
+            return server
+
+    utils.cot_logger.info(f"Serving on port {port} from {workers} workers.")
+    CotAnalyzer().run()
+
+
 #: How old the newest bar may be before the price store is called stale. Seven days
 #: covers a weekend plus a holiday. There is no store-side default for this on
 #: purpose: bars only move on trading days, so the number is the deployment's to
@@ -305,12 +385,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="COT Analyzer")
     parser.add_argument("--debug", action="store_true", help="Launch in debug mode (enables Dash debug server)")
     parser.add_argument("--fast", action="store_true", help="Skip data checks and updates on boot for faster startup")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("COT_ANALYZER_WORKERS", "1")),
+                        help="Serve from this many gunicorn workers sharing one index (default 1: the Dash server)")
     args, unknown = parser.parse_known_args()
 
     dash_debug = False
     if args.debug:
         utils.cot_logger.warning("Running in DEBUG mode.")
         dash_debug = True
+        if args.workers > 1:
+            # The reloader and the debugger are the Dash server's; gunicorn has neither.
+            utils.cot_logger.warning("--workers is ignored under --debug.")
+            args.workers = 1
 
     # Check if we are in the Werkzeug reloader child process
     is_reloader = os.environ.get("WERKZEUG_RUN_MAIN") == "true"
@@ -336,6 +422,13 @@ if __name__ == "__main__":
                 utils.cot_logger.info("Eagerly validating options cache on boot (prices come from the marketdata store)...")
                 from cotmetrics.indexer import boot_options_update
                 boot_options_update()
+                # The boot refresh writes histories and no summaries; without this the
+                # readers summarise the curves themselves until the evening window.
+                try:
+                    import options_history
+                    options_history.write_summaries()
+                except Exception as e:
+                    utils.cot_logger.error(f"Options summaries not written: {e}")
             else:
                 utils.cot_logger.info("[FAST BOOT] Skipping eager cache validation.")
 
@@ -366,18 +459,23 @@ if __name__ == "__main__":
         # and this costs nothing at boot: it sleeps first, then does one small JSON
         # read every 5 minutes. Skipping it would hand a --fast run the stale-data bug
         # this exists to close.
-        serves_requests = is_reloader or not dash_debug
+        #
+        # Under --workers this process serves nothing: each worker starts its own
+        # poller (serve_workers), for the same reason.
+        serves_requests = (is_reloader or not dash_debug) and args.workers <= 1
         if serves_requests:
             threading.Thread(
                 target=store_poll_loop, name="store-poller", daemon=True
             ).start()
 
-        from app_cot import app
-
         try:
             start_time = time.time()
             port = os.getenv('PORT', '5001')
-            app.run(host="0.0.0.0", port=port, debug=dash_debug)
+            if args.workers > 1:
+                serve_workers(port, args.workers)
+            else:
+                from app_cot import app
+                app.run(host="0.0.0.0", port=port, debug=dash_debug)
             utils.cot_logger.info(f"app.run took: {time.time() - start_time:.2f}s")
         except KeyboardInterrupt:
             utils.cot_logger.warning(
@@ -0,0 +1,302 @@
+"""
+options_history.py
+
+The options max-pain history of one symbol, read once per version of its file and
+summarised per day.
+
+Both options panels (components/plot_options.py) used to read the symbol's whole
+`{symbol}_options_history.parquet` on every render, then walk its dates one at a time,
+each step a boolean filter over the whole frame and a sort of what it kept. That is
+dates x rows per render, twice on a page that shows both panels, and the history only
+grows: the daily job appends a 200-point curve per day and never drops one.
+
+Here the file is read once per (path, mtime, size), with only the columns the panels
+draw, and sorted once by date and strike. That makes each day's curve a contiguous run
+of rows, so one pass over the runs gives every day's minimum, and the intrinsic value at
+the underlying is one interpolation done for all days at once (`_interp_runs`). The
+result is `summary`, one row per day, which the premium/discount panel draws as it
+stands and the curve panel slices its last days out of without filtering.
+
+The file is keyed by its stamp rather than by release: the daily job rewrites it
+(write-then-rename, so a stamp never names a half-written file) at its own times, not
+the COT store's. Old stamps are left to age out of the LRU.
+
+Max pain here is the minimum of the stored curve, as the panels have always drawn it.
+The summary also carries the figures cotmetrics reports off the `MaxPainStrike` column
+(the minimum snapped to a strike the chain lists) as ListedMaxPain and ListedDeltaIV,
+which are what the Positioning table has always shown (`max_pain_at`).
+
+The summaries are also written to disk (`write_summaries`), by the options scheduler in
+main.py after every refresh: one `{symbol}_options_summary.parquet` per symbol and an
+INDEX_FILE over the universe, under SUMMARY_DIR. A reader of the premium/discount panel
+or the table then reads a few hundred rows rather than the curves (`summary_for_symbol`).
+The index records the stamp of the history each summary was made from; a summary whose
+history has been rewritten since (the boot-time refresh writes histories without
+summaries) is passed over for a summary made here from the history itself.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import cotmetrics.constants as const
+import cotmetrics.utils as utils
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from release_cache import ReleaseCache
+
+# What the panels draw. Anything else in the file is not read. MaxPainStrike is read
+# when the file has it: snapshots from before cotmetrics wrote it do not.
+COLUMNS = ["Date", "Expiry", "UnderlyingPrice", "SimulatedStrike", "IntrinsicValue_M"]
+LISTED = "MaxPainStrike"
+
+SUMMARY_COLUMNS = ["Date", "Expiry", "UnderlyingPrice", "MaxPain", "MinIV", "CurrentIV",
+                   "DeltaIV", "PremiumPct", "ListedMaxPain", "ListedDeltaIV"]
+
+SUMMARY_DIR = Path(const.CACHE_DIR) / "options_summary"
+INDEX_FILE = "options_summary_index.parquet"
+
+# How far from a report date a snapshot may be and still stand for it in the table, as
+# in cotmetrics' get_max_pain_for_symbol: COT reports land about ten days apart.
+NEAREST_DAYS = 14
+
+_histories = ReleaseCache("options histories", maxsize=48)
+
+
+@dataclass(frozen=True)
+class OptionsHistory:
+    """A symbol's curves, sorted by date then strike, and one summary row per date.
+
+    `summary` has SUMMARY_COLUMNS: MaxPain and MinIV (the curve's minimum), CurrentIV
+    (the curve at the underlying), DeltaIV, PremiumPct and the Listed pair (NaN on days
+    without a usable underlying). Made from the curves, it also has `start`/`stop`, the
+    day's run of rows in `curves`; read from a summary file, there are no curves.
+    """
+    curves: pd.DataFrame
+    summary: pd.DataFrame
+
+    def curve(self, i):
+        """The curve of the summary's `i`-th date."""
+        row = self.summary.iloc[i]
+        return self.curves.iloc[row["start"]:row["stop"]]
+
+
+def history_path(symbol):
+    """Where cotmetrics keeps `symbol`'s curve history, legacy location included."""
+    from cotmetrics.options_data import options_history_dir
+    return options_history_dir() / f"{symbol}_options_history.parquet"
+
+
+def summary_path(symbol, directory=None):
+    return Path(directory or SUMMARY_DIR) / f"{symbol}_options_summary.parquet"
+
+
+def _stamp(path):
+    """`(path, mtime_ns, size)`, or None if there is no file."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return str(path), st.st_mtime_ns, st.st_size
+
+
+def _interp_runs(x, xp, fp, starts, stops):
+    """`np.interp(x[k], xp[run k], fp[run k])` for every run at once.
+
+    `xp` is ascending within each run. The same clamping at either end as np.interp.
+    """
+    runs = np.repeat(np.arange(len(starts)), stops - starts)
+    # Points at or below each run's x: how far into the run the bracket is.
+    below = np.bincount(runs, weights=xp <= x[runs], minlength=len(starts)).astype(int)
+    hi = np.minimum(starts + below, stops - 1)
+    lo = np.maximum(starts + below - 1, starts)
+    span = xp[hi] - xp[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(span > 0, (x - xp[lo]) / span, 0.0)
+    return fp[lo] + t * (fp[hi] - fp[lo])
+
+
+def summarise(df):
+    """`OptionsHistory` of a history frame with at least COLUMNS."""
+    curves = df[[c for c in COLUMNS + [LISTED] if c in df.columns]]
+    curves = curves.dropna(subset=["SimulatedStrike", "IntrinsicValue_M"])
+    curves = curves.sort_values(["Date", "SimulatedStrike"], kind="stable",
+                                ignore_index=True)
+    if curves.empty:
+        return OptionsHistory(curves, pd.DataFrame(columns=SUMMARY_COLUMNS + ["start", "stop"]))
+
+    dates = curves["Date"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+    stops = np.r_[starts[1:], len(curves)]
+    strike = curves["SimulatedStrike"].to_numpy(dtype=float)
+    iv = curves["IntrinsicValue_M"].to_numpy(dtype=float)
+
+    # First minimum of each run, as idxmin over a strike-sorted day.
+    lowest = np.minimum.reduceat(iv, starts)
+    is_low = iv == np.repeat(lowest, stops - starts)
+    at = np.flatnonzero(is_low)
+    argmin = at[np.searchsorted(at, starts)]
+
+    underlying = curves["UnderlyingPrice"].to_numpy(dtype=float)[starts]
+    max_pain = strike[argmin]
+    current_iv = np.where(np.isfinite(underlying),
+                          _interp_runs(underlying, strike, iv, starts, stops), np.nan)
+    usable = np.isfinite(underlying) & (underlying != 0)
+
+    # As cotmetrics reads it: the stored strike, else the curve's minimum, with both
+    # payouts interpolated on the curve.
+    listed = (curves[LISTED].to_numpy(dtype=float)[starts] if LISTED in curves
+              else np.full(len(starts), np.nan))
+    listed = np.where(np.isnan(listed), max_pain, listed)
+    listed_iv = _interp_runs(listed, strike, iv, starts, stops)
+    summary = pd.DataFrame({
+        "Date": dates[starts],
+        "Expiry": curves["Expiry"].to_numpy()[starts],
+        "UnderlyingPrice": underlying,
+        "MaxPain": max_pain,
+        "MinIV": iv[argmin],
+        "CurrentIV": current_iv,
+        "DeltaIV": current_iv - iv[argmin],
+        "PremiumPct": np.where(usable, (underlying - max_pain) / max_pain * 100, np.nan),
+        "ListedMaxPain": np.where(usable, listed, np.nan),
+        "ListedDeltaIV": np.where(usable, current_iv - listed_iv, np.nan),
+        "start": starts,
+        "stop": stops,
+    })
+    return OptionsHistory(curves, summary)
+
+
+def load(path):
+    """The `OptionsHistory` of the parquet at `path`, or None if there is no file.
+
+    A file that cannot be read raises, as `pd.read_parquet` would.
+    """
+    key = _stamp(path)
+    if key is None:
+        return None
+    return _histories.get(key, lambda: summarise(_read_history(path)))
+
+
+def _read_history(path):
+    names = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=[c for c in COLUMNS + [LISTED] if c in names])
+
+
+def for_symbol(symbol):
+    """`load` of `symbol`'s history."""
+    return load(history_path(symbol))
+
+
+# ── the summary files ──────────────────────────────────────────────────────────
+
+def _replace(df, path):
+    """Write-then-rename, so a reader never sees half a file."""
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    df.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+def write_summaries(directory=None, histories=None):
+    """Write every symbol's summary and the index over them; returns the index.
+
+    `histories` is the history directory, cotmetrics' unless given. Each history is
+    stat'ed before it is read, so the stamp the index records is never newer than the
+    bytes the summary was made from. The index goes last: a reader that finds a symbol
+    in it with the history's current stamp knows that symbol's summary is on disk.
+    """
+    directory = Path(directory or SUMMARY_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    if histories is None:
+        from cotmetrics.options_data import options_history_dir
+        histories = options_history_dir()
+
+    rows = []
+    for path in sorted(Path(histories).glob("*_options_history.parquet")):
+        symbol = path.name[:-len("_options_history.parquet")]
+        try:
+            stamp = _stamp(path)
+            summary = summarise(_read_history(path)).summary[SUMMARY_COLUMNS]
+            _replace(summary, summary_path(symbol, directory))
+        except Exception as e:
+            # One bad history costs its own summary; readers fall back to the history.
+            utils.cot_logger.error(f"options summary for {symbol} not written: {e}")
+            continue
+        latest = summary.iloc[-1].to_dict() if len(summary) else {}
+        rows.append({"Symbol": symbol, **latest, "Days": len(summary),
+                     "HistoryMtimeNs": stamp[1], "HistorySize": stamp[2]})
+
+    index = pd.DataFrame(rows, columns=["Symbol"] + SUMMARY_COLUMNS
+                         + ["Days", "HistoryMtimeNs", "HistorySize"])
+    _replace(index, directory / INDEX_FILE)
+    return index
+
+
+def _index(directory=None):
+    path = Path(directory or SUMMARY_DIR) / INDEX_FILE
+    key = _stamp(path)
+    if key is None:
+        return None
+    return _histories.get(key, lambda: pd.read_parquet(path).set_index("Symbol"))
+
+
+def summary_for_symbol(symbol, directory=None):
+    """`symbol`'s OptionsHistory for drawing from its summary alone, or None.
+
+    From the summary file when the index says it was made from the history as it is
+    now; otherwise from the history (`for_symbol`), as if there were no summary files.
+    """
+    history = _stamp(history_path(symbol))
+    if history is None:
+        return None
+    index = _index(directory)
+    if index is not None and symbol in index.index:
+        made_from = (index.at[symbol, "HistoryMtimeNs"], index.at[symbol, "HistorySize"])
+        path = summary_path(symbol, directory)
+        key = _stamp(path)
+        if made_from == history[1:] and key is not None:
+            return OptionsHistory(None, _histories.get(key, lambda: pd.read_parquet(path)))
+    return load(history[0])
+
+
+def max_pain_at(symbol, date=None, directory=None):
+    """`{"max_pain", "delta_iv", "current_price"}` for the snapshot nearest `date`.
+
+    The latest snapshot when `date` is None, else the nearest within NEAREST_DAYS (the
+    later of two equally near), as cotmetrics' get_max_pain_for_symbol picks it; None
+    when there is none or it has no usable underlying.
+    """
+    history = summary_for_symbol(symbol, directory)
+    if history is None or history.summary.empty:
+        return None
+    summary = history.summary
+    if date is None:
+        row = summary.iloc[-1]
+    else:
+        away = (pd.to_datetime(summary["Date"]).dt.normalize()
+                - pd.Timestamp(date).normalize()).abs().dt.days
+        if away.min() > NEAREST_DAYS:
+            return None
+        row = summary[away == away.min()].iloc[-1]
+    if pd.isna(row["ListedMaxPain"]):
+        return None
+    return {"max_pain": float(row["ListedMaxPain"]), "delta_iv": float(row["ListedDeltaIV"]),
+            "current_price": float(row["UnderlyingPrice"])}
+
+
+def with_max_pain(df):
+    """`df`, a positioning table, with Max Pain and Delta IV from `max_pain_at`.
+
+    cotmetrics' `get_positioning_table_by_asset_class` fills both columns itself, through
+    get_max_pain_for_symbol, which reads each symbol's whole history and caches the
+    answer for three hours. That lookup still runs when the table is built (the method
+    is lru_cached per release, so once) and there is no way to build the table without
+    it, so the summaries do not make a cold table any cheaper. What this buys is
+    agreement: the page and the exported table both show the snapshot the options
+    panels draw, rather than one up to three hours old.
+    """
+    df = df.copy()
+    picks = [max_pain_at(symbol, date) for symbol, date in zip(df[const.SYMBOL], df[const.DATE])]
+    df["Max Pain"] = [p["max_pain"] if p else None for p in picks]
+    df["Delta IV"] = [p["delta_iv"] if p else None for p in picks]
+    return df
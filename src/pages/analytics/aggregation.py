@@ -4,6 +4,7 @@ import cotmetrics.constants as const
 import cotmetrics.utils as utils
 import dash
 import dash_bootstrap_components as dbc
+import numpy as np
 import pandas as pd
 from cotmetrics.indexer import get_indexer
 from dash import Input, Output, State, callback, clientside_callback, dcc, html, no_update
@@ -11,6 +12,8 @@ from dash import Input, Output, State, callback, clientside_callback, dcc, html,
 import app_utils
 import components.plot_helpers as helpers
 import components.plot_registry as registry
+import frame_fetch
+import release_cache
 import viz_config
 import viz_constants as vc
 
@@ -202,6 +205,89 @@ def set_default_columns(pathname, current_val):
     return new_val
 
 
+# What the page draws, and how each column combines across markets. Positions and open
+# interest are contract counts, so they add; the oscillators are each market measured
+# against its own history, so the only meaningful combination is an average.
+SUM_COLUMNS = (const.COMM_NET, const.LARGE_NET, const.SMALL_NET, const.OPEN_INTEREST)
+MEAN_COLUMNS = ((const.COMMS_ZSCORE, 4), (const.LRG_ZSCORE, 4), (const.SML_ZSCORE, 4),
+                (const.OI_ZSCORE, 4),
+                (const.COMMS_IDX, 0), (const.LRG_IDX, 0), (const.SML_IDX, 0))
+PCT_OI_COLUMNS = ((const.COMM_PCT_OI, const.COMM_NET), (const.LARGE_PCT_OI, const.LARGE_NET),
+                  (const.SMALL_PCT_OI, const.SMALL_NET))
+
+
+def aggregate_frames(frames):
+    """One frame of summed positions and averaged oscillators across `frames`.
+
+    This used to copy every frame, tag it with an Asset column, `pd.concat` the lot and
+    run a separate `groupby(level=0)` per output column. That is eleven passes over a
+    frame of markets x weeks rows, most of it spent hashing dates that are the same
+    Tuesday for every market. Here the markets are aligned on report date once, into
+    one preallocated (column, market, week) block, and every reduction is a single NumPy
+    call along the market axis.
+
+    The result matches the groupby it replaces, including its edges: weeks come out in
+    date order over the union of every market's history; a sum skips markets missing
+    that week and is 0 where none report; a mean skips them too and is NaN where none
+    report.
+    """
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return None
+
+    dates = frames[0].index
+    for df in frames[1:]:
+        dates = dates.union(df.index)
+    dates = dates.sort_values()
+
+    columns = list(SUM_COLUMNS) + [col for col, _ in MEAN_COLUMNS]
+    block = np.full((len(columns), len(frames), len(dates)), np.nan)
+    for i, df in enumerate(frames):
+        at = dates.get_indexer(df.index)
+        for j, col in enumerate(columns):
+            if col in df.columns:
+                block[j, i, at] = df[col].to_numpy(dtype=float, na_value=np.nan)
+
+    agg_df = pd.DataFrame(index=dates)
+    sums = np.nansum(block[:len(SUM_COLUMNS)], axis=1)
+    for j, col in enumerate(SUM_COLUMNS):
+        agg_df[col] = sums[j]
+
+    oi = agg_df[const.OPEN_INTEREST] + 1e-9
+    for pct_col, net_col in PCT_OI_COLUMNS:
+        agg_df[pct_col] = np.round(agg_df[net_col] / oi * 100, 2)
+
+    # nanmean warns on a week no market reports, which is a legitimate NaN here.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = block[len(SUM_COLUMNS):]
+        counts = np.sum(~np.isnan(means), axis=1)
+        totals = np.nansum(means, axis=1)
+        means = np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+    for j, (col, decimals) in enumerate(MEAN_COLUMNS):
+        agg_df[col] = np.round(means[j], decimals)
+    return agg_df
+
+
+# One aggregate per (release, market set, lookback). The plot selector, column count and
+# palette each re-ran the whole sweep before; none of them change a number here.
+_agg_cache = release_cache.ReleaseCache("aggregation", maxsize=32)
+
+
+def aggregated_frame(selected_assets, lookback):
+    """The cached aggregate for a selection, or None when no market has data.
+
+    Keyed on the SET of markets: a sum does not depend on the order they were picked in,
+    and a checklist reports them in click order.
+    """
+    def build():
+        frames = frame_fetch.fetch_frames_for(selected_assets, lookback)
+        return aggregate_frames([frames[a] for a in selected_assets])
+
+    key = (release_cache.current_db_time(), tuple(sorted(set(selected_assets))), lookback)
+    agg_df = _agg_cache.get(key, build)
+    return None if agg_df is None else agg_df.copy()
+
+
 @callback(
     Output('agg_stack', 'children'),
     Input('session_palette_theme_asset_store', 'data'),
@@ -224,44 +310,10 @@ def update_agg_stack(palette_name, selected_assets, lookback, selected_plots, nu
     # Fetch dynamic colors from user's current session state
     color_palette = viz_config.get_palette(palette_name)
 
-    # Fetch data for all selected assets
-    dataframes = []
-    for asset in selected_assets:
-        df = get_indexer().get_symbols_data(asset, lookback)
-        if df is not None and not df.empty:
-            df = df.copy()
-            df.attrs = {}  # Clear attributes to avoid truth value ambiguity in pd.concat
-            df['Asset'] = asset
-            dataframes.append(df)
-
-    if not dataframes:
+    agg_df = aggregated_frame(selected_assets, lookback)
+    if agg_df is None:
         return html.P("No Data Found", style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR})
 
-    # Combine and Aggregate
-    combined_df = pd.concat(dataframes)
-    grouped = combined_df.groupby(level=0)
-
-    agg_df = pd.DataFrame()
-
-    # Sum absolute positions
-    agg_df[const.COMM_NET] = grouped[const.COMM_NET].sum()
-    agg_df[const.LARGE_NET] = grouped[const.LARGE_NET].sum()
-    agg_df[const.SMALL_NET] = grouped[const.SMALL_NET].sum()
-    agg_df[const.OPEN_INTEREST] = grouped[const.OPEN_INTEREST].sum()
-    agg_df[const.COMM_PCT_OI] = round(agg_df[const.COMM_NET] / (agg_df[const.OPEN_INTEREST] + 1e-9) * 100, 2)
-    agg_df[const.LARGE_PCT_OI] = round(agg_df[const.LARGE_NET] / (agg_df[const.OPEN_INTEREST] + 1e-9) * 100, 2)
-    agg_df[const.SMALL_PCT_OI] = round(agg_df[const.SMALL_NET] / (agg_df[const.OPEN_INTEREST] + 1e-9) * 100, 2)
-
-    # Average Oscillators and Z-Scores
-    agg_df[const.COMMS_ZSCORE] = round(grouped[const.COMMS_ZSCORE].mean(), 4)
-    agg_df[const.LRG_ZSCORE] = round(grouped[const.LRG_ZSCORE].mean(), 4)
-    agg_df[const.SML_ZSCORE] = round(grouped[const.SML_ZSCORE].mean(), 4)
-    agg_df[const.OI_ZSCORE] = round(grouped[const.OI_ZSCORE].mean(), 4)
-
-    agg_df[const.COMMS_IDX] = round(grouped[const.COMMS_IDX].mean(), 0)
-    agg_df[const.LRG_IDX] = round(grouped[const.LRG_IDX].mean(), 0)
-    agg_df[const.SML_IDX] = round(grouped[const.SML_IDX].mean(), 0)
-
     # Dynamic Subplot Layout Configuration
     num_cols = int(num_cols)
     num_selected = len(selected_plots)
@@ -189,6 +189,16 @@ clientside_callback(
     prevent_initial_call=True
 )
 
+# Palette changes repaint the figure in the browser, title verdict included. See
+# recolor_figure in assets/clientside.js, and the note on the graphs page.
+clientside_callback(
+    "window.dash_clientside.clientside.recolor_figure",
+    Output('analysis_main_graph', 'figure'),
+    Input('session_palette_theme_asset_store', 'data'),
+    Input('analysis_main_graph', 'figure'),
+    State('palette_swatch_store', 'data'),
+)
+
 
 @callback(
     Output('global_lookback_store', 'data', allow_duplicate=True),
@@ -270,14 +280,15 @@ def set_default_columns(pathname, current_val):
 
 @callback(
     Output('analysis_stack', 'children'),
-    [Input('session_palette_theme_asset_store', 'data'),
-     Input('analysis_single_asset_filter_input', 'value'),
+    [Input('analysis_single_asset_filter_input', 'value'),
      Input('global_lookback_store', 'data'),
      Input('analysis_plot_selector', 'value'),
      Input('analysis_columns_selector', 'value'),
-     Input('global_model_store', 'data')]
+     Input('global_model_store', 'data')],
+    # A palette change is recoloured in the browser (recolor_figure, below).
+    State('session_palette_theme_asset_store', 'data'),
 )
-def update_analysis_stack(palette_name, asset, lookback, selected_plots, num_cols, model_view):
+def update_analysis_stack(asset, lookback, selected_plots, num_cols, model_view, palette_name):
     print(f"Updating analysis stack with asset={asset}, lookback={lookback}, selected_plots={selected_plots}, num_cols={num_cols}")
     utils.cot_logger.info(f"Updating analysis stack with asset={asset}, lookback={lookback}, selected_plots={selected_plots}, num_cols={num_cols}")
 
@@ -411,6 +422,7 @@ def update_analysis_stack(palette_name, asset, lookback, selected_plots, num_col
         chart_title = asset  # Fallback if data is missing
 
     fig = helpers.get_update_layout_for_plots(fig, num_rows, num_cols, chart_title)
+    fig = helpers.tag_palette(fig, color_palette)
 
     return dcc.Graph(
                      id='analysis_main_graph',
@@ -25,6 +25,7 @@ import components.category_traces as ct
 import components.plot_layout as layout_helpers
 import viz_config
 import viz_constants as vc
+from components.plot_colors import tag_palette
 
 dash.register_page(
     __name__,
@@ -236,6 +237,16 @@ clientside_callback(
     prevent_initial_call=True
 )
 
+# Palette changes repaint the figure in the browser. See recolor_figure in
+# assets/clientside.js, and the note on the graphs page.
+clientside_callback(
+    "window.dash_clientside.clientside.recolor_figure",
+    Output('categories_main_graph', 'figure'),
+    Input('session_palette_theme_asset_store', 'data'),
+    Input('categories_main_graph', 'figure'),
+    State('palette_swatch_store', 'data'),
+)
+
 
 @callback(
     Output('global_lookback_store', 'data', allow_duplicate=True),
@@ -347,7 +358,6 @@ def set_default_columns(pathname, current_val):
 
 @callback(
     Output('categories_stack', 'children'),
-    Input('session_palette_theme_asset_store', 'data'),
     Input('categories_asset_selector', 'value'),
     Input('categories_report_selector', 'value'),
     Input('categories_category_selector', 'value'),
@@ -355,9 +365,11 @@ def set_default_columns(pathname, current_val):
     Input('global_lookback_store', 'data'),
     Input('categories_columns_selector', 'value'),
     Input('categories_layout_selector', 'value'),
+    # A palette change is recoloured in the browser (recolor_figure, below).
+    State('session_palette_theme_asset_store', 'data'),
 )
-def render_category_stack(palette_name, asset, report, selected_categories,
-                          selected_plots, lookback, num_cols, layout_mode):
+def render_category_stack(asset, report, selected_categories,
+                          selected_plots, lookback, num_cols, layout_mode, palette_name):
     if not asset:
         return html.P("Select an asset to view its category breakdown.",
                       style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR})
@@ -426,6 +438,7 @@ def render_category_stack(palette_name, asset, report, selected_categories,
                                                      height=height)
     if not show_legend:
         fig.update_layout(showlegend=False)
+    fig = tag_palette(fig, palette)
 
     return dcc.Graph(figure=fig,
                      id='categories_main_graph',
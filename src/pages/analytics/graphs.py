@@ -11,6 +11,7 @@ from dash import Input, Output, State, callback, clientside_callback, dcc, html,
 import app_utils
 import components.plot_helpers as helpers
 import components.plot_registry as registry
+import frame_fetch
 import viz_config
 import viz_constants as vc
 
@@ -174,6 +175,24 @@ clientside_callback(
     prevent_initial_call=True
 )
 
+# A palette change is a recolour, not a rebuild. It used to be an Input to the callback
+# that draws this stack, so picking a palette re-read every frame, rebuilt every panel
+# and shipped the whole figure again to move five colours. The figure now carries the
+# palette it was drawn in (tag_palette) and the browser swaps colour strings through
+# the table in palette_swatch_store. See recolor_figure in assets/clientside.js.
+#
+# The figure is an Input as well as the Output, so a graph the server has just drawn is
+# checked on arrival. That is what catches a reload: the session store hydrates after the
+# page's first callbacks are already in flight, and the stack is drawn in the default
+# palette by a callback that read the store while it was still empty.
+clientside_callback(
+    "window.dash_clientside.clientside.recolor_figure",
+    Output('graphs_main_graph', 'figure'),
+    Input('session_palette_theme_asset_store', 'data'),
+    Input('graphs_main_graph', 'figure'),
+    State('palette_swatch_store', 'data'),
+)
+
 
 @callback(
     Output('global_lookback_store', 'data', allow_duplicate=True),
@@ -285,14 +304,16 @@ def set_default_columns(pathname, current_val):
 
 @callback(
     Output('cot_graphs', 'children'),
-    Input('session_palette_theme_asset_store', 'data'),
     Input('graphs_multi_equity_selector_input', 'value'),
     Input('graphs_plot_selector_input', 'value'),
     Input('global_lookback_store', 'data'),
     Input('global_model_store', 'data'),
-    Input('graphs_columns_selector', 'value')
+    Input('graphs_columns_selector', 'value'),
+    # State, not Input: a palette change is a recolour, done in the browser by
+    # recolor_figure below. This only decides what the first paint is drawn in.
+    State('session_palette_theme_asset_store', 'data'),
 )
-def get_cot_graphs(palette_name, selected_assets, selected_plot, lookback, model_view, num_cols):
+def get_cot_graphs(selected_assets, selected_plot, lookback, model_view, num_cols, palette_name):
     print(f"Generating graphs for Selected Assets: {selected_assets}, Plot: {selected_plot}, Lookback: {lookback}, Model: {model_view}, Columns: {num_cols}")
     utils.cot_logger.info(f"Generating graphs for Selected Assets: {selected_assets}, Plot: {selected_plot}, Lookback: {lookback}, Model: {model_view}, Columns: {num_cols}")
     if not lookback:
@@ -351,18 +372,25 @@ def get_cot_graphs(palette_name, selected_assets, selected_plot, lookback, model
     is_shared_x = False if selected_plots[0] in ["max_pain", "max_pain_historical"] else True
     fig = helpers.get_make_subplots_for_plots(num_rows, num_cols, titles, specs, shared_xaxes=is_shared_x)
 
+    # Every frame the stack needs, read together before the first panel is drawn rather
+    # than one cold read per panel inside the loop. The overlay needs both bases.
+    keys = [(a, lookback, basis) for a in assets]
+    if is_overlay:
+        keys += [(a, lookback, const.BASIS_OI_NORM) for a in assets]
+    frames = frame_fetch.fetch_frames(keys)
+
     plot_idx = 0
     for r in range(1, num_rows + 1):
         for c in range(1, num_cols + 1):
             if plot_idx < num_selected:
-                df = get_indexer().get_symbols_data(assets[plot_idx], lookback, basis)
+                df = frames[(assets[plot_idx], lookback, basis)]
                 if df is None:
                     return helpers.get_no_data_html_p()
 
                 p = selected_plots[0]
 
                 if is_overlay:
-                    df_norm = get_indexer().get_symbols_data(assets[plot_idx], lookback, const.BASIS_OI_NORM)
+                    df_norm = frames[(assets[plot_idx], lookback, const.BASIS_OI_NORM)]
                     if df_norm is None:
                         return helpers.get_no_data_html_p()
                     value_col, y_title, y_range, zero_line = BASIS_OVERLAY_SPEC[p]
@@ -405,6 +433,7 @@ def get_cot_graphs(palette_name, selected_assets, selected_plot, lookback, model
         suffix = "Raw vs % of OI" if is_overlay else vc.BASIS_LABELS[basis]
         main_title = f"{main_title} ({suffix})"
     fig = helpers.get_update_layout_for_plots(fig, num_rows, num_cols, main_title)
+    fig = helpers.tag_palette(fig, color_palette)
 
     return dcc.Graph(figure=fig,
                      id='graphs_main_graph',
@@ -8,7 +8,6 @@ import dash
 import dash_ag_grid as dag
 import dash_bootstrap_components as dbc
 from cotmetrics.indexer import get_indexer
-from cotmetrics.reports import get_matrix_data
 from dash import (
     ClientsideFunction,
     Input,
@@ -21,6 +20,7 @@ from dash import (
     no_update,
 )
 
+import release_cache
 import viz_config
 import viz_constants as vc
 from app_utils import next_date_selection
@@ -293,7 +293,9 @@ def render_heatmap_layout(assest_classes, lookback, palette_name, target_date):
     if not lookback:
         lookback = "Custom"
 
-    df = get_matrix_data(assest_classes, lookback, target_date)
+    # Shared with the Strip and keyed on the release, so a palette change is a re-render
+    # of a frame already built rather than a re-sweep of every instrument.
+    df = release_cache.matrix_data(assest_classes, lookback, target_date)
     if df.empty:
         return html.P("No data available.", style={'textAlign': 'center', 'color': vc.TEXT_COLOR})
 
@@ -1,3 +1,4 @@
+import json
 import math
 import urllib.parse
 
@@ -11,9 +12,13 @@ from cotmetrics.indexer import get_indexer
 from dash import Input, Output, Patch, State, callback, clientside_callback, dcc, html, no_update
 
 import app_utils
+import components.panel_stack as panel_stack
 import components.plot_helpers as helpers
+import components.plot_layout as plot_layout
 import components.plot_registry as registry
+import components.plot_traces as plot_traces
 import components.tv_layout as tv_layout
+import release_cache
 import viz_config
 import viz_constants as vc
 
@@ -30,6 +35,10 @@ PLOT_IDS = ["oi_alignment", "macd", "willco", "index", "momentum", "zscore",
 
 AVAILABLE_PLOTS = registry.labels_for(PLOT_IDS)
 
+# The panels drawn from options snapshots rather than the COT frame. They have their own
+# x-axis (strikes, or their own date range) and their own refresh schedule.
+OPTIONS_PLOTS = ("max_pain", "max_pain_historical")
+
 
 
 def get_collapsible_signals_accordion(signal_row, asset):
@@ -295,9 +304,15 @@ def layout(**kwargs):
 
             html.Hr(style=vc.hr_style),
 
-            # The browser writes the zoom window here: {"xEnd": <date or None>, "stamp": n}.
-            # The signal panel reads it to follow the right edge of the chart.
+            # The browser writes the zoom window here:
+            # {"xStart": <date>, "xEnd": <date or None>, "stamp": n}. The signal panel
+            # reads it to follow the right edge of the chart, and restore_full_detail
+            # the left edge, to send the thinned history when the reader reaches it.
             dcc.Store(id='oi_alignment_zoom_sink'),
+            # Which panels the figure on screen is made of, and what they were drawn
+            # from. update_oi_alignment_stack reads it to send a change of panels as a
+            # Patch rather than the whole stack again.
+            dcc.Store(id='oi_alignment_stack_state'),
 
             html.Div(id="oi_alignment_export_container", children=[
                 html.Div(id='oi_alignment_signal_panel'),
@@ -506,8 +521,8 @@ def toggle_tv_modal(n_clicks, is_open, asset_name):
 # It writes to the figure through Plotly rather than returning one. Returning a figure
 # would hand back the stored x-range and undo the zoom that triggered it.
 #
-# It also reports the rightmost visible date on oi_alignment_zoom_sink, which is how the
-# signal panel follows the zoom.
+# It also reports the visible window on oi_alignment_zoom_sink, which is how the signal
+# panel follows the zoom and how restore_full_detail knows the thinned history is wanted.
 #
 # That indirection is load-bearing. A server callback listening to relayoutData does
 # fire with the right x-range, but the Plotly.relayout this performs emits a *second*
@@ -523,11 +538,23 @@ clientside_callback(
     prevent_initial_call=True
 )
 
+# Palette changes repaint the figure in the browser. See recolor_figure in
+# assets/clientside.js, and the note on the graphs page. The crosshair's Patch below
+# re-fires this, which is a no-op: the figure is already tagged with the palette.
+clientside_callback(
+    "window.dash_clientside.clientside.recolor_figure",
+    Output('oi_alignment_main_graph', 'figure'),
+    Input('session_palette_theme_asset_store', 'data'),
+    Input('oi_alignment_main_graph', 'figure'),
+    State('palette_swatch_store', 'data'),
+)
+
 
 def _zoom_target_date(zoom, df):
     """The report the panel should show for the browser's reported zoom window.
 
-    `zoom` is what the clientside autoscale wrote: {"xEnd": <date or None>, "stamp": n}.
+    `zoom` is what the clientside autoscale wrote: {"xEnd": <date or None>, "stamp": n},
+    plus the left edge, which this does not need.
     A null xEnd means the window was reset, so the panel goes back to the latest report.
     Otherwise it is the last report at or before the rightmost visible date, so the
     panel reads as of what the right edge of the chart is showing.
@@ -553,12 +580,11 @@ def _zoom_target_date(zoom, df):
      Input('session_palette_theme_asset_store', 'data'),
      Input('global_lookback_store', 'data'),
      Input('oi_alignment_single_asset_filter_input', 'value')],
-    [State("oi_alignment_main_graph", "figure"),
-     State('global_model_store', 'data')],
+    State('global_model_store', 'data'),
     prevent_initial_call=True
 )
 def sync_signal_board_to_crosshair(click_data, zoom, palette_name, lookback,
-                                   asset, current_fig, model_view):
+                                   asset, model_view):
     """Move the signal panel to whichever date the user is pointing at.
 
     There are two ways to point: click a point, which also drops a crosshair, or pan and
@@ -573,25 +599,24 @@ def sync_signal_board_to_crosshair(click_data, zoom, palette_name, lookback,
 
     triggered = dash.callback_context.triggered
     by_zoom = bool(triggered) and triggered[0]["prop_id"].endswith("zoom_sink.data")
+    has_click = bool(click_data) and 'points' in click_data
+    # The figure is recoloured in the browser, but this panel is HTML: a palette change
+    # with nothing clicked repaints it here, at the zoomed date or the latest row.
+    by_palette = (bool(triggered) and not has_click
+                  and triggered[0]["prop_id"].startswith("session_palette_theme_asset_store."))
 
     model = _panel_model(model_view)
-    if not by_zoom and (not click_data or 'points' not in click_data):
+    if not by_zoom and not by_palette and not has_click:
         return no_update, no_update
 
     df = get_indexer().get_symbols_data(asset, lookback, model.basis)
     if df is None or df.empty:
         return no_update, no_update
-    # An empty palette store means the default, not "no palette".
-    color_palette = viz_config.get_palette(palette_name)
 
-    if by_zoom:
+    if by_zoom or by_palette:
         target_date = _zoom_target_date(zoom, df)
-        signal_row = helpers.build_signal_panel(
-            df=df, asset=asset, color_palette=color_palette,
-            target_date=target_date, model=model,
-        )
-        exec_card, _ = build_executive_synthesis_card(
-            df, color_palette, target_date=target_date, asset=asset)
+        signal_row, exec_card = _signal_board(df, asset, lookback, model, palette_name,
+                                              target_date)
         # The figure is left alone on purpose: returning one here would hand back the
         # stored x-range and undo the zoom that triggered this.
         return (html.Div([exec_card, get_collapsible_signals_accordion(signal_row, asset)]),
@@ -602,31 +627,15 @@ def sync_signal_board_to_crosshair(click_data, zoom, palette_name, lookback,
         clicked_date_str = click_data['points'][0]['x']
         hovered_date = pd.to_datetime(clicked_date_str)
 
-        # Rebuild the signal panel for that specific point in time
-        # (Assuming df, asset, and color_palette are accessible in this scope)
-        updated_signal_ui = helpers.build_signal_panel(
-            df=df,
-            asset=asset,
-            color_palette=color_palette,
-            target_date=hovered_date,
-            model=model,
-        )
-
-        exec_card, is_neutral = build_executive_synthesis_card(df, color_palette, target_date=hovered_date, asset=asset)
-
-        # Get existing shapes from current figure layout to avoid overwriting them
-        existing_shapes = []
-        if current_fig and 'layout' in current_fig and 'shapes' in current_fig['layout']:
-            existing_shapes = current_fig['layout']['shapes']
-
-        # Filter out any old crosshair lines (which are lines with yref='paper')
-        updated_shapes = [
-            s for s in existing_shapes
-            if not (s.get('type') == 'line' and s.get('yref') == 'paper')
-        ]
+        updated_signal_ui, exec_card = _signal_board(df, asset, lookback, model,
+                                                     palette_name, hovered_date)
 
-        # Append the new crosshair line
-        updated_shapes.append({
+        # The crosshair has a slot of its own, the first shape of the layout (see
+        # _build_stack), so moving it is one Assign. This used to take the whole figure
+        # up as State to find and drop the previous line, which on a full stack was
+        # megabytes uploaded per click to move one shape.
+        patched_fig = Patch()
+        patched_fig['layout']['shapes'][0] = {
             'type': 'line',
             'x0': clicked_date_str,
             'x1': clicked_date_str,
@@ -634,12 +643,8 @@ def sync_signal_board_to_crosshair(click_data, zoom, palette_name, lookback,
             'y1': 1,
             'yref': 'paper',  # Spans the entire height of the chart
             'line': {'color': 'rgba(255,255,255,0.5)', 'width': 1, 'dash': 'dot'}
-        })
-
-        patched_fig = Patch()
-        patched_fig['layout']['shapes'] = updated_shapes
+        }
 
-        # Use Patch to update layout shapes dynamically
         collapsible_signals = get_collapsible_signals_accordion(updated_signal_ui, asset)
 
         return html.Div([exec_card, collapsible_signals]), patched_fig
@@ -649,19 +654,235 @@ def sync_signal_board_to_crosshair(click_data, zoom, palette_name, lookback,
         return no_update, no_update
 
 
+# Signal boards already rendered this week, one per report row a reader has pointed at.
+# Scrubbing goes back and forth over the same few dozen weeks, and every one of them
+# used to re-run both card builders: a boolean mask over the whole frame to find the
+# row, the active-signal and tape synthesis rules over it, and the component trees.
+# 512 boards is a handful of markets scrubbed end to end; each is a few KB of
+# components.
+_signal_cache = release_cache.ReleaseCache("oi alignment signal boards", maxsize=512)
+
+
+def _signal_board(df, asset, lookback, model, palette_name, target_date=None):
+    """`(signal_row, exec_card)` for one report row, memoized for the release.
+
+    A date that is not a report row renders the latest row, in both card builders, so
+    it is keyed as the latest row too: a click between two reports shares the entry
+    that opened the page rather than building a copy of it.
+
+    The cards read ~35 fields through the per-row rules in cotmetrics.synthesis, so the
+    memo holds what they render rather than a table of what they read. Duplicating
+    those rules over whole columns here would be a second copy of the verdicts to keep
+    in step with the library; the rendered row is the same lookup for the reader.
+    """
+    if target_date is not None and target_date not in df.index:
+        target_date = None
+    key = (release_cache.current_db_time(), asset, lookback, model.key, target_date,
+           palette_name)
+
+    def build():
+        # An empty palette store means the default, not "no palette".
+        color_palette = viz_config.get_palette(palette_name)
+        signal_row = helpers.build_signal_panel(df=df, asset=asset, color_palette=color_palette,
+                                                target_date=target_date, model=model)
+        exec_card, _ = build_executive_synthesis_card(df, color_palette,
+                                                      target_date=target_date, asset=asset)
+        return signal_row, exec_card
+
+    return _signal_cache.get(key, build)
+
+
+# Serialized panels, bounded by bytes rather than count: a plain panel is tens of KB and
+# the tape-reading panel with its decorators and regime rects several hundred, so no
+# entry count is right for both. 64 MB holds the popular markets' usual panels many times
+# over. Counters show on the Admin page with the other release caches. An entry holds a
+# panel at full resolution and thinned (see _panel_fragments), and is weighed as both.
+PANEL_CACHE_BYTES = 64 * 1024 * 1024
+
+# Hidden until the first click puts a line in it.
+CROSSHAIR_SLOT = {"type": "line", "visible": False, "xref": "paper", "yref": "paper",
+                  "x0": 0, "x1": 0, "y0": 0, "y1": 1}
+_panel_cache = release_cache.ReleaseCache(
+    "oi alignment panels", max_bytes=PANEL_CACHE_BYTES,
+    weigh=lambda v: len(v[0]) + (len(v[1]) if v[1] is not v[0] else 0))
+
+
+def _lod_from(df):
+    """The first report drawn at full resolution: the opening window and a margin."""
+    weeks = plot_layout.visible_weeks() + plot_traces.LOD_MARGIN_WEEKS
+    return df.index[max(0, len(df) - weeks)] if len(df) else None
+
+
+def _panel_fragments(fig, lod_from):
+    """`(full, thinned, thinned_traces)`: a drawn panel as the two fragments it is sent as.
+
+    The stack goes out with the thinned one. The full one is what the zoom sink swaps in
+    when the reader reaches back past `lod_from`, for the traces `thinned_traces` names.
+    A panel with nothing to thin hands back the same string twice.
+    """
+    full = panel_stack.to_fragment(fig)
+    thinned = plot_traces.decimate_traces(fig, lod_from) if lod_from is not None else []
+    if not thinned:
+        return full, full, ()
+    return full, panel_stack.to_fragment(fig), tuple(thinned)
+
+
+def _build_panel(df, df_norm, asset, plot, price_overlay, model, is_overlay, palette_name,
+                 lod_from=None):
+    """One panel of the stack, drawn on its own and returned as panel_stack fragments.
+
+    Everything the panel needs is in the arguments, which is what lets it be cached and
+    placed into whichever cell of whichever stack asks for it. Drawn at (1, 1); the
+    decorators and the price-delta regime rects that used to be applied across the
+    stack at the end are applied here, to this panel only.
+    """
+    basis = model.basis
+
+    # Net Positions plots the underlying series by name rather than via the generic
+    # aliases, so it has to pick the basis pair itself.
+    if basis == const.BASIS_OI_NORM:
+        comm_net, lrg_net, sml_net = const.COMM_NET_NORM, const.LARGE_NET_NORM, const.SMALL_NET_NORM
+        net_y_title = "net / OI"
+    else:
+        comm_net, lrg_net, sml_net = const.COMM_NET, const.LARGE_NET, const.SMALL_NET
+        net_y_title = "net position"
+    color_palette = viz_config.get_palette(palette_name)
+
+    specs = registry.subplot_specs([plot], show_price=True, num_cols=1)
+    fig = helpers.get_make_subplots_for_plots(1, 1, None, specs)
+
+    # Overlay draws both bases on one axis, so it replaces the panel rather than varying
+    # it. Panels that cannot overlay fall through and render raw, same as the
+    # basis-invariant ones.
+    if is_overlay and plot in registry.BASIS_OVERLAY_SPEC:
+        value_col, y_title, y_range, zero_line = registry.BASIS_OVERLAY_SPEC[plot]
+        fig = helpers.get_basis_overlay_plot(
+            fig, df, df_norm, value_col, 1, 1, color_palette,
+            y_title=y_title, y_range=y_range, show_oi=True, zero_line=zero_line)
+        return _panel_fragments(fig, lod_from)
+
+    spec = registry.REGISTRY[plot]
+    ctx = registry.PlotCtx(
+        fig=fig, df=df, df_norm=df_norm, row=1, col=1,
+        palette=color_palette, show_price=True, asset=asset, model=model,
+        net_cols=(comm_net, lrg_net, sml_net), y_title=net_y_title,
+        setup_comms_only=get_indexer().is_equity(asset))
+    fig = spec.build(ctx) or fig
+    if spec.decorate:
+        ctx.fig = fig
+        fig = spec.decorate(ctx) or fig
+
+    # Panel-specific follow-ups the registry has no business knowing about: this page
+    # decorates its price panel with the tape-reading markers, and Open Interest earns a
+    # legend entry. panel_stack.assemble shows each entry once however many panels add it.
+    if plot == "oi_alignment":
+        fig = helpers.get_oi_alignment_decorators(
+            fig, df, [(1, 1)], color_palette,
+            offset_pct=0.06, show_legend=True, show_oi_legend=True)
+        if price_overlay == "On":
+            # User requested 1-week price delta highlighting for maximum accuracy
+            # A moving average of 1 would just be the current price, so we use shift(1)
+            ma = df[const.CLOSING_PRICE].shift(1)
+            uptrend_mask = (df[const.CLOSING_PRICE] >= ma)
+            downtrend_mask = (df[const.CLOSING_PRICE] < ma)
+            fig = helpers.add_trend_regime_highlighting(
+                fig, df, ma, uptrend_mask, downtrend_mask, [[1, 1, False]])
+    elif plot == "net_pos":
+        fig = helpers.add_open_interest_legend(fig, color_palette)
+
+    return _panel_fragments(fig, lod_from)
+
+
+def _stack_panels(df, df_norm, asset, lookback, selected_plots, price_overlay, model,
+                  model_view, is_overlay, palette_name):
+    """`_panel_fragments` for each selected plot, in order.
+
+    Each panel comes from the panel cache. Its key is everything `_build_panel` reads,
+    led by the release, so a new week can never be served last week's panel; the width
+    of the opening window is in it because that is where the thinning starts. Panels
+    drawn from options snapshots are built fresh every time: the scheduler refreshes
+    those every three hours overnight, so a key that only moves with the COT week would
+    keep serving Monday's strikes on Thursday.
+    """
+    db_time = release_cache.current_db_time()
+    weeks = plot_layout.visible_weeks()
+    lod_from = _lod_from(df)
+
+    def panel(plot):
+        def build():
+            return _build_panel(df, df_norm, asset, plot, price_overlay, model, is_overlay,
+                                palette_name, lod_from)
+        if plot in OPTIONS_PLOTS:
+            return build()
+        key = (db_time, asset, lookback, plot, price_overlay, model_view, palette_name,
+               weeks)
+        return _panel_cache.get(key, build)
+
+    return [panel(p) for p in selected_plots]
+
+
+def _build_stack(df, df_norm, asset, lookback, selected_plots, num_cols, price_overlay,
+                 model, model_view, is_overlay, palette_name):
+    """The whole stack as a panel_stack.Stack, from frames the caller has already loaded.
+
+    The stack is assembled from the thinned fragments. Each panel's entry in the stack
+    state also records which of its traces were thinned, which is what
+    restore_full_detail swaps back.
+    """
+    color_palette = viz_config.get_palette(palette_name)
+    panels = _stack_panels(df, df_norm, asset, lookback, selected_plots, price_overlay,
+                           model, model_view, is_overlay, palette_name)
+
+    instrument = get_indexer().get_instrument_from_name(asset)
+    titles = [registry.plot_title(p, asset=asset, instrument=instrument,
+                                  basis_view=model.basis, is_overlay=is_overlay)
+              for p in selected_plots]
+    num_rows = math.ceil(len(selected_plots) / num_cols)
+    specs = registry.subplot_specs(selected_plots, show_price=True, num_cols=num_cols)
+    is_shared_x = not any(p in OPTIONS_PLOTS for p in selected_plots)
+    grid = helpers.get_make_subplots_for_plots(num_rows, num_cols, titles, specs,
+                                               shared_xaxes=is_shared_x)
+
+    stack = panel_stack.assemble(grid, [thinned for _, thinned, _ in panels], num_cols)
+    for entry, (_, _, thinned_traces) in zip(stack.panels, panels):
+        entry["thinned"] = list(thinned_traces)
+    # The crosshair's slot. sync_signal_board_to_crosshair moves the line by assigning
+    # this one shape, so it must always be there and always be first.
+    stack.shapes.insert(0, dict(CROSSHAIR_SLOT))
+
+    exclude_xaxes = [i for i, p in enumerate(selected_plots) if p in OPTIONS_PLOTS]
+    stack.grid = helpers.get_update_xaxes_for_plots(stack.grid, df, exclude_plot_indices=exclude_xaxes)
+    stack.grid = helpers.get_update_layout_for_plots(stack.grid, num_rows, num_cols, asset,
+                                                     show_scale_toggle=False)
+    stack.grid = helpers.tag_palette(stack.grid, color_palette)
+    # Plotly keeps the reader's zoom across a new figure only while this holds. Without
+    # it the Patch that swaps the full history in (restore_full_detail) would snap the
+    # x-window back to where the page opened, the moment the reader had zoomed away.
+    stack.grid.update_layout(uirevision=f"{asset}|{lookback}|{model_view}")
+    return stack
+
+
 @callback(
     [Output('oi_alignment_stack', 'children'),
-     Output('oi_alignment_signal_panel', 'children')],
-    [Input('session_palette_theme_asset_store', 'data'),
-     Input('oi_alignment_single_asset_filter_input', 'value'),
+     Output('oi_alignment_main_graph', 'figure', allow_duplicate=True),
+     Output('oi_alignment_signal_panel', 'children'),
+     Output('oi_alignment_stack_state', 'data')],
+    [Input('oi_alignment_single_asset_filter_input', 'value'),
      Input('global_lookback_store', 'data'),
      Input('oi_alignment_plot_selector', 'value'),
      Input('oi_alignment_columns_selector', 'value'),
      Input('oi_alignment_price_overlay_selector', 'value'),
-     Input('global_model_store', 'data')]
+     Input('global_model_store', 'data')],
+    # A palette change is recoloured in the browser (recolor_figure, below). The signal
+    # panel beside the chart is HTML and is repainted by sync_signal_board_to_crosshair.
+    State('session_palette_theme_asset_store', 'data'),
+    State('oi_alignment_stack_state', 'data'),
+    # The figure Output is shared with the crosshair and the recolour, so it has to be
+    # a duplicate; this still has to draw the page on first load.
+    prevent_initial_call='initial_duplicate',
 )
-def update_oi_alignment_stack(palette_name, asset, lookback, selected_plots, num_cols,
-                              price_overlay, model_view):
+def update_oi_alignment_stack(asset, lookback, selected_plots, num_cols,
+                              price_overlay, model_view, palette_name, shown_state):
     print(f"Updating oi_alignment stack with asset={asset}, lookback={lookback}, price_overlay={price_overlay}")
     utils.cot_logger.info(f"Updating oi_alignment stack with asset={asset}, lookback={lookback}, selected_plots={selected_plots}, num_cols={num_cols}")
 
@@ -669,7 +890,7 @@ def update_oi_alignment_stack(palette_name, asset, lookback, selected_plots, num
 
     if not asset or not selected_plots or selected_plots == 0:
         empty_message = html.P('SELECT ASSET AND PLOTS', style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR})
-        return empty_message, html.Div()
+        return empty_message, no_update, html.Div(), None
 
     if model_view not in vc.MODEL_VIEW_CHOICES:
         model_view = models.DEFAULT_MODEL.key
@@ -688,112 +909,42 @@ def update_oi_alignment_stack(palette_name, asset, lookback, selected_plots, num
 
     df = get_indexer().get_symbols_data(asset, lookback, basis)
     if df is None:
-        return html.P("No Data", style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR}), html.Div()
+        return html.P("No Data", style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR}), no_update, html.Div(), None
 
     df_norm = None
     if is_overlay:
         df_norm = get_indexer().get_symbols_data(asset, lookback, const.BASIS_OI_NORM)
         if df_norm is None:
-            return html.P("No Data", style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR}), html.Div()
+            return html.P("No Data", style={'textAlign': 'center', 'color': vc.BRIGHTER_TEXT_COLOR}), no_update, html.Div(), None
 
     # The signal panel and the executive synthesis below read the same df as the charts,
     # so the whole page speaks one model rather than charting one basis and judging it
     # by another's rule. The band itself travels on the model into PlotCtx.
 
-    # Net Positions plots the underlying series by name rather than via the generic
-    # aliases, so it has to pick the basis pair itself.
-    if basis == const.BASIS_OI_NORM:
-        comm_net, lrg_net, sml_net = const.COMM_NET_NORM, const.LARGE_NET_NORM, const.SMALL_NET_NORM
-        net_y_title = "net / OI"
-    else:
-        comm_net, lrg_net, sml_net = const.COMM_NET, const.LARGE_NET, const.SMALL_NET
-        net_y_title = "net position"
-    color_palette = viz_config.get_palette(palette_name)
-    instrument = get_indexer().get_instrument_from_name(asset)
-    titles = [registry.plot_title(p, asset=asset, instrument=instrument,
-                                  basis_view=basis, is_overlay=is_overlay)
-              for p in selected_plots]
-
-    num_cols = int(num_cols)
-    num_selected = len(selected_plots)
-    num_rows = math.ceil(num_selected / num_cols)
-
-    specs = registry.subplot_specs(selected_plots, show_price=True, num_cols=num_cols)
-
-    is_shared_x = False if any(p in ["max_pain", "max_pain_historical"] for p in selected_plots) else True
-    fig = helpers.get_make_subplots_for_plots(num_rows, num_cols, titles, specs, shared_xaxes=is_shared_x)
-
-    plot_idx = 0
-    oi_legend_added = False
-    decorator_targets = []
-    price_delta_targets = []
-    setup_comms_only = get_indexer().is_equity(asset)
-    for r in range(1, num_rows + 1):
-        for c in range(1, num_cols + 1):
-            if plot_idx < num_selected:
-                p = selected_plots[plot_idx]
-
-                # Overlay draws both bases on one axis, so it replaces the panel rather
-                # than varying it. Panels that cannot overlay fall through and render
-                # raw, same as the basis-invariant ones.
-                if is_overlay and p in registry.BASIS_OVERLAY_SPEC:
-                    value_col, y_title, y_range, zero_line = registry.BASIS_OVERLAY_SPEC[p]
-                    fig = helpers.get_basis_overlay_plot(
-                        fig, df, df_norm, value_col, r, c, color_palette,
-                        y_title=y_title, y_range=y_range, show_oi=True,
-                        zero_line=zero_line)
-                    plot_idx += 1
-                    continue
-
-                spec = registry.REGISTRY[p]
-                ctx = registry.PlotCtx(
-                    fig=fig, df=df, df_norm=df_norm, row=r, col=c,
-                    palette=color_palette, show_price=True, asset=asset, model=model,
-                    net_cols=(comm_net, lrg_net, sml_net), y_title=net_y_title,
-                    setup_comms_only=setup_comms_only)
-                fig = spec.build(ctx) or fig
-                if spec.decorate:
-                    ctx.fig = fig
-                    fig = spec.decorate(ctx) or fig
-
-                # Panel-specific follow-ups the registry has no business knowing about:
-                # this page decorates its price panel with the tape-reading markers, and
-                # Open Interest earns a legend entry only once however many panels use it.
-                if p == "oi_alignment":
-                    decorator_targets.append((r, c))
-                    if price_overlay == "On":
-                        price_delta_targets.append([r, c, False])
-                elif p == "net_pos" and not oi_legend_added:
-                    fig = helpers.add_open_interest_legend(fig, color_palette)
-                    oi_legend_added = True
-
-                plot_idx += 1
-
-    if decorator_targets:
-        fig = helpers.get_oi_alignment_decorators(
-            fig, df, decorator_targets, color_palette,
-            offset_pct=0.06,
-            show_legend=True,
-            show_oi_legend=(not oi_legend_added)
-        )
-
-    if price_delta_targets:
-        # User requested 1-week price delta highlighting for maximum accuracy
-        # A moving average of 1 would just be the current price, so we use shift(1)
-        ma = df[const.CLOSING_PRICE].shift(1)
-        uptrend_mask = (df[const.CLOSING_PRICE] >= ma)
-        downtrend_mask = (df[const.CLOSING_PRICE] < ma)
-        fig = helpers.add_trend_regime_highlighting(fig, df, ma, uptrend_mask, downtrend_mask, price_delta_targets)
-
-    exclude_xaxes = [i for i, p in enumerate(selected_plots) if p in ["max_pain", "max_pain_historical"]]
-    fig = helpers.get_update_xaxes_for_plots(fig, df, exclude_plot_indices=exclude_xaxes)
-    fig = helpers.get_update_layout_for_plots(fig, num_rows, num_cols, asset, show_scale_toggle=False)
-
-    # Generate the signal panel based on the latest data and thresholds
-    is_equity = get_indexer().is_equity(asset)
-    signal_row = helpers.build_signal_panel(df, asset, color_palette, is_equity=is_equity, model=model)
-
-    exec_card, is_neutral = build_executive_synthesis_card(df, color_palette, asset=asset)
+    stack = _build_stack(df, df_norm, asset, lookback, selected_plots, int(num_cols),
+                         price_overlay, model, model_view, is_overlay, palette_name)
+    fig = stack.figure()
+
+    # Everything except the panel list and the column count. While this holds, the
+    # browser's figure is made of the same panels this one is, and a change of panels
+    # or columns can go as a Patch: the arrivals' traces, the survivors' new axis
+    # references and a fresh layout. The signal panel depends on none of what changed,
+    # so it is left where it is. Stacks with options panels are always sent whole,
+    # because their panels are rebuilt on every call and the browser's copy is stale.
+    context = [str(release_cache.current_db_time()), asset, lookback, price_overlay,
+               model_view, palette_name]
+    lod_from = _lod_from(df)
+    state = dict(stack.state(selected_plots), context=context, full_detail=False,
+                 lod_from=str(lod_from) if lod_from is not None else None)
+    if (shown_state and shown_state.get("context") == context
+            and not any(p in OPTIONS_PLOTS for p in selected_plots + shown_state["plots"])):
+        patch = panel_stack.stack_patch(shown_state, state, fig)
+        if patch is not None:
+            return no_update, patch, no_update, state
+
+    # The board for the latest report, which is also what the crosshair's memo serves for
+    # a click that misses a report row.
+    signal_row, exec_card = _signal_board(df, asset, lookback, model, palette_name)
 
     collapsible_signals = get_collapsible_signals_accordion(signal_row, asset)
 
@@ -810,7 +961,65 @@ def update_oi_alignment_stack(palette_name, asset, lookback, selected_plots, num
                          'displaylogo': False,
                          'responsive': True},
                          style={'width': '100%'}
-                    ), html.Div([exec_card, collapsible_signals])
+                    ), no_update, html.Div([exec_card, collapsible_signals]), state
+
+
+@callback(
+    Output('oi_alignment_main_graph', 'figure', allow_duplicate=True),
+    Output('oi_alignment_stack_state', 'data', allow_duplicate=True),
+    Input('oi_alignment_zoom_sink', 'data'),
+    State('oi_alignment_stack_state', 'data'),
+    prevent_initial_call=True
+)
+def restore_full_detail(zoom, shown_state):
+    """Swap the full history in once a zoom reaches back past where thinning starts.
+
+    The stack goes out with everything older than `lod_from` thinned to each bucket's
+    extremes, which is all a zoomed-out line can show. Zooming into that history is
+    when the weeks between the extremes are worth their bytes, so this sends the thinned
+    traces' x and y, and nothing else, as a Patch. Once per stack: the state is marked
+    and further zooms fall through. A release that landed since the stack was drawn is
+    left to the next full rebuild rather than patched into a stack of last week's panels.
+    """
+    if not shown_state or shown_state.get("full_detail") or not shown_state.get("lod_from"):
+        return no_update, no_update
+    x_start = (zoom or {}).get("xStart")
+    if not x_start:
+        return no_update, no_update
+    x_start = pd.to_datetime(x_start)
+    if x_start.tz is not None:
+        x_start = x_start.tz_localize(None)
+    if x_start >= pd.to_datetime(shown_state["lod_from"]):
+        return no_update, no_update
+
+    panels = shown_state["panels"]
+    if not any(p.get("thinned") for p in panels):
+        return no_update, dict(shown_state, full_detail=True)
+
+    db_time, asset, lookback, price_overlay, model_view, palette_name = shown_state["context"]
+    if db_time != str(release_cache.current_db_time()):
+        return no_update, no_update
+    model, is_overlay = vc.resolve_model_view(model_view)
+    df = get_indexer().get_symbols_data(asset, lookback, model.basis)
+    df_norm = get_indexer().get_symbols_data(asset, lookback, const.BASIS_OI_NORM) if is_overlay else None
+    if df is None or (is_overlay and df_norm is None):
+        return no_update, no_update
+
+    fragments = _stack_panels(df, df_norm, asset, lookback, shown_state["plots"],
+                              price_overlay, model, model_view, is_overlay, palette_name)
+    patch = Patch()
+    first = 0
+    for entry, (full, _, _) in zip(panels, fragments):
+        if entry.get("thinned"):
+            traces = json.loads(full)["data"]
+            for k in entry["thinned"]:
+                # None where the full series goes as x0/dx: clearing the thinned x is
+                # what puts Plotly back on them.
+                patch["data"][first + k]["x"] = traces[k].get("x")
+                patch["data"][first + k]["y"] = traces[k]["y"]
+        first += entry["traces"]
+    utils.cot_logger.info(f"OI Alignment: full history sent for {asset} ({lookback})")
+    return patch, dict(shown_state, full_detail=True)
 
 @callback(
     Output('oi_alignment_asset_class_selector', 'value'),
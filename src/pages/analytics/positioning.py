@@ -8,6 +8,8 @@ import dash_bootstrap_components as dbc
 from cotmetrics.indexer import get_indexer
 from dash import Input, Output, State, callback, dcc, html, no_update
 
+import export_archive
+import options_history
 import viz_config
 import viz_constants as vc
 
@@ -91,7 +93,21 @@ def layout(**kwargs):
                         ], xs=12, md="auto"),
 
                         dbc.Col([
-                            dbc.Button([html.I(className="bi bi-download mt-3"), "Download CSV"],
+                            html.Label("Download Format", style=vc.label_style),
+                            dcc.Dropdown(
+                                persistence='session',
+                                id='positioning_download_format',
+                                options=[{'label': label, 'value': fmt} for fmt, label
+                                         in export_archive.FORMAT_LABELS.items()],
+                                value='csv',
+                                className="mb-3 dash-dropdown bg-dark text-white",
+                                searchable=False,
+                                clearable=False,
+                            ),
+                        ], xs=12, md="auto"),
+
+                        dbc.Col([
+                            dbc.Button([html.I(className="bi bi-download mt-3"), "Download"],
                                     id="btn_download_csv",
                                     color='secondary',
                                     outline=True,
@@ -178,6 +194,10 @@ def get_CFTC_df_selection(assets, selected_columns, lookback, palette_name, targ
     if not df.empty:
         df = df.sort_values(by=[const.ASSET_CLASS, const.SYMBOL], ascending=[True, True])
 
+        # Max Pain and Delta IV from the options summaries the scheduler writes, so the
+        # table shows the same snapshot as the options panels and the export.
+        df = options_history.with_max_pain(df)
+
         # Always keep core columns, then add user-selected extras
         idx_col_header_name = " " + lookback + const.IDX
         COMM_IDX = const.COMM + idx_col_header_name
@@ -332,9 +352,10 @@ def get_asset_class_accordions(df, lookback, start_collapsed=False):
     State('global_lookback_store', 'data'),
     State('positioning_date_selector', 'value'),
     State('page_positioning_asset_selector', 'value'),
+    State('positioning_download_format', 'value'),
     prevent_initial_call=True,
 )
-def download_positioning_table(n_clicks, selected_columns, lookback, target_date, assets):
+def download_positioning_table(n_clicks, selected_columns, lookback, target_date, assets, fmt):
     if not n_clicks or not assets:
         return None
 
@@ -343,10 +364,28 @@ def download_positioning_table(n_clicks, selected_columns, lookback, target_date
 
     asset_list = (assets,) if isinstance(assets, str) else tuple(assets)
 
-    # Fetch the dataframe
-    df = get_indexer().get_positioning_table_by_asset_class(asset_list, lookback, target_date)
+    # The newest report's table for every class is written out once per release by
+    # export_archive, so the usual download is a filter of that. An older report, or
+    # an export that is not there, falls back to the query.
+    df = None
+    dates = get_indexer().get_available_dates()
+    if not target_date or (dates and target_date == dates[0]):
+        df = export_archive.positioning_table(lookback)
+        if df is not None:
+            df = df[df[const.ASSET_CLASS].isin(asset_list)]
+    if df is None:
+        df = get_indexer().get_positioning_table_by_asset_class(asset_list, lookback, target_date)
+        # The export's table has them already, read now (positioning_table).
+        if not df.empty:
+            df = options_history.with_max_pain(df)
     if not df.empty:
         df = df.sort_values(by=['Asset Class', 'Name'], ascending=[True, True])
 
+    # Parquet and Arrow keep the table's types: the report date stays a date and the
+    # indexes stay floats, which a CSV would hand back as strings to be parsed again.
+    if fmt not in export_archive.FORMATS:
+        fmt = "csv"
     timestamp = datetime.now().strftime('%Y-%m-%d_%H%M')
-    return dcc.send_data_frame(df.to_csv, f"COT_Positioning_{timestamp}.csv", index=False)
+    ext = export_archive.FORMATS[fmt][0]
+    return dcc.send_bytes(lambda buffer: export_archive.write_frame(df, buffer, fmt),
+                          f"COT_Positioning_{timestamp}{ext}")
@@ -27,11 +27,11 @@ import cotmetrics.models as models
 import dash
 import dash_bootstrap_components as dbc
 from cotmetrics.indexer import get_indexer
-from cotmetrics.reports import get_matrix_data
 from dash import Input, Output, State, callback, clientside_callback, dcc, html, no_update
 
 import app_utils
 import components.strip_traces as strip_traces
+import release_cache
 import viz_config
 import viz_constants as vc
 from components.plot_colors import grid_colors
@@ -473,6 +473,45 @@ def follow_global_lookback(value, current_local_val):
     return new_val
 
 
+# 64 entries. The key is a matrix key plus the model and the three row filters, so the
+# warm-up alone fills 9 (3 lookbacks x 3 models) and the filters multiply what readers add.
+# The entries are frozen StripRows, a few dozen per board, so this is cheap to keep.
+_rows_cache = release_cache.ReleaseCache("strip rows", maxsize=64)
+
+
+def board_rows(asset_classes, lookback, target_date, model, sort_by_index=True,
+               show=strip_traces.SHOW_ALL, side=strip_traces.SIDE_BOTH):
+    """`(rows, skipped, markets, matrix_date)` for one selection, or None with no data.
+
+    The frame comes from the matrix cache the Heatmap shares, and the rows built from it
+    are cached again on top, so palette and column changes are pure layout: neither
+    moves a row. The StripRows are frozen, which is what makes handing the same list to
+    every reader safe where the matrix has to be copied.
+    """
+    key = release_cache.matrix_key(release_cache.current_db_time(), asset_classes,
+                                   lookback, target_date)
+    key += (model.key, bool(sort_by_index), show, side)
+
+    def build():
+        df = release_cache.matrix_data(asset_classes, lookback, target_date)
+        if df.empty:
+            return None
+        rows, skipped = strip_traces.build_rows(df, model, sort_by_index=sort_by_index,
+                                                show=show, side=side)
+        return rows, tuple(skipped), len(df), df.iloc[0]["Date"]
+
+    return _rows_cache.get(key, build)
+
+
+def _warm_default_rows(lookback, model_key):
+    """The board the page opens on: every class, newest week, crowding order, no filter."""
+    asset_classes, target_date = release_cache.default_selection()
+    board_rows(asset_classes, lookback, target_date, models.resolve(model_key))
+
+
+release_cache.register_warmer("strip rows", _warm_default_rows)
+
+
 @callback(
     Output('strip_display_container', 'children'),
     Output('strip_caption', 'children'),
@@ -503,27 +542,28 @@ def render_strip(asset_classes, lookback, model_key, sort_by, show, side, column
                                show or strip_traces.SHOW_ALL,
                                side or strip_traces.SIDE_BOTH,
                                columns, len(asset_classes), len(all_classes))
-    df = get_matrix_data(asset_classes, lookback, target_date)
-    if df.empty:
+    board = board_rows(asset_classes, lookback, target_date, model,
+                       sort_by_index=(sort_by != SORT_ALPHA),
+                       show=show or strip_traces.SHOW_ALL,
+                       side=side or strip_traces.SIDE_BOTH)
+    if board is None:
         return (html.P("No data available.",
                        style={'textAlign': 'center', 'color': vc.TEXT_COLOR}),
                 "", [], summary)
 
-    rows, skipped = strip_traces.build_rows(
-        df, model, sort_by_index=(sort_by != SORT_ALPHA),
-        show=show or strip_traces.SHOW_ALL, side=side or strip_traces.SIDE_BOTH)
+    rows, skipped, markets, matrix_date = board
     # What the filters removed, said rather than left to be noticed. The board is the
     # page's whole claim, so a filtered view that looks like a full one is the one
     # failure mode worth spending a sentence on.
     drawn = sum(1 for r in rows if r.kind == "market")
-    hidden = max(0, len(df) - drawn - len(skipped))
+    hidden = max(0, markets - drawn - len(skipped))
     palette = viz_config.get_palette(palette_name)
     colors = grid_colors(palette)
     chunks = strip_traces.split_columns(rows, int(columns or 1))
     figures = [strip_traces.build_figure(chunk, model, colors, palette)
                for chunk in chunks]
 
-    report_date = target_date or df.iloc[0]["Date"]
+    report_date = target_date or matrix_date
     return (
         # Capped rather than stretched. The axis is a fixed number of units wide
         # whatever the window, so on a wide monitor every bar becomes a slab and the
@@ -1,6 +1,5 @@
 import threading
 from datetime import datetime
-from functools import lru_cache
 
 import cotmetrics.constants as const
 import cotmetrics.models as models
@@ -11,8 +10,11 @@ from cotmetrics.indexer import get_indexer
 from dash import ALL, Input, Output, State, callback, ctx, dcc, html, no_update
 from dash.exceptions import PreventUpdate
 
+import board_snapshot
+import card_store
 import components.plot_helpers as helpers
 import components.signal_cards as signal_cards
+import release_cache
 import viz_config
 import viz_constants as vc
 
@@ -356,21 +358,58 @@ def update_local_model_home(value, current_local_val):
 
 
 # 128 rather than 32: the key is (db_time, class, lookback, palette, filters, model), and
-# 9 classes x 3 lookbacks x 2 models is already 54 combinations before palettes or filter
+# 9 classes x 3 lookbacks x 3 models is already 81 combinations before palettes or filter
 # selections multiply it. At 32 the cache could not even hold one full Expand All across
 # two models, so switching model and back rebuilt everything. Unlike the indexer's frame
 # cache this is cheap to raise: the entries are rendered card trees, not DataFrames.
-@lru_cache(maxsize=128)
+# A ReleaseCache rather than an lru_cache so a new week empties it along with the rest.
+# Behind it is card_store, on disk and shared by every worker, so a restart or a fresh
+# worker reads the trees another process already rendered rather than rendering them.
+_cards_cache = release_cache.ReleaseCache("home cards", maxsize=128)
+
+
 def _cached_build_asset_class_cards(db_time, ac, lookback, palette_name, filter_types_tuple,
                                     model_key=None):
     # model_key is part of the key, not just an argument: the cards carry setup badges,
     # so the same asset class renders differently under each model and a shared entry
     # would serve one model's verdicts under the other's name.
-    filter_types = list(filter_types_tuple)
-    color_palette = viz_config.get_palette(palette_name)
-    return helpers.build_asset_class_cards(get_indexer(), ac, lookback, color_palette,
-                                          model=models.resolve(model_key),
-                                          filter_types=filter_types)
+    def build():
+        color_palette = viz_config.get_palette(palette_name)
+        return helpers.build_asset_class_cards(get_indexer(), ac, lookback, color_palette,
+                                              model=models.resolve(model_key),
+                                              filter_types=list(filter_types_tuple))
+
+    # Memory first, then the disk store, which another worker or an earlier run of this
+    # one may already have filled; a miss in both builds and fills both.
+    key = (db_time, ac, lookback, palette_name, tuple(filter_types_tuple), model_key)
+    return _cards_cache.get(key, lambda: card_store.get(key, build))
+
+
+def _cached_board(lookback, filter_types, model):
+    """The board rows for the Home page's controls, off the release's board snapshot.
+
+    The board feeds three renderers on every input change, palette and the Approaching
+    switch included, and neither of those changes a row. The snapshot is swept once per
+    (lookback, model) per release and the accordion cards read the same one, so a filter
+    chip selects from it rather than sweeping again. Each caller gets its own list of
+    row copies, so a renderer that annotates a row cannot leak it into the next one.
+    """
+    return board_snapshot.snapshot(lookback, model).board_rows(filter_types)
+
+
+def _warm_default_board(lookback, model_key):
+    _cached_board(lookback, [], models.resolve(model_key))
+
+
+def _warm_default_cards(lookback, model_key):
+    """Every accordion as it opens on a fresh session: default palette, no filter chips."""
+    db_time = get_indexer().last_known_db_time
+    for ac in get_indexer().get_asset_classes():
+        _cached_build_asset_class_cards(db_time, ac, lookback, None, (), model_key)
+
+
+release_cache.register_warmer("home board", _warm_default_board)
+release_cache.register_warmer("home cards", _warm_default_cards)
 
 @callback(
     Output('dummy-home-session-saver', 'data'),
@@ -529,14 +568,12 @@ def toggle_all_accordions(expand_clicks, collapse_clicks):
 )
 def update_home_board(lookback, palette_name, filter_types, model_key, show_near,
                       item_ids):
-    from cotmetrics.movers import get_board
-
     if not lookback:
         lookback = "Custom"
     palette = viz_config.get_palette(palette_name)
     model = vc.resolve_model_view(model_key)[0]
 
-    rows = get_board(lookback=lookback, filter_types=filter_types, model=model)
+    rows = _cached_board(lookback, filter_types, model)
 
     # The Approaching switch is a view of rows already swept, not a different sweep. It
     # is an Input here rather than its own callback so it cannot render against a board
@@ -1,7 +1,6 @@
 import os
 import subprocess
 import sys
-from collections import deque
 from datetime import datetime
 from pathlib import Path
 
@@ -11,10 +10,14 @@ import dash
 import dash_bootstrap_components as dbc
 import pandas as pd
 import plotly.express as px
-from cotmetrics.database import cotDatabase
 from dash import ClientsideFunction, Input, Output, State, callback, clientside_callback, dcc, html
 from dash.exceptions import PreventUpdate
 
+import card_store
+import db_pool
+import log_tail
+import release_cache
+import visit_stats
 import viz_constants as vc
 
 dash.register_page(__name__, path='/admin')
@@ -71,10 +74,16 @@ def admin_content():
             dbc.Col(dcc.Graph(id='visitor-geo-chart'), width=6),
         ], className="mb-4"),
 
+        html.Hr(style=vc.hr_style),
+        html.H4("Server Caches", style={'color': vc.TEXT_COLOR}),
+        html.Div(id='admin-cache-table', className="mb-4"),
+
         html.Hr(style=vc.hr_style),
         html.H4("Server Logs", style={'color': vc.TEXT_COLOR}),
 
-        # The Scrolling Log Viewer
+        # The Scrolling Log Viewer. The server sends the lines added since the last
+        # refresh into the store, and the browser appends them (see update_log_diff).
+        dcc.Store(id='admin-log-diff'),
         html.Div([
             html.Pre(
                 id='server-log-viewer',
@@ -280,8 +289,7 @@ def _failure_line(result):
 @callback(
     [Output('visit-time-chart', 'figure'),
      Output('visitor-geo-chart', 'figure'),
-     Output('admin-log-table', 'children'),
-     Output('server-log-viewer', 'children')],
+     Output('admin-log-table', 'children')],
     Input('admin-refresh', 'n_intervals'),
     Input('session_admin_auth', 'data'),
     prevent_initial_call=True
@@ -290,33 +298,34 @@ def update_admin_stats(n, auth_data):
     if auth_data != "AUTHORIZED":
         raise PreventUpdate
 
-    df = cotDatabase.get_visitor_stats()
-    if df.empty:
-        return px.scatter(title="No Data"), px.scatter(title="No Data"), html.P("No logs found."), html.P("No logs found.")
-
-    # Fetch raw log content from the same dir the logger writes to (utils.LOG_DIR,
-    # i.e. COTMETRICS_LOG_DIR). A hardcoded relative "logs/" only matched the
-    # pre-split layout and read nothing once the log dir became configurable.
-    log_content = get_log_tail(os.path.join(utils.LOG_DIR, utils.main_cot_logger_file), n=100)
+    # Three aggregate queries over the recent window rather than the visit table in
+    # pandas, so a refresh costs the same however long the log grows (visit_stats).
+    since = visit_stats.window_start()
+    with db_pool.reader() as conn:
+        recent = visit_stats.recent_visits(conn)
+        hourly = visit_stats.hourly_counts(conn, since)
+        countries = visit_stats.country_counts(conn, since)
+    if recent.empty:
+        return px.scatter(title="No Data"), px.scatter(title="No Data"), html.P("No logs found.")
 
     # Time Chart
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    time_fig = px.histogram(
-        df, x="timestamp",
-        title="Access Frequency",
+    time_fig = px.bar(
+        hourly, x="hour", y="visits",
+        title=f"Access Frequency (hourly, last {visit_stats.WINDOW_DAYS} days)",
         template="plotly_dark",
         color_discrete_sequence=[vc.BLUE_BACKGROUND]
     )
     time_fig.update_layout(
         paper_bgcolor=vc.BACKGROUND_COLOR,
-        plot_bgcolor=vc.BACKGROUND_COLOR
+        plot_bgcolor=vc.BACKGROUND_COLOR,
+        bargap=0
     )
 
     # Geo Chart
     geo_fig = px.bar(
-        df['country'].value_counts().reset_index(),
+        countries,
         x='count', y='country', orientation='h',
-        title="Visitor Geography",
+        title=f"Visitor Geography (last {visit_stats.WINDOW_DAYS} days)",
         template="plotly_dark",
         color_discrete_sequence=[vc.BLUE_BACKGROUND]
     )
@@ -327,23 +336,105 @@ def update_admin_stats(n, auth_data):
 
     # Table: Raw logs (using your established dense-table style)
     table = dbc.Table.from_dataframe(
-        df[['timestamp', 'ip_address', 'city', 'country', 'path']].head(15),
+        recent,
+        striped=True, bordered=True, hover=True,
+        className="dense-table",
+        style={'fontSize': '0.85rem'}
+    )
+
+    return time_fig, geo_fig, table
+
+@callback(
+    Output('admin-cache-table', 'children'),
+    Input('admin-refresh', 'n_intervals'),
+    Input('session_admin_auth', 'data'),
+    prevent_initial_call=True
+)
+def update_cache_stats(n, auth_data):
+    """Hit and miss counts for every release cache, since the process started, and for
+    the Home card store on disk (card_store.py).
+
+    Its own callback rather than a fifth output of update_admin_stats, which returns
+    early on an empty visits table: a fresh install with no visitors is exactly when
+    someone wants to see whether the caches are working.
+    """
+    if auth_data != "AUTHORIZED":
+        raise PreventUpdate
+    return cache_stats_table(release_cache.all_stats() + [card_store.stats()])
+
+
+def cache_stats_table(stats):
+    rows = []
+    for st in stats:
+        lookups = st["hits"] + st["misses"]
+        size = f"{st['bytes'] / 1e6:.1f} / {st['max_bytes'] / 1e6:.0f} MB" if st["max_bytes"] else ""
+        rows.append({
+            "cache": st["name"],
+            "entries": st["entries"] if st["maxsize"] is None else f"{st['entries']} / {st['maxsize']}",
+            "size": size,
+            "hits": st["hits"],
+            "misses": st["misses"],
+            "hit rate": f"{st['hits'] / lookups:.0%}" if lookups else "",
+        })
+    if not rows:
+        return html.P("No caches registered.")
+    return dbc.Table.from_dataframe(
+        pd.DataFrame(rows),
         striped=True, bordered=True, hover=True,
         className="dense-table",
         style={'fontSize': '0.85rem'}
     )
 
-    return time_fig, geo_fig, table, log_content
 
-# Helper to efficiently read the end of a file
-def get_log_tail(filename, n=100):
+# How many lines of the log the viewer shows.
+LOG_LINES = 100
+
+
+@callback(
+    Output('admin-log-diff', 'data'),
+    Input('admin-refresh', 'n_intervals'),
+    Input('session_admin_auth', 'data'),
+    State('admin-log-diff', 'data'),
+    prevent_initial_call=True
+)
+def update_log_diff(n, auth_data, shown):
+    """The log lines this tab has not been sent yet, or the whole tail when it needs it.
+
+    `shown` is what this callback sent last, so it says how far the tab has got. The
+    file is read by one LogTail per process, which only reads what was appended since
+    its last poll (log_tail.py), and a tick with nothing new sends nothing at all.
+    """
+    if auth_data != "AUTHORIZED":
+        raise PreventUpdate
+
+    # Read from the same dir the logger writes to (utils.LOG_DIR, i.e.
+    # COTMETRICS_LOG_DIR). A hardcoded relative "logs/" only matched the pre-split
+    # layout and read nothing once the log dir became configurable.
+    filename = os.path.join(utils.LOG_DIR, utils.main_cot_logger_file)
+    tail = log_tail.for_path(filename, LOG_LINES)
     try:
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                return "".join(deque(f, n))
-        return f"Log file not found at: {filename}"
+        tail.poll()
+    except FileNotFoundError:
+        return {"generation": None, "count": 0, "whole": True, "keep": LOG_LINES,
+                "lines": [f"Log file not found at: {filename}"]}
     except Exception as e:
-        return f"Error reading log: {str(e)}"
+        return {"generation": None, "count": 0, "whole": True, "keep": LOG_LINES,
+                "lines": [f"Error reading log: {str(e)}"]}
+
+    shown = shown or {}
+    generation, count, lines, whole = tail.since(shown.get("generation"), shown.get("count"))
+    if not whole and not lines:
+        raise PreventUpdate
+    return {"generation": generation, "count": count, "whole": whole, "keep": LOG_LINES,
+            "lines": lines}
+
+
+clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='apply_log_diff'),
+    Output('server-log-viewer', 'children'),
+    Input('admin-log-diff', 'data'),
+    State('server-log-viewer', 'children')
+)
 
 
 clientside_callback(
@@ -1,12 +1,8 @@
-import io
-import zipfile
-from datetime import datetime
-
 import dash
 import dash_bootstrap_components as dbc
-from cotmetrics.indexer import get_indexer
-from dash import Input, Output, callback, dcc, html
+from dash import Input, Output, callback, html
 
+import export_archive
 import viz_config
 import viz_constants as vc
 
@@ -31,18 +27,40 @@ layout = html.Div([
             dbc.Accordion([
                 dbc.AccordionItem([
                     dbc.Row([
+                        dbc.Col([
+                            dbc.Select(
+                                persistence=True,
+                                id="options_download_format",
+                                options=[{"label": label, "value": fmt} for fmt, label
+                                         in export_archive.FORMAT_LABELS.items()],
+                                value="csv",
+                                size="sm",
+                                className="bg-dark text-white border-secondary",
+                                style={'backgroundColor': vc.BACKGROUND_COLOR, 'color': vc.TEXT_COLOR, 'borderColor': f"{vc.TEXT_COLOR}26"}
+                            ),
+                            dbc.Tooltip(
+                                "CSV, or Parquet and Arrow IPC, which keep dates and "
+                                "numbers typed for notebooks.",
+                                target="options_download_format",
+                                placement="top"
+                            ),
+                        ], width="auto"),
+
                         dbc.Col([
                             dbc.Button(
                                 [html.I(className="bi bi-download"), "CFTC Data"],
                                 id="sidebar-full-download-btn",
+                                # Served by app_cot's download route, which streams
+                                # the archive export_archive built for this week.
+                                href="/download/cftc.zip",
+                                external_link=True,
                                 color="secondary",
                                 outline=True,
                                 size="sm",
                                 style=vc.button_style
                             ),
-                            dcc.Download(id="sidebar-full-download-logic"),
                             dbc.Tooltip(
-                                "Download all of the CFTC data as one CSV per asset.",
+                                "Download all of the CFTC data as one file per asset.",
                                 target="sidebar-full-download-btn",
                                 placement="top"
                             ),
@@ -53,12 +71,13 @@ layout = html.Div([
                                 [html.I(className="bi bi-cloud-download"),
                                     "Real Test Data"],
                                 id="sidebar-real-test-download-btn",
+                                href="/download/real_test.zip",
+                                external_link=True,
                                 color="secondary",
                                 outline=True,
                                 size="sm",
                                 style=vc.button_style
                             ),
-                            dcc.Download(id="sidebar-real-test-download-logic"),
                             dbc.Tooltip(
                                 "Download Real Test event lists for back testing.",
                                 target="sidebar-real-test-download-btn",
@@ -117,95 +136,15 @@ def save_palette_to_store(selected_palette_theme):
         return selected_palette_theme
 
 
-
-@callback(
-    Output("sidebar-full-download-logic", "data"),
-    Input("sidebar-full-download-btn", "n_clicks"),
-    prevent_initial_call=True,
-)
-def download_cftc_data_zip(n_clicks):
-    if not n_clicks:
-        return None
-
-    all_classes = get_indexer().get_asset_classes()
-    all_classes.sort()
-
-    # Create an in-memory buffer to hold the zip data
-    buffer = io.BytesIO()
-
-    # Initialize the ZipFile object
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for asset_class in all_classes:
-            for asset in get_indexer().get_assets_for_asset_class(asset_class):
-                instrument_code = get_indexer().get_instrument_code_from_name(
-                    asset)
-                df = get_indexer().collect_symbol_summary_results(instrument_code)
-
-                if not df.empty:
-                    # Convert DataFrame to a CSV string
-                    csv_string = df.to_csv(index=False)
-
-                    # Write the CSV string into the zip as a file
-                    # We sanitize the name by removing spaces
-                    file_name = f"{get_indexer().get_instrument_symbol_from_name(asset).replace(' ', '_')}_summary.csv"
-                    zf.writestr(file_name, csv_string)
-
-                df_detailed = get_indexer().collect_symbol_detailed_results(
-                    instrument_code)
-                if not df_detailed.empty:
-                    csv_string_detailed = df_detailed.to_csv(index=False)
-                    file_name_detailed = f"{get_indexer().get_instrument_symbol_from_name(asset).replace(' ', '_')}_detailed.csv"
-                    zf.writestr(file_name_detailed, csv_string_detailed)
-
-    # Seek to the start of the buffer so Dash can read it
-    buffer.seek(0)
-
-    zip_filename = f"COT_Full_Data_{datetime.now().strftime('%Y-%m-%d')}.zip"
-
-    # Use send_bytes to transmit the binary zip data
-    return dcc.send_bytes(buffer.getvalue(), zip_filename)
-
-
 @callback(
-    Output("sidebar-real-test-download-logic", "data"),
-    Input("sidebar-real-test-download-btn", "n_clicks"),
-    prevent_initial_call=True,
+    Output("sidebar-full-download-btn", "href"),
+    Output("sidebar-real-test-download-btn", "href"),
+    Input("options_download_format", "value"),
 )
-def download_real_test_data_zip(n_clicks):
-    if not n_clicks:
-        return None
-
-    all_classes = get_indexer().get_asset_classes()
-    all_classes.sort()
-
-    # Create an in-memory buffer to hold the zip data
-    buffer = io.BytesIO()
-
-    # Initialize the ZipFile object
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for asset_class in all_classes:
-            for asset in get_indexer().get_assets_for_asset_class(asset_class):
-                instrument_code = get_indexer().get_instrument_code_from_name(
-                    asset)
-                df = get_indexer().create_real_test_event_asset_list(
-                    instrument_code)
-
-                if not df.empty:
-                    # Convert DataFrame to a CSV string
-                    csv_string = df.to_csv(index=False)
-
-                    # Write the CSV string into the zip as a file
-                    # We sanitize the name by removing spaces
-                    file_name = f"{get_indexer().get_instrument_symbol_from_name(asset).replace(' ', '_')}_real_test.csv"
-                    zf.writestr(file_name, csv_string)
-
-    # Seek to the start of the buffer so Dash can read it
-    buffer.seek(0)
-
-    zip_filename = f"COT_Real_Test_Data_{datetime.now().strftime('%Y-%m-%d')}.zip"
+def set_download_format(fmt):
+    query = "" if not fmt or fmt == "csv" else f"?format={fmt}"
+    return f"/download/cftc.zip{query}", f"/download/real_test.zip{query}"
 
-    # Use send_bytes to transmit the binary zip data
-    return dcc.send_bytes(buffer.getvalue(), zip_filename)
 
 @callback(
     Output('theme_store', 'data'),
@@ -3,10 +3,12 @@ import dash
 import dash_ag_grid as dag
 import dash_bootstrap_components as dbc
 import pandas as pd
-from cotmetrics.database import cotDatabase
 from cotmetrics.indexer import get_indexer
-from dash import Input, Output, callback, dcc, html
+from dash import Input, Output, State, callback, dcc, html
 
+import db_pool
+import grid_pages
+import release_cache
 import viz_constants as vc
 
 dash.register_page(
@@ -67,80 +69,114 @@ def layout(**kwargs):
         ], fluid=True)
     ])
 
-@callback(
-    Output('raw_data_table_container', 'children'),
-    [Input('raw_data_instrument_selector', 'value'),
-     Input('raw_data_dataset_selector', 'value')]
-)
-def update_raw_data_table(instrument_code, dataset_type):
-    if dataset_type == "ml":
-        import sqlite3
-        try:
-            conn = sqlite3.connect(cotDatabase.db_name)
-            if instrument_code:
-                symbol = get_indexer().instruments[instrument_code].symbol
-                df_preds = pd.read_sql_query(f"SELECT * FROM ml_predictions_v2 WHERE symbol='{symbol}' ORDER BY report_date DESC", conn)
-
-                # Get the full feature dataframe
-                feat_df = get_indexer().instruments[instrument_code].df.copy()
-
-                if not feat_df.empty and not df_preds.empty:
-                    # Convert report_date to datetime for merging
-                    df_preds['report_date'] = pd.to_datetime(df_preds['report_date'])
-
-                    # Convert feat_df dates to timezone-naive for safe merging
-                    feat_df_dates = feat_df[const.REPORT_DATE_XLS].dt.tz_localize(None)
-                    feat_df[const.REPORT_DATE_XLS] = feat_df_dates
-
-                    # Merge predictions onto the feature dataframe
-                    df = pd.merge(
-                        df_preds,
-                        feat_df,
-                        left_on='report_date',
-                        right_on=const.REPORT_DATE_XLS,
-                        how='left'
-                    )
+# One GridView per dataset and instrument a reader has opened, for this release. The
+# grid pages through it block by block (see grid_pages), so the frame is copied and its
+# dates formatted once per view rather than on every switch back to an instrument.
+_views = release_cache.ReleaseCache("raw data views", maxsize=8)
+
+# How many predictions the ML dataset shows with no instrument selected.
+ML_RECENT_ROWS = 1000
+
+
+def _ml_frame(conn, instrument_code):
+    if not instrument_code:
+        return pd.read_sql_query(
+            "SELECT * FROM ml_predictions_v2 ORDER BY report_date DESC LIMIT ?",
+            conn, params=(ML_RECENT_ROWS,))
+
+    instrument = get_indexer().instruments[instrument_code]
+    df_preds = pd.read_sql_query(
+        "SELECT * FROM ml_predictions_v2 WHERE symbol = ? ORDER BY report_date DESC",
+        conn, params=(instrument.symbol,))
+
+    # Get the full feature dataframe
+    feat_df = instrument.df.copy()
+    if feat_df.empty or df_preds.empty:
+        return df_preds
+
+    # Convert report_date to datetime for merging
+    df_preds['report_date'] = pd.to_datetime(df_preds['report_date'])
+
+    # Convert feat_df dates to timezone-naive for safe merging
+    feat_df[const.REPORT_DATE_XLS] = feat_df[const.REPORT_DATE_XLS].dt.tz_localize(None)
+
+    # Merge predictions onto the feature dataframe
+    df = pd.merge(
+        df_preds,
+        feat_df,
+        left_on='report_date',
+        right_on=const.REPORT_DATE_XLS,
+        how='left'
+    )
+
+    # Clean up redundant date columns
+    if const.REPORT_DATE_XLS in df.columns:
+        df = df.drop(columns=[const.REPORT_DATE_XLS])
+    return df
+
 
-                    # Clean up redundant date columns
-                    if const.REPORT_DATE_XLS in df.columns:
-                        df = df.drop(columns=[const.REPORT_DATE_XLS])
-                else:
-                    df = df_preds
-            else:
-                df = pd.read_sql_query("SELECT * FROM ml_predictions_v2 ORDER BY report_date DESC LIMIT 1000", conn)
-            conn.close()
-        except Exception as e:
-            return dbc.Alert(f"Database error: {e}", color="danger")
+def _predictions_stamp(conn, instrument_code):
+    """What the predictions behind a view were when it was built. Predictions are
+    written outside the weekly release, so the release alone cannot key an ML view."""
+    if instrument_code:
+        symbol = get_indexer().instruments[instrument_code].symbol
+        return conn.execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM ml_predictions_v2 WHERE symbol = ?",
+            (symbol,)).fetchone()
+    return conn.execute(
+        "SELECT COUNT(*), MAX(updated_at) FROM ml_predictions_v2").fetchone()
 
+
+def raw_data_view(instrument_code, dataset_type):
+    """The GridView for one selection, or None when there is nothing to show.
+
+    The ML dataset's database errors are raised, for the caller to report.
+    """
+    key = (release_cache.current_db_time(), dataset_type, instrument_code)
+    if dataset_type == "ml":
+        with db_pool.reader() as conn:
+            key += tuple(_predictions_stamp(conn, instrument_code))
+
+        def build():
+            with db_pool.reader() as conn:
+                df = _ml_frame(conn, instrument_code)
+            return None if df is None or df.empty else grid_pages.GridView(df)
     else:
         if not instrument_code or instrument_code not in get_indexer().instruments:
-            return html.Div("No instrument selected or available.", style={"color": "white"})
+            return None
 
-        instrument = get_indexer().instruments[instrument_code]
-        df = instrument.df
+        def build():
+            df = get_indexer().instruments[instrument_code].df
+            return None if df is None or df.empty else grid_pages.GridView(df)
 
-    if df is None or df.empty:
-        return dbc.Alert("No raw data found for this instrument.", color="warning")
+    return _views.get(key, build)
 
-    # Convert dates to string for AG Grid
-    display_df = df.copy()
-    for col in display_df.select_dtypes(include=['datetime64', 'datetimetz']).columns:
-        display_df[col] = display_df[col].dt.strftime('%Y-%m-%d')
 
-    # Build columns definition
-    column_defs = [
-        {
-            "field": col,
-            "sortable": True,
-            "filter": True,
-            "resizable": True
-        } for col in display_df.columns
-    ]
+@callback(
+    Output('raw_data_table_container', 'children'),
+    [Input('raw_data_instrument_selector', 'value'),
+     Input('raw_data_dataset_selector', 'value')]
+)
+def update_raw_data_table(instrument_code, dataset_type):
+    if dataset_type != "ml" and (not instrument_code
+                                 or instrument_code not in get_indexer().instruments):
+        return html.Div("No instrument selected or available.", style={"color": "white"})
+    try:
+        view = raw_data_view(instrument_code, dataset_type)
+    except Exception as e:
+        return dbc.Alert(f"Database error: {e}", color="danger")
+
+    if view is None:
+        return dbc.Alert("No raw data found for this instrument.", color="warning")
 
+    # Only the columns go out with the grid. Its rows come a block at a time, from
+    # serve_raw_data_rows below, as the reader pages and scrolls: the whole history in
+    # one rowData payload was most of a second to serialise and parse before the first
+    # row drew, and grew with every week the store has.
     return dag.AgGrid(
         id="raw_data_grid",
-        rowData=display_df.to_dict("records"),
-        columnDefs=column_defs,
+        rowModelType="infinite",
+        columnDefs=[dict(col, resizable=True) for col in view.column_defs()],
         className="ag-theme-quartz-dark",
         style={"height": "75vh", "width": "100%", "fontSize": "11px"},
         defaultColDef={
@@ -153,7 +189,25 @@ def update_raw_data_table(instrument_code, dataset_type):
         },
         dashGridOptions={
             "pagination": True,
-            "paginationPageSize": 100,
+            "paginationPageSize": grid_pages.BLOCK_ROWS,
+            "cacheBlockSize": grid_pages.BLOCK_ROWS,
             "rowHeight": 26,
         },
     )
+
+
+@callback(
+    Output('raw_data_grid', 'getRowsResponse'),
+    Input('raw_data_grid', 'getRowsRequest'),
+    [State('raw_data_instrument_selector', 'value'),
+     State('raw_data_dataset_selector', 'value')],
+    prevent_initial_call=True,
+)
+def serve_raw_data_rows(request, instrument_code, dataset_type):
+    try:
+        view = raw_data_view(instrument_code, dataset_type)
+    except Exception:
+        view = None
+    if view is None:
+        return {"rowData": [], "rowCount": 0}
+    return grid_pages.get_rows(view, request)
@@ -0,0 +1,296 @@
+"""
+release_cache.py
+
+Server-side caches whose entries belong to one COT release.
+
+Everything the analytics pages draw is a pure function of the week the store is on and
+the controls the reader set, and most of the controls are presentation: palette, sort,
+side, column count. None of those change the frame underneath, yet before this every one
+of them re-ran the sweep that builds it, because the callbacks that draw and the sweep
+that feeds them were the same function. A palette flip on a full Heatmap board re-read
+all 42 instruments to recolour a grid.
+
+Two rules hold for every cache here, and they are the reason this is one module rather
+than an `lru_cache` on each page:
+
+1. The release is part of the key. `db_time` is `CotIndexer.last_known_db_time`, which
+   only moves inside `refresh_if_stale`, so an entry built before a release can never be
+   served after it even if nothing cleared it. That is the correctness half.
+2. A new week empties the caches. Keying alone would leave last week's entries sitting
+   in the LRU until they aged out, and the first visitor after a release would be
+   competing with them for slots. `refresh_if_stale` below is the indexer's call plus
+   that clear, and it is what the navbar poller and the store poller both go through.
+   That is the memory half.
+
+Entries are built outside the lock. Two callbacks missing the same key at once will both
+build it, which costs one duplicate sweep; holding the lock across a sweep would instead
+stall every other page's lookup behind it, which is the worse trade on a Friday.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cotmetrics.utils as utils
+
+import viz_constants as vc
+
+# Every lookback a page can be set to. The selectors each carry their own literal list,
+# and the warm-up below has to cover exactly those.
+LOOKBACKS = ("26", "52", "Custom")
+
+# Every ReleaseCache registers itself here, so a new week can empty all of them without
+# this module having to know which pages made one.
+_CACHES = []
+
+# (name, fn, by_model). Pages register what their default view needs at import, for the
+# same reason they register their caches: this module stays ignorant of what they draw.
+_WARMERS = []
+_warm_lock = threading.Lock()
+_warmed_for = None
+
+
+class ReleaseCache:
+    """A small thread-safe LRU. Keys are expected to lead with `db_time`.
+
+    Deliberately not `functools.lru_cache`: that cannot be emptied selectively, cannot
+    report its hit rate to the Admin page, and has no way to hand callers a copy, which
+    the matrix needs (see `matrix_data`).
+
+    Bounded by entry count, by bytes, or both. A count is the right bound when every
+    entry is about the same size (one matrix is one matrix), and the wrong one when they
+    are not: a serialized figure runs from tens of KB for one panel to several MB for a
+    nine-panel stack, so a count either wastes memory or holds almost nothing. `weigh`
+    says what an entry costs; it is only consulted when `max_bytes` is set. An entry
+    heavier than the whole budget is returned but not kept, since storing it would evict
+    everything else to make room for one reader.
+    """
+
+    def __init__(self, name, maxsize=None, max_bytes=None, weigh=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._weigh = weigh or len
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _CACHES.append(self)
+
+    def get(self, key, build):
+        """The entry for `key`, building it with `build()` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        size = self._weigh(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes.pop(key, 0)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while self._entries and self._over_budget():
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key, 0)
+        return value
+
+    def _over_budget(self):
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {"name": self.name, "entries": len(self._entries),
+                    "maxsize": self.maxsize, "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits,
+                    "misses": self.misses}
+
+
+def invalidate_all():
+    for cache in _CACHES:
+        cache.clear()
+
+
+def all_stats():
+    return [cache.stats() for cache in _CACHES]
+
+
+def current_db_time():
+    from cotmetrics.indexer import get_indexer
+    return get_indexer().last_known_db_time
+
+
+def refresh_if_stale():
+    """`CotIndexer.refresh_if_stale`, plus emptying every release cache on a new week.
+
+    Call this rather than the indexer's method directly. The indexer clears its own
+    lru_caches when the week moves; these live outside it and would otherwise be left
+    holding the previous release until eviction.
+
+    A new week also starts the warm-up (see `warm`) on a background thread. It is
+    started HERE rather than by the store poller alone because the navbar callback can
+    win the race for the True, exactly as it can for the weekly email, and a warm-up
+    that only ran when the poller happened to be first would be skipped on the Fridays
+    somebody had a tab open, which is to say most of them. Backgrounded because the
+    navbar caller is a request: the badge should move now, not after every default view
+    has been drawn.
+
+    Under several workers (shared_index.py) only the refresher rebuilds. It publishes
+    the new week's frames before warming, so the warm-up reads them back rather than
+    holding its own copies; every other worker moves when it finds them published.
+    """
+    from cotmetrics.indexer import get_indexer
+
+    import shared_index
+
+    if shared_index.following():
+        moved = shared_index.adopt_if_published()
+    else:
+        moved = get_indexer().refresh_if_stale()
+    if not moved:
+        return False
+    invalidate_all()
+    utils.cot_logger.info("Release caches emptied for the new COT week.")
+    threading.Thread(target=_new_week, name="release-warmup", daemon=True).start()
+    return True
+
+
+def _new_week():
+    import shared_index
+
+    if shared_index.leading():
+        try:
+            shared_index.publish()
+        except Exception as e:
+            # The workers stay on the old week until a later tick publishes; this one
+            # serves the new week off its own frames meanwhile.
+            utils.cot_logger.error(f"Frame snapshot not published: {e}")
+    warm()
+
+
+# ── the warm-up ────────────────────────────────────────────────────────────────
+
+def register_warmer(name, fn, by_model=True):
+    """Add a default-view artifact to the post-release warm-up.
+
+    `fn(lookback, model_key)` is called once per lookback, and once per model as well
+    when `by_model` is set. It should build through the same cached function the page's
+    callback calls, with the arguments the page's controls start on, or the warm-up
+    fills entries no first render will ever ask for. Warmers run in registration order,
+    so one that reads another's cache (the strip rows read the matrix) goes after it.
+    """
+    _WARMERS.append((name, fn, by_model))
+
+
+def warm(lookbacks=LOOKBACKS, model_keys=None):
+    """Precompute every registered default view for the release the indexer is on.
+
+    Once per release: a second caller for the same week returns at once, so a poller
+    tick and a navbar tick that both see the refresh cannot run it twice. Each artifact
+    is timed and logged on its own line, because "the warm-up took 90s" says nothing
+    about which page to look at when it starts taking 180.
+
+    A warmer that raises is logged and skipped. The rest of the board is still worth
+    having, and the page whose warmer failed simply builds on first view as it always
+    did before this existed.
+    """
+    global _warmed_for
+
+    model_keys = tuple(model_keys or vc.MODEL_CHOICES)
+    db_time = current_db_time()
+    with _warm_lock:
+        if db_time is not None and db_time == _warmed_for:
+            return
+        _warmed_for = db_time
+
+        started = time.time()
+        for name, fn, by_model in _WARMERS:
+            artifact_started = time.time()
+            for lookback in lookbacks:
+                for model_key in (model_keys if by_model else (None,)):
+                    try:
+                        fn(lookback, model_key)
+                    except Exception as e:
+                        utils.cot_logger.error(
+                            f"Warm-up: {name} ({lookback}, {model_key}) failed: {e}")
+            utils.cot_logger.info(
+                f"Warm-up: {name} built in {time.time() - artifact_started:.2f}s.")
+        utils.cot_logger.info(
+            f"Warm-up for {db_time} done in {time.time() - started:.2f}s.")
+
+
+# ── the signal matrix ──────────────────────────────────────────────────────────
+
+# 32 entries. A key is one (classes, lookback, date) selection, and a default view is
+# one per lookback, so this holds every page's default across both pages plus a healthy
+# number of ad hoc selections. Each entry is ~42 rows; memory is not what bounds this.
+_matrix_cache = ReleaseCache("matrix", maxsize=32)
+
+
+def matrix_key(db_time, asset_classes, lookback, target_date):
+    """The cache key for one matrix, in the shape `matrix_data` uses.
+
+    The classes stay a tuple in the order given rather than a frozenset: the matrix
+    emits its rows class by class in that order, and the Heatmap draws them as they
+    come, so two selections of the same set in a different order are two grids.
+    """
+    return (db_time, tuple(asset_classes or ()), lookback, target_date or None)
+
+
+def matrix_data(asset_classes, lookback, target_date=None):
+    """`cotmetrics.reports.get_matrix_data`, shared between the Heatmap and the Strip.
+
+    Returns a COPY. The Heatmap rewrites the Asset column into markdown links in place,
+    so handing out the cached frame itself would serve those links, twice wrapped, to
+    the next reader of the same key.
+    """
+    from cotmetrics.reports import get_matrix_data
+
+    key = matrix_key(current_db_time(), asset_classes, lookback, target_date)
+    df = _matrix_cache.get(key, lambda: get_matrix_data(asset_classes, lookback, target_date))
+    return df.copy()
+
+
+def default_selection():
+    """`(asset_classes, target_date)` as the Heatmap and the Strip first render them.
+
+    Both pages open on every class and the newest week, and both pass that week as a
+    DATE rather than as None, so a warm entry has to be keyed the same way or the first
+    render misses it.
+    """
+    from cotmetrics.indexer import get_indexer
+
+    dates = get_indexer().get_available_dates()
+    return get_indexer().get_asset_classes(), (dates[0] if dates else None)
+
+
+def _warm_default_matrix(lookback, _model_key):
+    asset_classes, target_date = default_selection()
+    matrix_data(asset_classes, lookback, target_date)
+
+
+# Registered here rather than by either page so it is always first: the strip rows build
+# from it, and whichever page Dash happened to import first would otherwise get the sweep
+# billed to its own artifact in the timings.
+register_warmer("matrix", _warm_default_matrix, by_model=False)
@@ -0,0 +1,263 @@
+"""
+shared_index.py
+
+The indexer under several gunicorn workers: one refresher, every worker reading the
+frames it publishes.
+
+main.py serves from one process, and everything in this app assumes it: the CotIndexer
+singleton, its frame cache and the page caches live in that process, and the store
+poller is a thread so that the refresh it runs lands in the address space that serves.
+`main.py --workers N` runs N gunicorn workers instead, so throughput follows the cores,
+and three things that were free in one process need an owner:
+
+1. Who rebuilds. A new week costs a rebuild of the index, ~6s on a laptop and ~96s on
+   the VPS, and each worker's poller and navbar callback would otherwise run one. The
+   refresher is whichever worker holds an exclusive flock on LOCK_FILE. It is taken
+   without blocking on boot and on every poll tick, and held for the life of the
+   process, so if the refresher dies the kernel drops the lock and the next worker to
+   tick takes over. Only the refresher rebuilds; the other workers stand down (their
+   indexer's `refresh_if_stale` is False) and adopt what it publishes.
+2. Where the frames live. The refresher publishes every `get_symbols_data` frame of the
+   release to frame_snapshot, and every worker's `get_symbols_data`, the refresher's
+   included, reads from there while the snapshot is of the release it is on. A frame
+   the snapshot does not have, or any frame while the snapshot is a release behind, is
+   computed as it always was.
+3. How a worker moves to a new week. It builds a new indexer, which loads the parquet
+   cache the refresher's rebuild wrote rather than deriving anything, and swaps the
+   singleton (`cotmetrics.indexer.reset_indexer`), then empties its release caches and
+   warms its default views as any new week does (release_cache.refresh_if_stale).
+
+Nothing here runs in the single-process mode: `active()` is False until `start_worker`.
+"""
+import fcntl
+import functools
+import os
+import threading
+from pathlib import Path
+
+import cotmetrics.constants as const
+import cotmetrics.utils as utils
+
+import frame_snapshot
+
+LOCK_FILE = Path(const.CACHE_DIR) / "refresher.lock"
+
+_active = False
+_lease = None
+_adopt_lock = threading.Lock()
+
+
+class Lease:
+    """An exclusive, non-blocking flock on `path`, held until the process exits."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self):
+        """True if this process holds the lease, taking it if nobody else does."""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def active():
+    return _active
+
+
+def leading():
+    return _active and _lease is not None and _lease.held
+
+
+def following():
+    return _active and not leading()
+
+
+def _stand_down():
+    # A follower's indexer never rebuilds: that is the refresher's, and this worker
+    # picks the result up through adopt_if_published. It is also what get_symbols_data
+    # calls on a cold key, which would otherwise be a full rebuild inside a request.
+    return False
+
+
+_following_classes = {}
+
+
+def _computed(cls):
+    """The lru_cached `get_symbols_data` that computes frames for `cls`'s instances."""
+    return getattr(cls, "_computed_symbols_data", cls.get_symbols_data)
+
+
+def _following_class(base):
+    """`base` with a `get_symbols_data` that reads the published snapshot first.
+
+    A subclass rather than an attribute on the instance: cotmetrics' refresh_if_stale
+    empties the frame cache through `self.get_symbols_data.__func__.cache_clear()`,
+    which a plain closure on the instance does not have, so the refresher's first new
+    week raised there after building it and before adopting its stamp. Here the method
+    is still a function on the class, and its cache_clear is the lru_cache's of the
+    method it falls back on, the one the frames it computes are held in.
+    """
+    if hasattr(base, "_computed_symbols_data"):
+        return base
+    if base not in _following_classes:
+        compute = base.get_symbols_data
+
+        @functools.wraps(compute)
+        def get_symbols_data(self, name, lookback, basis=const.BASIS_RAW):
+            shared = frame_snapshot.current()
+            if shared is not None and shared.release == str(self.last_known_db_time):
+                df = shared.frame(name, lookback, basis)
+                if df is not None:
+                    return df
+            return compute(self, name, lookback, basis)
+
+        for attr in ("cache_clear", "cache_info"):
+            if hasattr(compute, attr):
+                setattr(get_symbols_data, attr, getattr(compute, attr))
+        _following_classes[base] = type(base.__name__, (base,), {
+            "__module__": base.__module__,
+            "__qualname__": base.__qualname__,
+            "get_symbols_data": get_symbols_data,
+            "_computed_symbols_data": compute,
+        })
+    return _following_classes[base]
+
+
+def follow(indexer, stand_down=True):
+    """Point `indexer.get_symbols_data` at the published snapshot.
+
+    The indexer's class becomes a subclass of its own (`_following_class`) whose
+    `get_symbols_data` serves the snapshot's frame, and computes one through the class's
+    lru_cached method when the snapshot cannot. With `stand_down`, `refresh_if_stale`
+    on the instance is False as well.
+    """
+    indexer.__class__ = _following_class(type(indexer))
+    if stand_down:
+        indexer.refresh_if_stale = _stand_down
+    else:
+        vars(indexer).pop("refresh_if_stale", None)
+    return indexer
+
+
+def try_lead():
+    """True if this worker is the refresher, taking the lease if it is free."""
+    from cotmetrics.indexer import get_indexer
+
+    if not _active:
+        return False
+    was_leading = _lease.held
+    if not _lease.acquire():
+        return False
+    if not was_leading:
+        utils.cot_logger.info(f"Shared index: pid {os.getpid()} is the refresher.")
+        follow(get_indexer(), stand_down=False)
+    return True
+
+
+def publish():
+    """Publish the refresher's release unless it is out already, then let the
+    refresher's own frame cache go.
+
+    The frames are computed through the class's cached method, so a frame the warm-up or a
+    request already computed for this release is not computed again; once they are on
+    disk this worker reads them back like every other, and the lru_cache's copies are
+    the memory the snapshot exists to save.
+    """
+    from cotmetrics.indexer import get_indexer
+
+    if not leading():
+        return None
+    indexer = get_indexer()
+    shared = frame_snapshot.current()
+    if shared is not None and shared.release == str(indexer.last_known_db_time):
+        return shared.root
+    compute = _computed(type(indexer))
+    root = frame_snapshot.publish(indexer, frame=lambda *key: compute(indexer, *key))
+    compute.cache_clear()
+    return root
+
+
+def _release_caches(indexer):
+    """Empty every lru_cache on `indexer`'s class, as refresh_if_stale does on a rebuild.
+
+    The caches are the class's and are keyed on the instance, so dropping the singleton
+    leaves its entries, and through them the old week's whole state, alive until they
+    are evicted. The process holds no other indexer, so nothing else is lost.
+    """
+    for cls in type(indexer).__mro__:
+        for attr in vars(cls).values():
+            if callable(getattr(attr, "cache_clear", None)):
+                attr.cache_clear()
+
+
+def adopt_if_published():
+    """Move a follower to the release the refresher published; True if it moved.
+
+    The release_cache.refresh_if_stale of a follower: the caller empties the page
+    caches and warms them on True, exactly as after a rebuild.
+    """
+    from cotmetrics.indexer import get_indexer, reset_indexer
+
+    shared = frame_snapshot.current()
+    if shared is None or shared.release == str(get_indexer().last_known_db_time):
+        return False
+    with _adopt_lock:
+        if shared.release == str(get_indexer().last_known_db_time):
+            return False
+        utils.cot_logger.info(f"Shared index: adopting {shared.release} in pid {os.getpid()}.")
+        old = get_indexer()
+        reset_indexer()
+        _release_caches(old)
+        follow(get_indexer())
+        return True
+
+
+def start_worker():
+    """Enter the multi-worker mode in this (freshly forked) worker.
+
+    Builds the worker's indexer off the parquet cache, puts its frame reads on the
+    snapshot and tries for the refresher's lease once, so a boot has a refresher before
+    the first poll tick rather than five minutes after it.
+    """
+    from cotmetrics.indexer import get_indexer
+
+    global _active, _lease
+    _active = True
+    _lease = Lease(LOCK_FILE)
+    follow(get_indexer())
+    if try_lead():
+        publish()
+
+
+def prepare():
+    """Build the index and publish its snapshot, for main.py to run before the workers.
+
+    In a child process of its own, so the gunicorn master does not hold an indexer: a
+    cold cache is rebuilt here once rather than by every worker at once, and the
+    workers start on a published snapshot.
+    """
+    from cotmetrics.indexer import get_indexer
+
+    indexer = get_indexer()
+    compute = type(indexer).get_symbols_data
+    frame_snapshot.publish(indexer, frame=lambda *key: compute(indexer, *key))
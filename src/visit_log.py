@@ -0,0 +1,249 @@
+"""
+visit_log.py
+
+Visitor logging, off the request path.
+
+`app_cot.record_visit` runs before every page request. It used to ask ip-api.com where
+the visitor was, with a half-second timeout, and then open SQLite and insert the row,
+all before the page was served. A burst of page loads therefore queued behind the
+geolocation service and behind each other's write locks, for a log nobody reads until
+the Admin page.
+
+Now the hook only puts the visit on a bounded queue, which is constant time and never
+waits. One background thread drains the queue, resolves each visitor's location once
+and writes the whole batch in a single transaction. A full queue drops the visit and
+counts it rather than blocking a page behind the log. The writer starts on the first
+visit, in the process that receives it, so a forked worker gets a writer of its own.
+
+Where a visitor is comes from, in order: an in-memory TTL/LRU cache keyed by IP, the
+offline resolver, and ip-api.com. The offline resolver is pluggable
+(`set_offline_resolver`): the default only answers for loopback and private addresses,
+which are the ones the old hook skipped, but a GeoIP database reader fits the same slot
+and then the network is never asked at all. ip-api's free tier allows 45 lookups a
+minute, so a failed lookup is cached too, briefly, rather than retried per request.
+"""
+import atexit
+import ipaddress
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import cotmetrics.utils as utils
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 200
+# How long the writer waits for more visits before writing a short batch.
+FLUSH_SECONDS = 2.0
+
+GEO_CACHE_SIZE = 4096
+GEO_TTL_SECONDS = 24 * 3600
+GEO_FAILURE_TTL_SECONDS = 60
+GEO_TIMEOUT_SECONDS = 0.5
+
+LOCAL = ("Internal", "Local")
+LOOKUP_ERROR = ("Lookup", "Error")
+
+_INSERT = '''
+    INSERT INTO visitor_logs
+        (timestamp, ip_address, path, user_agent, city, country,
+         kind, visitor_id, is_bot, referrer)
+    VALUES (?, ?, ?, ?, ?, ?, 'landing', NULL, 0, NULL)
+'''
+
+
+class GeoCache:
+    """A thread-safe LRU of `ip -> (city, country)` whose entries expire."""
+
+    def __init__(self, maxsize=GEO_CACHE_SIZE, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, ip):
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is None:
+                return None
+            expires, place = entry
+            if expires <= self._clock():
+                del self._entries[ip]
+                return None
+            self._entries.move_to_end(ip)
+            return place
+
+    def put(self, ip, place, ttl):
+        with self._lock:
+            self._entries[ip] = (self._clock() + ttl, place)
+            self._entries.move_to_end(ip)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def local_resolver(ip):
+    """`LOCAL` for loopback and private addresses, None for anything it cannot place."""
+    if ip == "localhost":
+        return LOCAL
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    return LOCAL if (addr.is_loopback or addr.is_private) else None
+
+
+def ip_api_resolver(ip):
+    """(city, country) from ip-api.com, None if it has no answer. Raises on a network
+    error, which the caller caches as `LOOKUP_ERROR`."""
+    import requests
+    response = requests.get(f"http://ip-api.com/json/{ip}",
+                            timeout=GEO_TIMEOUT_SECONDS).json()
+    if response.get('status') == 'success':
+        return response.get('city'), response.get('country')
+    return None
+
+
+class VisitLog:
+    """The queue, the writer thread that drains it, and the geolocation in between."""
+
+    def __init__(self, db_name, offline_resolver=local_resolver,
+                 online_resolver=ip_api_resolver, maxsize=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.db_name = db_name
+        self.offline_resolver = offline_resolver
+        self.online_resolver = online_resolver
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.geo = GeoCache()
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._start_lock = threading.Lock()
+        self._writer = None
+        self.written = 0
+        self.dropped = 0
+
+    def enqueue(self, ip, path, user_agent):
+        """Record a visit. Never blocks: a full queue drops the visit and counts it."""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            self._queue.put_nowait((now, ip, path, user_agent))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._writer is None:
+            self.start()
+
+    def start(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="visit-log",
+                                                daemon=True)
+                self._writer.start()
+
+    def locate(self, ip):
+        """(city, country) for `ip`: the cache, then the offline resolver, then online."""
+        place = self.geo.get(ip)
+        if place is not None:
+            return place
+        place, ttl = None, GEO_TTL_SECONDS
+        if self.offline_resolver is not None:
+            place = self.offline_resolver(ip)
+        if place is None and self.online_resolver is not None:
+            try:
+                place = self.online_resolver(ip)
+            except Exception:
+                place, ttl = LOOKUP_ERROR, GEO_FAILURE_TTL_SECONDS
+        if place is None:
+            place = ("Unknown", "Unknown")
+        self.geo.put(ip, place, ttl)
+        return place
+
+    def _take(self, timeout):
+        """Up to `batch_size` visits: waits `timeout` for the first, none for the rest."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, batch):
+        """Insert `batch` in one transaction."""
+        rows = []
+        for now, ip, path, user_agent in batch:
+            city, country = self.locate(ip)
+            rows.append((now, ip, path, user_agent, city, country))
+            utils.cot_logger.info(f"IP: {ip} | Path: {path}")
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        try:
+            with conn:
+                conn.executemany(_INSERT, rows)
+        finally:
+            conn.close()
+        self.written += len(rows)
+
+    def flush(self):
+        """Write everything queued so far, on the calling thread."""
+        while True:
+            batch = self._take(timeout=0)
+            if not batch:
+                return
+            self.write(batch)
+
+    def _run(self):
+        while True:
+            batch = self._take(self.flush_seconds)
+            if not batch:
+                continue
+            try:
+                self.write(batch)
+            except Exception as e:
+                # The visits are lost, the writer is not: the next batch gets a fresh
+                # connection.
+                utils.cot_logger.error(f"visit log: dropped {len(batch)} visits: {e}")
+                self.dropped += len(batch)
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "written": self.written,
+                "dropped": self.dropped, "geo_cached": len(self.geo)}
+
+
+_log = None
+_log_lock = threading.Lock()
+_offline_resolver = local_resolver
+
+
+def set_offline_resolver(resolver):
+    """Replace the offline resolver: `resolver(ip)` returns (city, country) or None.
+
+    None hands the address on to ip-api.com. Takes effect for lookups the cache has not
+    already answered.
+    """
+    global _offline_resolver
+    _offline_resolver = resolver
+    if _log is not None:
+        _log.offline_resolver = resolver
+
+
+def get_visit_log():
+    """The process's VisitLog, writing to the COT database."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                from cotmetrics.database import cotDatabase
+                _log = VisitLog(cotDatabase.db_name, offline_resolver=_offline_resolver)
+                atexit.register(_log.flush)
+    return _log
+
+
+def record(ip, path, user_agent):
+    get_visit_log().enqueue(ip, path, user_agent)
@@ -0,0 +1,56 @@
+"""
+visit_stats.py
+
+What the Admin page shows of the visit log, as aggregate queries.
+
+The page used to read the visit table into pandas on every refresh, every 30 seconds
+per open tab, and bin and count it there. Its cost grew with the log, and since the
+read was capped at the newest 500 rows the charts only ever showed those 500 visits,
+however many there were. Here each figure is one query that returns only what is
+drawn: visits per hour and per country over the last WINDOW_DAYS, and the newest rows
+for the table. Over the (timestamp, country) index db_pool creates, each reads only the
+window's slice of that index, so the page costs the same with a thousand visits as
+with millions.
+
+Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' text (visit_log.py), so the hour is the
+first 13 characters and a window is a string comparison the index can range over.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+WINDOW_DAYS = 30
+RECENT_ROWS = 15
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def window_start(now=None, days=WINDOW_DAYS):
+    """The first timestamp inside the window, as the log stores timestamps."""
+    return ((now or datetime.now()) - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+
+
+def hourly_counts(conn, since):
+    """`hour` (a datetime) and `visits`, for each hour since `since` with any."""
+    df = pd.read_sql_query(
+        "SELECT substr(timestamp, 1, 13) AS hour, COUNT(*) AS visits "
+        "FROM visitor_logs WHERE timestamp >= ? GROUP BY hour ORDER BY hour",
+        conn, params=(since,))
+    df["hour"] = pd.to_datetime(df["hour"], format="%Y-%m-%d %H")
+    return df
+
+
+def country_counts(conn, since):
+    """`country` and `count` of visits since `since`, most visits first."""
+    return pd.read_sql_query(
+        "SELECT COALESCE(country, 'Unknown') AS country, COUNT(*) AS count "
+        "FROM visitor_logs WHERE timestamp >= ? GROUP BY 1 ORDER BY count DESC, country",
+        conn, params=(since,))
+
+
+def recent_visits(conn, n=RECENT_ROWS):
+    """The newest `n` visits, newest first, with the columns the table shows."""
+    return pd.read_sql_query(
+        "SELECT timestamp, ip_address, city, country, path "
+        "FROM visitor_logs ORDER BY id DESC LIMIT ?",
+        conn, params=(n,))
@@ -0,0 +1,77 @@
+"""The Aggregation page's engine has to agree with the groupby it replaced.
+
+`aggregate_frames` aligns every selected market on report date into one NumPy block and
+reduces along the market axis. What it replaced was a `pd.concat` plus a `groupby` per
+column, and its edge cases are the page's established behaviour: markets that start in
+different years, a week one market skipped, a NaN inside a series. The reference below
+is that old code, kept verbatim so the two can be compared on the same frames.
+"""
+import cotmetrics.constants as const
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from pages.analytics import aggregation
+
+COLUMNS = [const.COMM_NET, const.LARGE_NET, const.SMALL_NET, const.OPEN_INTEREST,
+           const.COMMS_ZSCORE, const.LRG_ZSCORE, const.SML_ZSCORE, const.OI_ZSCORE,
+           const.COMMS_IDX, const.LRG_IDX, const.SML_IDX]
+
+
+def market(start, weeks, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=weeks, freq="W-TUE")
+    data = {col: rng.normal(0, 1000, weeks) for col in COLUMNS}
+    data[const.OPEN_INTEREST] = rng.uniform(1e4, 1e5, weeks)
+    for col in (const.COMMS_IDX, const.LRG_IDX, const.SML_IDX):
+        data[col] = rng.uniform(0, 100, weeks)
+    return pd.DataFrame(data, index=dates)
+
+
+def reference(frames):
+    """update_agg_stack's aggregation as it was before the engine."""
+    dataframes = []
+    for i, df in enumerate(frames):
+        df = df.copy()
+        df.attrs = {}
+        df['Asset'] = str(i)
+        dataframes.append(df)
+    grouped = pd.concat(dataframes).groupby(level=0)
+    agg_df = pd.DataFrame()
+    for col in (const.COMM_NET, const.LARGE_NET, const.SMALL_NET, const.OPEN_INTEREST):
+        agg_df[col] = grouped[col].sum()
+    for pct, net in ((const.COMM_PCT_OI, const.COMM_NET), (const.LARGE_PCT_OI, const.LARGE_NET),
+                     (const.SMALL_PCT_OI, const.SMALL_NET)):
+        agg_df[pct] = round(agg_df[net] / (agg_df[const.OPEN_INTEREST] + 1e-9) * 100, 2)
+    for col in (const.COMMS_ZSCORE, const.LRG_ZSCORE, const.SML_ZSCORE, const.OI_ZSCORE):
+        agg_df[col] = round(grouped[col].mean(), 4)
+    for col in (const.COMMS_IDX, const.LRG_IDX, const.SML_IDX):
+        agg_df[col] = round(grouped[col].mean(), 0)
+    return agg_df
+
+
+def assert_matches_reference(frames):
+    got = aggregation.aggregate_frames(frames)
+    want = reference(frames)
+    pdt.assert_frame_equal(got[want.columns], want, check_dtype=False, check_freq=False,
+                           check_names=False)
+
+
+def test_markets_with_different_histories_align_on_report_date():
+    assert_matches_reference([market("2000-01-04", 600, 1), market("2010-06-01", 300, 2),
+                              market("2005-03-01", 450, 3)])
+
+
+def test_a_gap_and_a_nan_are_skipped_rather_than_counted():
+    a = market("2020-01-07", 52, 4)
+    b = market("2020-01-07", 52, 5).drop(index=pd.Timestamp("2020-03-03"))
+    b.loc[pd.Timestamp("2020-06-02"), const.COMMS_ZSCORE] = np.nan
+    assert_matches_reference([a, b])
+
+
+def test_a_single_market_aggregates_to_itself():
+    assert_matches_reference([market("2015-01-06", 100, 6)])
+
+
+def test_no_usable_frame_is_no_aggregate():
+    assert aggregation.aggregate_frames([None, pd.DataFrame()]) is None
@@ -0,0 +1,152 @@
+"""The Home page's board snapshot: one sweep that the strips and the cards both read.
+
+The snapshot stands in for two readers that each went to the frames: get_board for the
+strips and the accordion titles, and the card builder for the accordion bodies. So what
+has to hold is that its rows are get_board's rows under every filter, that a card drawn
+off the snapshot's last row is the card drawn off the whole frame, and that expanding
+every class reads each frame once. Checked against a stand-in indexer with synthetic
+frames, so no store is needed.
+"""
+import json
+import types
+
+import cotmetrics.constants as const
+import cotmetrics.models as models
+import numpy as np
+import pandas as pd
+import pytest
+
+import board_snapshot
+import release_cache
+from components import signal_cards
+
+LOOKBACK = "26"
+CLASSES = {"Metals": ["Gold", "Silver", "Copper"],
+           "Equities": ["S&P 500", "Nasdaq"],
+           "Grains": ["Corn", "Wheat", "Soybeans", "Empty"]}
+
+
+def frame(seed, weeks=160):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end="2026-10-13", periods=weeks, freq="W-TUE")
+    legs = {col: rng.uniform(0, 100, weeks)
+            for model in models.MODELS for col in model.leg_columns(LOOKBACK)}
+    df = pd.DataFrame(legs, index=index)
+    for alias, col in ((const.COMMS_IDX, "Comm"), (const.LRG_IDX, "Lrg Spec"),
+                       (const.SML_IDX, "Sml Spec")):
+        df[alias] = df[f"{col} {LOOKBACK} Idx"]
+    for wow, alias in ((const.COMM_WOW, const.COMMS_IDX), (const.LRG_WOW, const.LRG_IDX),
+                       (const.SML_WOW, const.SML_IDX)):
+        df[wow] = df[alias].diff()
+    # Extremes often enough that every tape bias turns up on the board.
+    df[const.WILLCO_ALIAS] = rng.choice([2.0, 50.0, 98.0], weeks)
+    df[const.LW_LRG_SENTIMENT] = rng.choice([2.0, 50.0, 98.0], weeks)
+    for col in (const.COMMS_ZSCORE, const.LRG_ZSCORE, const.SML_ZSCORE, const.OI_ZSCORE,
+                const.COMM_MOMENTUM, const.LRG_MOMENTUM, const.SML_MOMENTUM,
+                const.COMMS_SPEARMAN, const.LRG_SPEARMAN, const.SML_SPEARMAN):
+        df[col] = rng.normal(0, 1.5, weeks)
+    df[const.COMM_NET] = rng.normal(0, 1000, weeks)
+    df[const.CLOSING_PRICE] = 100 + rng.normal(0, 1, weeks).cumsum()
+    return df
+
+
+class BoardIndexer:
+    def __init__(self):
+        names = [n for assets in CLASSES.values() for n in assets]
+        self.frames = {n: (pd.DataFrame() if n == "Empty" else frame(i))
+                       for i, n in enumerate(names)}
+        self.instruments = {}
+        self.last_known_db_time = "2026-10-17"
+        self.reads, self.read = [], {}
+
+    def get_asset_classes(self):
+        return list(CLASSES)
+
+    def get_assets_for_asset_class(self, ac):
+        return CLASSES[ac]
+
+    def get_symbols_data(self, name, lookback, basis=const.BASIS_RAW):
+        # Memoized as the real method's lru_cache is, so `reads` counts the frames
+        # computed rather than the cache hits.
+        key = (name, lookback, basis)
+        if key not in self.read:
+            self.reads.append(key)
+            self.read[key] = self.frames[name]
+        return self.read[key]
+
+    def get_instrument_symbol_from_name(self, name):
+        return name.upper()[:3]
+
+    def get_instrument_from_name(self, name):
+        return types.SimpleNamespace(symbol=name.upper()[:3]) if name in self.frames else None
+
+    def is_equity(self, name):
+        return name in CLASSES["Equities"]
+
+
+@pytest.fixture
+def indexer(monkeypatch):
+    import cotmetrics.indexer
+    import cotmetrics.movers
+    import cotmetrics.options_data
+
+    indexer = BoardIndexer()
+    monkeypatch.setattr(cotmetrics.indexer, "get_indexer", lambda: indexer)
+    monkeypatch.setattr(cotmetrics.movers, "get_indexer", lambda: indexer)
+    monkeypatch.setattr(signal_cards, "get_indexer", lambda: indexer)
+    monkeypatch.setattr(release_cache, "current_db_time", lambda: indexer.last_known_db_time)
+    # No options history: every card and synthesis reads "no max pain".
+    monkeypatch.setattr(cotmetrics.options_data, "get_max_pain_for_symbol",
+                        lambda *a, **k: None)
+    board_snapshot._snapshots.clear()
+    yield indexer
+    board_snapshot._snapshots.clear()
+
+
+@pytest.mark.parametrize("model_key", [m.key for m in models.MODELS])
+@pytest.mark.parametrize("filter_types", [[], ["TAPE_BIAS_BULL"], ["TAPE_BIAS_BEAR"],
+                                          ["TAPE_BIAS_BULL", "TAPE_BIAS_BEAR"]])
+def test_the_rows_are_get_boards_rows_under_every_filter(indexer, model_key, filter_types):
+    from cotmetrics.movers import get_board
+
+    model = models.resolve(model_key)
+    snapshot = board_snapshot.build(LOOKBACK, model, indexer=indexer)
+
+    assert snapshot.board_rows(filter_types) == get_board(
+        lookback=LOOKBACK, filter_types=filter_types, model=model)
+
+
+def test_the_board_has_every_bias_on_it(indexer):
+    snapshot = board_snapshot.build(LOOKBACK, models.DEFAULT_MODEL, indexer=indexer)
+    assert set(snapshot.bias.values()) == {"bullish", "bearish", "neutral"}
+    assert "Empty" not in snapshot.bias
+
+
+@pytest.mark.parametrize("filter_types", [[], ["TAPE_BIAS_BULL"]])
+def test_a_card_off_the_last_row_is_the_card_off_the_whole_frame(indexer, filter_types):
+    model = models.DEFAULT_MODEL
+    snapshot = board_snapshot.build(LOOKBACK, model, indexer=indexer)
+    palette = ["#ff0000", "#888888", "#cccccc", "#00ff00"]
+
+    for name, df in indexer.frames.items():
+        if df.empty:
+            continue
+        whole = signal_cards.build_mobile_asset_card(
+            df, name, palette, LOOKBACK, model=model, is_equity=indexer.is_equity(name),
+            filter_types=filter_types)
+        cheap = signal_cards.build_mobile_asset_card(
+            snapshot.last_row[name], name, palette, LOOKBACK, model=model,
+            is_equity=indexer.is_equity(name), filter_types=filter_types,
+            tape_bias=snapshot.bias[name])
+        assert json.dumps(getattr(cheap, "to_plotly_json", lambda: None)(), default=str) \
+            == json.dumps(getattr(whole, "to_plotly_json", lambda: None)(), default=str)
+
+
+def test_every_class_expanded_reads_each_frame_once(indexer):
+    model = models.DEFAULT_MODEL
+    board_snapshot.snapshot(LOOKBACK, model).board_rows()
+    for ac in CLASSES:
+        signal_cards.build_asset_class_cards(indexer, ac, LOOKBACK, ["#000"] * 4, model=model)
+
+    markets = [n for assets in CLASSES.values() for n in assets]
+    assert sorted(indexer.reads) == sorted((n, LOOKBACK, model.basis) for n in markets)
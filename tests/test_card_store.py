@@ -0,0 +1,95 @@
+"""The Home card trees on disk, shared between processes and across restarts.
+
+What a reader is sent from the store has to be what Dash would have sent for the tree
+as built, and a process that did not build it has to find it. On top of that the store
+drops older releases but never a newer one, stays under its byte budget by dropping the
+least recently used trees, and treats a file it cannot read as a miss rather than an
+error.
+"""
+import json
+import os
+
+import dash_bootstrap_components as dbc
+import pytest
+from dash import html
+from plotly.io.json import to_json_plotly
+
+import card_store
+
+KEY = ("2026-10-16 15:30:00", "Metals", "26", None, ("TAPE_BIAS_BULL",), "npf")
+
+
+def cards(n=3, text="Gold"):
+    return dbc.Row([dbc.Col(dbc.Card(dbc.CardBody([html.H6(f"{text} {i}"),
+                                                   html.Span(1.5 * i, style={"color": "red"})])),
+                            xs=12, md=4) for i in range(n)], className="g-2 p-1")
+
+
+class Builds:
+    def __init__(self, tree):
+        self.tree, self.calls = tree, 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.tree
+
+
+@pytest.fixture
+def store(tmp_path):
+    return tmp_path / "home_cards"
+
+
+def test_a_stored_tree_is_what_dash_would_send(store):
+    build = Builds(cards())
+    built = card_store.get(KEY, build, directory=store)
+    read = card_store.get(KEY, build, directory=store)
+
+    assert build.calls == 1
+    assert built is build.tree
+    assert read == json.loads(to_json_plotly(build.tree))
+    assert to_json_plotly(read) == to_json_plotly(built)
+
+
+def test_every_part_of_the_key_is_its_own_tree(store):
+    for i in range(len(KEY) - 1):
+        other = KEY[:i + 1] + ("other",) + KEY[i + 2:]
+        assert card_store.path_for(other, store) != card_store.path_for(KEY, store)
+
+
+def test_a_new_release_drops_the_last_ones_trees(store):
+    card_store.get(KEY, Builds(cards()), directory=store)
+    card_store.get(("2026-10-23 15:30:00",) + KEY[1:], Builds(cards()), directory=store)
+
+    assert [p.name for p in store.iterdir()] == ["20261023153000"]
+
+
+def test_a_lagging_worker_leaves_the_new_release_alone(store):
+    """A worker still on last week writes its trees without removing this week's."""
+    card_store.get(("2026-10-23 15:30:00",) + KEY[1:], Builds(cards()), directory=store)
+    card_store.get(KEY, Builds(cards()), directory=store)
+
+    assert sorted(p.name for p in store.iterdir()) == ["20261016153000", "20261023153000"]
+
+
+def test_the_least_recently_used_trees_go_first(store):
+    keys = [KEY[:1] + (f"class {i}",) + KEY[2:] for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        card_store.get(key, Builds(cards()), directory=store)
+        os.utime(card_store.path_for(key, store), ns=(0, i * 10**9))
+    card_store.get(keys[0], Builds(None), directory=store)  # a hit: now the newest
+
+    size = card_store.path_for(keys[0], store).stat().st_size
+    card_store.get(keys[3], Builds(cards()), directory=store, max_bytes=2 * size)
+
+    assert [card_store.path_for(k, store).exists() for k in keys] == [True, False, False, True]
+
+
+def test_an_unreadable_tree_is_built_again(store):
+    path = card_store.path_for(KEY, store)
+    path.parent.mkdir(parents=True)
+    path.write_text('{"props": {"chil')
+
+    build = Builds(cards())
+    assert card_store.get(KEY, build, directory=store) is build.tree
+    assert card_store.get(KEY, build, directory=store) == json.loads(to_json_plotly(build.tree))
+    assert build.calls == 1
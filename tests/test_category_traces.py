@@ -65,11 +65,12 @@ def _figure(plot_id, show_price=True):
 
 
 def _named_traces(fig):
-    """Real traces only. Legend entries are empty scatters with x=[None]."""
+    """Real traces only. Legend entries are empty scatters with x=[None]; a series on
+    an evenly spaced index carries its dates as x0/dx instead (plot_traces.dated_x)."""
     out = []
     for t in fig.data:
         x = getattr(t, "x", None)
-        if x is not None and len(x) and x[0] is not None:
+        if (x is not None and len(x) and x[0] is not None) or getattr(t, "x0", None) is not None:
             out.append(t)
     return out
 
@@ -327,9 +328,11 @@ def test_momentum_is_diverging_columns_when_faceted():
     bars = [t for t in fig.data if t.type == "bar"]
     assert len(bars) == len(series)
 
+    # Each bar's colour goes as an index into the trace's colourscale.
     used = set()
     for t in bars:
-        used.update(t.marker.color)
+        stops = [c for _, c in t.marker.colorscale]
+        used.update(stops[k] for k in t.marker.color)
     assert used <= {vc.CATEGORY_DIVERGING_UP, vc.CATEGORY_DIVERGING_DOWN}
     assert vc.CATEGORY_DIVERGING_UP in used and vc.CATEGORY_DIVERGING_DOWN in used
 
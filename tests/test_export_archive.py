@@ -0,0 +1,209 @@
+"""The data downloads, exported once per release and served from the export.
+
+What a reader unzips has to be what the callbacks used to send: one CSV per instrument
+and file kind, named by symbol, in asset-class order, empty frames left out. On top of
+that the export is built once per COT week, replaced when the week moves, and its
+manifest has to describe the files actually on disk, since the download route serves
+its checksums as ETags. Under several workers only the refresher builds or prunes, and
+a follower without an export of its week zips its own frames. A stand-in indexer
+supplies the frames, so no store is needed.
+"""
+import hashlib
+import io
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import export_archive
+
+
+class FakeIndexer:
+    """The handful of CotIndexer calls the export makes."""
+
+    def __init__(self):
+        self.last_known_db_time = "2026-10-16 15:30:00"
+        self.builds = 0
+        self.classes = {"Metals": ["Gold", "Silver"], "Energy": ["Crude Oil"]}
+        self.symbols = {"Gold": "GC", "Silver": "SI", "Crude Oil": "CL WTI"}
+
+    def get_asset_classes(self):
+        return list(self.classes)
+
+    def get_assets_for_asset_class(self, asset_class):
+        return self.classes[asset_class]
+
+    def get_instrument_code_from_name(self, name):
+        return f"code:{name}"
+
+    def get_instrument_symbol_from_name(self, name):
+        return self.symbols[name]
+
+    def frame(self, code):
+        if code == "code:Silver":
+            return pd.DataFrame()
+        return pd.DataFrame({"Date": pd.date_range("2026-01-06", periods=3, freq="W-TUE"),
+                             "value": [1.5, 2.0, None], "of": code})
+
+    def collect_symbol_summary_results(self, code):
+        self.builds += 1
+        return self.frame(code)
+
+    def collect_symbol_detailed_results(self, code):
+        return self.frame(code).assign(detail=True)
+
+    def create_real_test_event_asset_list(self, code):
+        return self.frame(code).assign(Type=1)
+
+    def get_positioning_table_by_asset_class(self, asset_classes, lookback, target_date):
+        return pd.DataFrame({"Date": pd.to_datetime(["2026-10-13", "2026-10-13"]).date,
+                             "Asset Class": ["Energy", "Metals"], "Symbol": ["CL WTI", "GC"],
+                             "Name": ["Crude Oil", "Gold"], "Lookback": [lookback, lookback],
+                             "Max Pain": [None, None], "Delta IV": [None, None]})
+
+
+@pytest.fixture
+def exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_archive, "EXPORT_DIR", tmp_path / "exports")
+    return tmp_path / "exports"
+
+
+def test_the_archive_holds_what_the_callback_used_to_zip(exports):
+    indexer = FakeIndexer()
+    path = export_archive.archive_path("cftc", indexer)
+
+    with zipfile.ZipFile(path) as zf:
+        assert zf.namelist() == ["CL_WTI_summary.csv", "CL_WTI_detailed.csv",
+                                 "GC_summary.csv", "GC_detailed.csv"]
+        assert zf.read("GC_detailed.csv").decode() == indexer.collect_symbol_detailed_results(
+            "code:Gold").to_csv(index=False)
+
+
+def test_the_manifest_describes_the_files_on_disk(exports):
+    indexer = FakeIndexer()
+    root = export_archive.release_dir(indexer)
+    files = export_archive.manifest(indexer)["files"]
+
+    on_disk = {p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file()}
+    assert set(files) == on_disk - {"manifest.json"}
+    for name, entry in files.items():
+        data = (root / name).read_bytes()
+        assert entry == {"bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    assert "parquet/detailed/GC_detailed.parquet" in files
+    assert "arrow/summary/SI_summary.arrow" not in files
+
+
+def test_the_positioning_table_is_read_back_but_never_built_on_demand(exports):
+    indexer = FakeIndexer()
+    assert export_archive.positioning_table("52", indexer) is None
+
+    export_archive.release_dir(indexer)
+    table = export_archive.positioning_table("52", indexer)
+    assert list(table["Name"]) == ["Crude Oil", "Gold"]
+    assert export_archive.positioning_table("13", indexer) is None
+
+
+def test_the_exported_table_shows_the_pages_max_pain_as_of_the_download(exports, monkeypatch):
+    """The summaries are rewritten every few hours, so they are read per download."""
+    export_archive.release_dir(FakeIndexer())
+    monkeypatch.setattr(export_archive.options_history, "max_pain_at",
+                        lambda symbol, date: {"max_pain": 5000.0, "delta_iv": 0.5}
+                        if symbol == "GC" else None)
+
+    table = export_archive.positioning_table("52", FakeIndexer())
+    assert table["Max Pain"].tolist()[1] == 5000.0 and pd.isna(table["Max Pain"].iloc[0])
+    assert list(table.columns[-2:]) == ["Max Pain", "Delta IV"]
+
+
+def test_an_archive_is_built_once_a_week_and_replaced_by_the_next(exports):
+    indexer = FakeIndexer()
+    first = export_archive.archive_path("real_test", indexer)
+    assert export_archive.archive_path("real_test", indexer) == first
+
+    indexer.last_known_db_time = "2026-10-23 15:30:00"
+    second = export_archive.archive_path("real_test", indexer)
+    assert second != first
+    assert sorted(p.name for p in exports.iterdir()) == [second.parent.name]
+
+
+def test_a_repeat_download_does_not_rebuild(exports):
+    indexer = FakeIndexer()
+    export_archive.archive_path("cftc", indexer)
+    export_archive.archive_path("real_test", indexer)
+
+    assert indexer.builds == 3          # once per instrument, not once per download
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_the_typed_formats_keep_dates_and_floats(exports, fmt):
+    indexer = FakeIndexer()
+    path = export_archive.archive_path("cftc", indexer, fmt)
+    ext = export_archive.FORMATS[fmt][0]
+
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        data = zf.read(f"GC_summary{ext}")
+    assert names[0] == f"CL_WTI_summary{ext}"
+    df = (pd.read_parquet(io.BytesIO(data)) if fmt == "parquet"
+          else pa.ipc.open_file(io.BytesIO(data)).read_pandas())
+    assert df["Date"].dtype.kind == "M" and df["value"].dtype == "float64"
+    pd.testing.assert_frame_equal(df, indexer.frame("code:Gold"), check_dtype=False)
+
+
+@pytest.fixture
+def follower(monkeypatch):
+    monkeypatch.setattr(export_archive.shared_index, "following", lambda: True)
+
+
+def test_a_follower_never_builds_and_zips_its_own_frames(exports, follower):
+    indexer = FakeIndexer()
+
+    assert export_archive.release_dir(indexer) is None
+    with pytest.raises(KeyError):
+        export_archive.archive_path("cftc", indexer)
+    assert not exports.exists()
+
+    with zipfile.ZipFile(io.BytesIO(export_archive.archive_bytes("cftc", indexer))) as zf:
+        assert zf.namelist() == ["CL_WTI_summary.csv", "CL_WTI_detailed.csv",
+                                 "GC_summary.csv", "GC_detailed.csv"]
+        assert zf.read("GC_summary.csv").decode() == indexer.frame("code:Gold").to_csv(index=False)
+
+
+def test_a_follower_serves_the_refreshers_export_of_its_week(exports, monkeypatch):
+    indexer = FakeIndexer()
+    built = export_archive.archive_path("cftc", indexer)
+
+    monkeypatch.setattr(export_archive.shared_index, "following", lambda: True)
+    assert export_archive.archive_path("cftc", indexer) == built
+
+
+def test_an_older_weeks_build_leaves_the_newer_export_alone(exports):
+    newer = FakeIndexer()
+    newer.last_known_db_time = "2026-10-23 15:30:00"
+    kept = export_archive.release_dir(newer)
+
+    export_archive.release_dir(FakeIndexer())
+    assert sorted(p.name for p in exports.iterdir()) == ["20261016153000", kept.name]
+
+
+def test_a_warm_up_starts_one_export_between_its_calls(exports, monkeypatch):
+    """The warmer is called once per lookback; only the first call starts a thread."""
+    import threading
+
+    running, done = threading.Event(), threading.Event()
+    runs = []
+
+    def slow_release_dir():
+        runs.append(threading.current_thread().name)
+        running.set()
+        done.wait(5)
+
+    monkeypatch.setattr(export_archive, "release_dir", slow_release_dir)
+    assert export_archive.start_export() is True
+    running.wait(5)
+    assert [export_archive.start_export() for _ in range(3)] == [False] * 3
+
+    done.set()
+    with export_archive._exporting:      # let go by the thread when it finishes
+        assert runs == ["release-export"]
@@ -0,0 +1,65 @@
+"""`frame_fetch` reads every frame a page needs at once, on one bounded pool.
+
+Asset Graphs, Aggregation and the Home cards each used to read their frames serially
+inside the loop that drew them. The batch has to hand back exactly what the serial loop
+would have read, key for key, and it must never put more reads on the store at once
+than the pool allows, however many markets were selected. Checked against a stand-in
+indexer, so no store is needed.
+"""
+import threading
+import time
+
+import frame_fetch
+
+
+class CountingIndexer:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def get_symbols_data(self, name, lookback, basis="raw"):
+        with self._lock:
+            self.calls.append((name, lookback, basis))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return None if name == "Missing" else f"{name}/{lookback}/{basis}"
+
+
+def test_every_key_comes_back_with_its_own_frame():
+    indexer = CountingIndexer()
+    frames = frame_fetch.fetch_frames(
+        [("Gold", "26", "raw"), ("Gold", "26", "oi_norm"), ("Silver", "26", "raw")],
+        indexer=indexer)
+
+    assert frames == {("Gold", "26", "raw"): "Gold/26/raw",
+                      ("Gold", "26", "oi_norm"): "Gold/26/oi_norm",
+                      ("Silver", "26", "raw"): "Silver/26/raw"}
+
+
+def test_a_repeated_key_is_read_once():
+    indexer = CountingIndexer()
+    frame_fetch.fetch_frames([("Gold", "26", "raw")] * 3 + [("Silver", "26", "raw")],
+                             indexer=indexer)
+
+    assert sorted(indexer.calls) == [("Gold", "26", "raw"), ("Silver", "26", "raw")]
+
+
+def test_a_market_with_no_data_is_passed_through_for_the_caller_to_handle():
+    frames = frame_fetch.fetch_frames_for(["Gold", "Missing"], "Custom", "raw",
+                                          indexer=CountingIndexer())
+
+    assert frames == {"Gold": "Gold/Custom/raw", "Missing": None}
+
+
+def test_the_pool_bounds_how_many_reads_run_at_once():
+    indexer = CountingIndexer(delay=0.02)
+    names = [f"M{i}" for i in range(frame_fetch.FETCH_WORKERS * 3)]
+    frame_fetch.fetch_frames_for(names, "52", "raw", indexer=indexer)
+
+    assert 1 < indexer.peak <= frame_fetch.FETCH_WORKERS
@@ -0,0 +1,229 @@
+"""The release's frames as one Arrow snapshot that every worker maps, and the workers
+that share it (shared_index).
+
+A worker serves what it reads back in place of what `get_symbols_data` would have
+computed, so a frame has to come back as it went in, attrs included. A reader sees one
+whole release, the one current.json names, and a worker is served from it only while it
+is of the worker's own release; anything else it computes as before. Only one worker at
+a time is the refresher: the lease is an flock, which the kernel gives to one open file
+at a time, so two leases in one process stand for two workers. A stand-in indexer
+supplies the frames and counts what it had to compute, so no store is needed.
+"""
+import json
+
+import cotmetrics.constants as const
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import frame_snapshot
+import release_cache
+import shared_index
+
+CLASSES = {"Metals": ["Gold", "Silver"], "Energy": ["Crude Oil"]}
+
+
+def frame(name, lookback, basis):
+    rng = np.random.default_rng(abs(hash((name, lookback, basis))) % 2**32)
+    index = pd.Index(pd.date_range(end="2026-10-13", periods=30, freq="7D").to_numpy(),
+                     name="Date")
+    df = pd.DataFrame({"Comm 26 Idx": rng.uniform(0, 100, 30),
+                       "Setup": rng.choice(["long", "short", None], 30),
+                       "Weeks": np.arange(30, dtype="int64")}, index=index)
+    df.loc[df.index[3], "Comm 26 Idx"] = np.nan
+    df.attrs = {"basis": basis, "of": name}
+    return df
+
+
+class FrameIndexer:
+    def __init__(self, db_time="2026-10-16 15:30:00"):
+        self.last_known_db_time = db_time
+        self.reads = []
+
+    def get_asset_classes(self):
+        return list(CLASSES)
+
+    def get_assets_for_asset_class(self, ac):
+        return CLASSES[ac]
+
+    def get_symbols_data(self, name, lookback, basis=const.BASIS_RAW):
+        self.reads.append((name, lookback, basis))
+        return None if name == "Silver" else frame(name, lookback, basis)
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(frame_snapshot, "SNAPSHOT_DIR", tmp_path / "frame_snapshot")
+    release_cache.invalidate_all()
+    yield tmp_path / "frame_snapshot"
+    release_cache.invalidate_all()
+
+
+def test_a_frame_reads_back_as_it_was_written(snapshots):
+    indexer = FrameIndexer()
+    frame_snapshot.publish(indexer)
+    shared = frame_snapshot.current()
+
+    assert shared.release == indexer.last_known_db_time
+    for name, lookback, basis in frame_snapshot.frame_keys(indexer):
+        read = shared.frame(name, lookback, basis)
+        if name == "Silver":
+            assert read is None
+            continue
+        pdt.assert_frame_equal(read, frame(name, lookback, basis))
+        assert read.attrs == {"basis": basis, "of": name}
+
+
+def test_every_lookback_and_basis_is_published_once(snapshots):
+    indexer = FrameIndexer()
+    frame_snapshot.publish(indexer)
+    frame_snapshot.publish(indexer)
+
+    keys = frame_snapshot.frame_keys(indexer)
+    assert {lookback for _, lookback, _ in keys} == set(release_cache.LOOKBACKS)
+    assert len({basis for _, _, basis in keys}) == 2
+    assert sorted(indexer.reads) == sorted(keys)
+
+
+def test_a_new_release_replaces_the_last(snapshots):
+    frame_snapshot.publish(FrameIndexer("2026-10-16 15:30:00"))
+    frame_snapshot.current().frame("Gold", "26")
+    frame_snapshot.publish(FrameIndexer("2026-10-23 15:30:00"))
+
+    assert frame_snapshot.current().release == "2026-10-23 15:30:00"
+    assert sorted(p.name for p in snapshots.iterdir()) == ["20261023153000", "current.json"]
+    assert json.loads((snapshots / "current.json").read_text())["dir"] == "20261023153000"
+
+
+def test_nothing_published_reads_as_none(snapshots):
+    assert frame_snapshot.current() is None
+
+    # A directory without its manifest is a write that never finished.
+    (snapshots / "20261016153000").mkdir(parents=True)
+    (snapshots / "current.json").write_text('{"release": "x", "dir": "20261016153000"}')
+    assert frame_snapshot.current() is None
+
+
+# ── the workers ─────────────────────────────────────────────────────────────────
+
+def test_one_worker_holds_the_lease_until_it_lets_go(tmp_path):
+    first, second = (shared_index.Lease(tmp_path / "refresher.lock") for _ in range(2))
+
+    assert first.acquire() and first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire() and second.held
+
+
+def test_a_follower_reads_the_snapshot_of_its_own_release(snapshots):
+    frame_snapshot.publish(FrameIndexer())
+    indexer = shared_index.follow(FrameIndexer())
+
+    pdt.assert_frame_equal(indexer.get_symbols_data("Gold", "52", const.BASIS_RAW),
+                           frame("Gold", "52", const.BASIS_RAW))
+    assert indexer.get_symbols_data("Gold", "52") is indexer.get_symbols_data("Gold", "52")
+    assert indexer.reads == []
+    assert indexer.refresh_if_stale() is False
+
+
+def test_a_frame_the_snapshot_cannot_serve_is_computed(snapshots):
+    frame_snapshot.publish(FrameIndexer())
+    indexer = shared_index.follow(FrameIndexer())
+
+    assert indexer.get_symbols_data("Silver", "26") is None
+    assert indexer.get_symbols_data("Gold", "13") is not None
+    assert indexer.reads == [("Silver", "26", const.BASIS_RAW), ("Gold", "13", const.BASIS_RAW)]
+
+
+def test_a_snapshot_of_another_release_is_not_served(snapshots):
+    frame_snapshot.publish(FrameIndexer("2026-10-16 15:30:00"))
+    indexer = shared_index.follow(FrameIndexer("2026-10-23 15:30:00"), stand_down=False)
+
+    indexer.get_symbols_data("Gold", "26")
+    assert indexer.reads == [("Gold", "26", const.BASIS_RAW)]
+    assert "refresh_if_stale" not in vars(indexer)
+
+
+def test_a_follower_moves_when_the_refresher_publishes(snapshots, monkeypatch):
+    import cotmetrics.indexer
+
+    weeks = iter(["2026-10-16 15:30:00", "2026-10-23 15:30:00"])
+    held = {"indexer": None}
+
+    def get_indexer():
+        if held["indexer"] is None:
+            held["indexer"] = FrameIndexer(next(weeks))
+        return held["indexer"]
+
+    monkeypatch.setattr(cotmetrics.indexer, "get_indexer", get_indexer)
+    monkeypatch.setattr(cotmetrics.indexer, "reset_indexer", lambda: held.update(indexer=None))
+    monkeypatch.setattr(shared_index, "_active", True)
+    monkeypatch.setattr(shared_index, "_lease", shared_index.Lease(snapshots / "x.lock"))
+    frame_snapshot.publish(FrameIndexer("2026-10-16 15:30:00"))
+    shared_index.follow(get_indexer())
+
+    assert shared_index.following()
+    assert shared_index.adopt_if_published() is False
+    frame_snapshot.publish(FrameIndexer("2026-10-23 15:30:00"))
+    assert shared_index.adopt_if_published() is True
+
+    moved = get_indexer()
+    assert moved.last_known_db_time == "2026-10-23 15:30:00"
+    moved.get_symbols_data("Gold", "26")
+    assert moved.reads == [] and moved.refresh_if_stale() is False
+
+
+@pytest.fixture
+def cot_indexer(monkeypatch):
+    """A real CotIndexer without a store: only the refresh machinery is exercised."""
+    import threading
+
+    from cotmetrics.CotIndexer import CotIndexer, cotDatabase
+
+    stamp = {"now": "2026-10-16 15:30:00"}
+    monkeypatch.setattr(cotDatabase, "latest_update_timestamp",
+                        staticmethod(lambda: stamp["now"]))
+    monkeypatch.setattr(CotIndexer, "_build_state", lambda self: "new state")
+    indexer = CotIndexer.__new__(CotIndexer)
+    indexer.last_known_db_time = stamp["now"]
+    indexer._refresh_lock = threading.RLock()
+    indexer._state = "old state"
+    yield indexer, stamp
+    shared_index._release_caches(indexer)
+
+
+def test_the_refresher_still_rebuilds_through_cotmetrics(snapshots, cot_indexer):
+    """refresh_if_stale empties the frame cache through the method's __func__, so the
+    snapshot reader has to leave the method on the class, lru_cache and all."""
+    indexer, stamp = cot_indexer
+    shared_index.follow(indexer, stand_down=False)
+    stamp["now"] = "2026-10-23 15:30:00"
+
+    assert indexer.refresh_if_stale() is True
+    assert indexer._state == "new state"
+    assert indexer.last_known_db_time == "2026-10-23 15:30:00"
+    assert indexer.refresh_if_stale() is False
+
+
+def test_a_follower_lets_the_old_indexers_caches_go(snapshots, cot_indexer, monkeypatch):
+    """The lru_caches are the class's, so the old week outlives reset_indexer in them."""
+    import cotmetrics.indexer
+
+    from cotmetrics.CotIndexer import CotIndexer
+
+    indexer, _ = cot_indexer
+    held = {"indexer": shared_index.follow(indexer)}
+    monkeypatch.setattr(cotmetrics.indexer, "get_indexer",
+                        lambda: held["indexer"] or FrameIndexer("2026-10-23 15:30:00"))
+    monkeypatch.setattr(cotmetrics.indexer, "reset_indexer", lambda: held.update(indexer=None))
+    monkeypatch.setattr(shared_index, "_active", True)
+    monkeypatch.setattr(shared_index, "_lease", shared_index.Lease(snapshots / "x.lock"))
+    cleared = []
+    for method in ("get_symbols_data", "get_positioning_table_by_asset_class"):
+        monkeypatch.setattr(getattr(CotIndexer, method), "cache_clear",
+                            lambda m=method: cleared.append(m))
+
+    frame_snapshot.publish(FrameIndexer("2026-10-23 15:30:00"))
+    assert shared_index.adopt_if_published() is True
+    assert set(cleared) == {"get_symbols_data", "get_positioning_table_by_asset_class"}
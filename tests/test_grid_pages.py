@@ -0,0 +1,81 @@
+"""Pages of rows for the Raw Data Viewer's grid, on the infinite row model.
+
+The grid now asks for a block of rows at a time with its sort and filter models, and
+what comes back has to be what the client-side grid used to show for the same models:
+the right slice, the full filtered count, blanks sorted last, dates as 'YYYY-MM-DD' and
+no NaN (which is not JSON). A small frame stands in for an instrument's history.
+"""
+import numpy as np
+import pandas as pd
+
+import grid_pages
+
+
+def view():
+    return grid_pages.GridView(pd.DataFrame({
+        "Date": pd.date_range("2026-01-06", periods=6, freq="W-TUE"),
+        "Name": ["Gold", "gold futures", "Silver", "Copper", None, "Platinum"],
+        "Value": [3.0, np.nan, 1.0, 5.0, 2.0, 4.0],
+    }, index=pd.Index([10, 11, 12, 13, 14, 15], name="row")))
+
+
+def test_a_block_is_a_slice_and_the_count_is_the_whole_result():
+    out = grid_pages.get_rows(view(), {"startRow": 2, "endRow": 4})
+
+    assert out["rowCount"] == 6
+    assert [r["Name"] for r in out["rowData"]] == ["Silver", "Copper"]
+    assert out["rowData"][0]["Date"] == "2026-01-20"
+
+
+def test_blanks_sort_last_either_way_and_come_back_as_none():
+    for direction, expected in (("asc", [1.0, 2.0, 3.0, 4.0, 5.0, None]),
+                                ("desc", [5.0, 4.0, 3.0, 2.0, 1.0, None])):
+        out = grid_pages.get_rows(view(), {
+            "startRow": 0, "endRow": 10,
+            "sortModel": [{"colId": "Value", "sort": direction}]})
+        assert [r["Value"] for r in out["rowData"]] == expected
+
+
+def test_text_filters_are_case_blind_and_skip_blanks():
+    out = grid_pages.get_rows(view(), {"startRow": 0, "endRow": 10, "filterModel": {
+        "Name": {"filterType": "text", "type": "contains", "filter": "GOLD"}}})
+
+    assert out["rowCount"] == 2
+
+
+def test_number_and_date_filters_combine_across_columns():
+    out = grid_pages.get_rows(view(), {"startRow": 0, "endRow": 10, "filterModel": {
+        "Value": {"filterType": "number", "type": "inRange", "filter": 2, "filterTo": 5},
+        "Date": {"filterType": "date", "type": "greaterThan",
+                 "dateFrom": "2026-01-13 00:00:00"},
+    }})
+
+    assert [r["Name"] for r in out["rowData"]] == ["Copper", None, "Platinum"]
+
+
+def test_a_combined_condition_on_one_column():
+    out = grid_pages.get_rows(view(), {"startRow": 0, "endRow": 10, "filterModel": {
+        "Value": {"filterType": "number", "operator": "OR", "conditions": [
+            {"filterType": "number", "type": "lessThan", "filter": 2},
+            {"filterType": "number", "type": "greaterThan", "filter": 4}]}}})
+
+    assert sorted(r["Value"] for r in out["rowData"]) == [1.0, 5.0]
+
+
+def test_scrolling_on_through_one_sort_reuses_its_order():
+    grid = view()
+    sort = [{"colId": "Name", "sort": "asc"}]
+
+    assert grid.row_order(sort) is grid.row_order(sort)
+    assert grid.row_order(sort) is not grid.row_order()
+
+
+def test_unknown_columns_are_ignored_and_numbers_get_the_number_filter():
+    grid = view()
+    out = grid_pages.get_rows(grid, {"startRow": 0, "endRow": 10,
+                                     "sortModel": [{"colId": "Gone", "sort": "asc"}],
+                                     "filterModel": {"Gone": {"type": "contains"}}})
+
+    assert out["rowCount"] == 6
+    assert [c["filter"] for c in grid.column_defs()] == [
+        "agTextColumnFilter", "agTextColumnFilter", "agNumberColumnFilter"]
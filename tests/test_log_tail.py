@@ -0,0 +1,105 @@
+"""The Admin log viewer's tail, read incrementally.
+
+A refresh has to cost what was appended, not the size of the log, so the reads are
+checked by `bytes_read` as well as by the lines they give. The rest is the ways a log
+changes under a reader: a line written half-way, a truncation, a rotation, and a tab
+catching up from the line numbers it was last sent.
+"""
+import os
+
+import pytest
+
+import log_tail
+
+
+def write(path, lines, mode="a"):
+    with open(path, mode) as f:
+        f.writelines(f"{line}\n" for line in lines)
+
+
+def test_the_first_poll_reads_the_end_of_the_file_not_all_of_it(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, [f"line {i} " + "x" * 60 for i in range(50_000)])
+    tail = log_tail.LogTail(path, n=10)
+    tail.poll()
+
+    assert tail.text().splitlines() == [f"line {i} " + "x" * 60 for i in range(49_990, 50_000)]
+    assert tail.bytes_read <= log_tail.BLOCK_BYTES < os.path.getsize(path)
+
+
+def test_a_poll_reads_only_what_was_appended_and_holds_back_an_unfinished_line(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, ["one", "two"])
+    tail = log_tail.LogTail(path, n=3)
+    tail.poll()
+    before = tail.bytes_read
+
+    with open(path, "a") as f:
+        f.write("three\nfo")
+    tail.poll()
+    assert tail.bytes_read - before == len("three\nfo")
+    assert tail.text() == "one\ntwo\nthree\n"
+
+    with open(path, "a") as f:
+        f.write("ur\n")
+    tail.poll()
+    assert tail.text() == "two\nthree\nfour\n"
+
+    before = tail.bytes_read
+    tail.poll()
+    assert tail.bytes_read == before
+
+
+def test_a_truncated_file_starts_a_new_generation(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, ["old 1", "old 2", "old 3"])
+    tail = log_tail.LogTail(path, n=5)
+    tail.poll()
+    generation = tail.generation
+
+    write(path, ["new"], mode="w")
+    tail.poll()
+    assert tail.text() == "new\n"
+    assert tail.generation != generation
+
+
+def test_a_rotation_keeps_the_lines_written_before_it(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, ["a", "b"])
+    tail = log_tail.LogTail(path, n=4)
+    tail.poll()
+    generation = tail.generation
+
+    # Written after the last poll, then rotated away as the handler does.
+    write(path, ["c"])
+    os.rename(path, f"{path}.1")
+    write(path, ["d", "e"])
+    tail.poll()
+
+    assert tail.text() == "b\nc\nd\ne\n"
+    assert tail.generation != generation
+
+
+def test_since_sends_a_reader_only_the_lines_it_has_not_had(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, ["a", "b"])
+    tail = log_tail.LogTail(path, n=3)
+    tail.poll()
+    generation, count, lines, whole = tail.since(None, None)
+    assert (lines, whole) == (["a\n", "b\n"], True)
+
+    write(path, ["c"])
+    tail.poll()
+    assert tail.since(generation, count) == (generation, count + 1, ["c\n"], False)
+    assert tail.since(generation, count + 1)[2:] == ([], False)
+
+    # Further behind than the tail reaches: only the whole tail will do.
+    write(path, ["d", "e", "f"])
+    tail.poll()
+    assert tail.since(generation, count)[2:] == (["d\n", "e\n", "f\n"], True)
+    assert tail.since("another", count + 4)[3] is True
+
+
+def test_a_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        log_tail.LogTail(tmp_path / "none.log").poll()
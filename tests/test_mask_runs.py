@@ -0,0 +1,71 @@
+"""The run-length kernel behind every shaded band, against the code it replaced.
+
+`mask_runs` finds runs of True with one diff over a padded mask. The three shaders each
+found them their own way before, and the bands those drew are the established
+behaviour: a run touching either end of the history, a single-week run, a mask that is
+all False. The references below are the old loops, kept verbatim, so the two can be
+compared on the same masks.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import plot_traces
+
+INDEX = pd.date_range("2000-01-04", periods=1200, freq="W-TUE")
+
+
+def groupby_runs(mask):
+    """add_trend_regime_highlighting's grouping, as it was."""
+    df = pd.DataFrame({"v": 0}, index=INDEX)
+    regime_id = (mask != mask.shift()).cumsum()
+    return [(block.index[0], block.index[-1])
+            for _, block in df[mask].groupby(regime_id[mask].values)]
+
+
+def walked_runs(mask):
+    """get_setup_highlighting's index walk, as it was."""
+    indices = np.where(mask)[0]
+    if len(indices) == 0:
+        return []
+    segments, start, prev = [], indices[0], indices[0]
+    for i in indices[1:]:
+        if i == prev + 1:
+            prev = i
+        else:
+            segments.append((start, prev))
+            start = prev = i
+    segments.append((start, prev))
+    return segments
+
+
+def masks():
+    rng = np.random.default_rng(7)
+    out = [pd.Series(rng.random(len(INDEX)) < p, index=INDEX) for p in (0.05, 0.5, 0.95)]
+    edges = pd.Series(False, index=INDEX)
+    edges.iloc[:3] = edges.iloc[-2:] = edges.iloc[600] = True
+    out += [edges, pd.Series(False, index=INDEX), pd.Series(True, index=INDEX)]
+    return out
+
+
+@pytest.mark.parametrize("mask", masks())
+def test_the_runs_are_the_ones_the_old_loops_found(mask):
+    starts, ends = plot_traces.mask_runs(mask)
+
+    assert list(zip(starts, ends)) == walked_runs(mask)
+    assert list(zip(INDEX[starts], INDEX[ends])) == groupby_runs(mask)
+
+
+def test_a_batch_is_each_mask_on_its_own():
+    batch = plot_traces.mask_runs_batch(masks())
+
+    for mask, (starts, ends) in zip(masks(), batch):
+        single = plot_traces.mask_runs(mask)
+        assert (starts == single[0]).all() and (ends == single[1]).all()
+
+
+def test_a_missing_value_breaks_a_run():
+    mask = pd.Series([True, True, None, True], dtype=object)
+
+    starts, ends = plot_traces.mask_runs(mask)
+    assert list(zip(starts, ends)) == [(0, 1), (3, 3)]
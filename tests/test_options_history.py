@@ -0,0 +1,156 @@
+"""The options panels' history, read once per file version and summarised in one pass.
+
+The summary replaces a loop that filtered the history to each date, sorted the day and
+took its idxmin and an np.interp at the underlying, so what has to hold is that every
+day's figures are the ones that loop gave, on curves in any row order. The file is read
+again only when it changes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import options_history
+
+
+def history(days=6, points=40, seed=3):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for d in range(days):
+        underlying = 100 + rng.normal(0, 5)
+        strikes = np.linspace(80, 120, points) + rng.normal(0, 0.01, points)
+        frames.append(pd.DataFrame({
+            "Date": f"2026-10-{d + 1:02d}",
+            "Expiry": pd.Timestamp("2026-11-20"),
+            "UnderlyingPrice": underlying,
+            "SimulatedStrike": strikes,
+            "IntrinsicValue_M": (strikes - 100 + rng.normal(0, 3)) ** 2 + rng.random(points),
+            "MaxPainStrike": 100.0,
+            "ETF_Proxy": "SPY",
+        }))
+    # Shuffled, as appends and replaced days leave it.
+    return pd.concat(frames).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def old_loop(df):
+    """What get_max_pain_historical_plot computed, day by day."""
+    out = []
+    for date in sorted(df["Date"].unique()):
+        daily = df[df["Date"] == date].sort_values("SimulatedStrike")
+        underlying = daily["UnderlyingPrice"].iloc[0]
+        i = daily["IntrinsicValue_M"].idxmin()
+        strike, low = daily.loc[i, "SimulatedStrike"], daily.loc[i, "IntrinsicValue_M"]
+        current = np.interp(underlying, daily["SimulatedStrike"], daily["IntrinsicValue_M"])
+        out.append((date, strike, (underlying - strike) / strike * 100, current - low))
+    return out
+
+
+def test_the_summary_is_what_the_per_date_loop_computed():
+    df = history()
+    summary = options_history.summarise(df).summary
+
+    expected = old_loop(df)
+    assert list(summary["Date"]) == [e[0] for e in expected]
+    np.testing.assert_allclose(summary["MaxPain"], [e[1] for e in expected])
+    np.testing.assert_allclose(summary["PremiumPct"], [e[2] for e in expected])
+    np.testing.assert_allclose(summary["DeltaIV"], [e[3] for e in expected])
+
+
+@pytest.mark.parametrize("underlying", [10.0, 500.0, 100.0])
+def test_the_value_at_the_underlying_clamps_like_np_interp(underlying):
+    df = history(days=2)
+    df["UnderlyingPrice"] = underlying
+    result = options_history.summarise(df)
+
+    for i in range(len(result.summary)):
+        curve = result.curve(i)
+        assert (curve["Date"] == result.summary["Date"].iloc[i]).all()
+        assert result.summary["CurrentIV"].iloc[i] == pytest.approx(np.interp(
+            underlying, curve["SimulatedStrike"], curve["IntrinsicValue_M"]))
+
+
+def test_a_day_without_a_usable_underlying_has_no_premium():
+    df = history(days=2)
+    df.loc[df["Date"] == "2026-10-01", "UnderlyingPrice"] = np.nan
+    summary = options_history.summarise(df).summary
+
+    assert summary["PremiumPct"].isna().tolist() == [True, False]
+
+
+def test_the_file_is_read_again_only_when_it_changes(tmp_path):
+    path = tmp_path / "ES_options_history.parquet"
+    history(days=2).to_parquet(path)
+
+    first = options_history.load(path)
+    assert options_history.load(path) is first
+    assert list(first.curves.columns) == options_history.COLUMNS + [options_history.LISTED]
+
+    history(days=3).to_parquet(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert len(options_history.load(path).summary) == 3
+    assert options_history.load(tmp_path / "none.parquet") is None
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A history directory cotmetrics reads from, and an empty summary directory."""
+    import cotmetrics.options_data as options_data
+    histories, summaries = tmp_path / "options", tmp_path / "summary"
+    histories.mkdir()
+    monkeypatch.setattr(options_data, "options_history_dir", lambda: histories)
+    monkeypatch.setattr(options_history, "SUMMARY_DIR", summaries)
+    monkeypatch.setattr(options_data, "_MAX_PAIN_CACHE", {})
+    return histories, summaries
+
+
+@pytest.mark.parametrize("date", [None, "2026-10-03", "2026-10-20", "2026-09-10"])
+def test_the_table_figures_are_the_ones_cotmetrics_reports(store, date):
+    from cotmetrics.options_data import get_max_pain_for_symbol
+    histories, _ = store
+    df = history()
+    df["MaxPainStrike"] = df.groupby("Date")["SimulatedStrike"].transform("median")
+    df.to_parquet(histories / "ES_options_history.parquet")
+    options_history.write_summaries()
+
+    ours, theirs = options_history.max_pain_at("ES", date), get_max_pain_for_symbol("ES", date)
+    if theirs is None:
+        assert ours is None
+    else:
+        assert ours == pytest.approx(theirs)
+
+
+def test_a_summary_is_read_only_while_its_history_is_unchanged(store):
+    histories, summaries = store
+    path = histories / "ES_options_history.parquet"
+    history(days=2).to_parquet(path)
+    index = options_history.write_summaries()
+
+    assert list(index["Symbol"]) == ["ES"] and index["Days"].iloc[0] == 2
+    assert (summaries / "ES_options_summary.parquet").exists()
+    fresh = options_history.summary_for_symbol("ES")
+    assert fresh.curves is None and len(fresh.summary) == 2
+
+    # Rewritten with no summary after it, as the boot-time refresh does.
+    history(days=3).to_parquet(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    stale = options_history.summary_for_symbol("ES")
+    assert stale.curves is not None and len(stale.summary) == 3
+    assert options_history.summary_for_symbol("NQ") is None
+
+
+def test_the_positioning_table_takes_its_figures_from_the_summaries(store):
+    histories, _ = store
+    df = history()
+    df["MaxPainStrike"] = df.groupby("Date")["SimulatedStrike"].transform("median")
+    df.to_parquet(histories / "ES_options_history.parquet")
+    options_history.write_summaries()
+    date = pd.Timestamp("2026-10-03").date()
+    table = pd.DataFrame({"Symbol": ["ES", "NQ"], "Date": [date, date],
+                          "Max Pain": [1.0, 2.0], "Delta IV": [0.1, 0.2]})
+
+    shown = options_history.with_max_pain(table)
+
+    assert shown["Max Pain"].iloc[0] == options_history.max_pain_at("ES", date)["max_pain"]
+    assert shown["Max Pain"].isna().iloc[1] and shown["Delta IV"].isna().iloc[1]
+    assert list(table["Max Pain"]) == [1.0, 2.0]
@@ -0,0 +1,47 @@
+"""The table the browser recolours charts through, checked against the traces' own maths.
+
+`recolor_figure` in assets/clientside.js swaps colour strings, so a colour the traces
+derive from a slot and the table does not list is a colour a palette change leaves
+behind. Store-free, like test_category_colors: viz_config falls back to the committed
+config/params.yaml.
+"""
+import pytest
+
+import components.category_traces as ct
+import components.plot_colors as plot_colors
+import viz_config
+import viz_constants as vc
+
+PALETTES = sorted(viz_config.get_palette_names())
+
+
+@pytest.mark.parametrize("name", PALETTES)
+def test_every_colour_the_traces_derive_is_a_swatch_of_its_slot(name):
+    palette = viz_config.get_palette(name)
+    swatches = plot_colors.slot_swatches(palette)
+
+    assert len(swatches) == len(palette)
+    for slot, base in enumerate(palette):
+        assert base.lower() in swatches[slot]
+        assert plot_colors.lighten_hex(base, vc.BASIS_OVERLAY_TINT) in swatches[slot]
+        assert ct.sibling_color(base) in swatches[slot]
+        assert plot_colors.hex_to_rgba(base, vc.BASIS_DIVERGENCE_ALPHA) in swatches[slot]
+
+
+def test_every_palette_lines_up_swatch_for_swatch():
+    """The browser pairs by position, so a ragged table would pair a tint with a base."""
+    table = plot_colors.swatch_table(
+        {n: viz_config.get_palette(n) for n in PALETTES}, viz_config.get_palette(None))
+    shapes = {tuple(len(s) for s in swatches) for swatches in table["palettes"].values()}
+    shapes.add(tuple(len(s) for s in table["default"]))
+
+    assert len(shapes) == 1
+
+
+def test_a_figure_is_tagged_with_the_palette_it_was_drawn_in():
+    import plotly.graph_objects as go
+
+    palette = viz_config.get_palette(PALETTES[0])
+    fig = plot_colors.tag_palette(go.Figure(), palette)
+
+    assert fig.layout.meta["palette_swatches"] == plot_colors.slot_swatches(palette)
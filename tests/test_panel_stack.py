@@ -0,0 +1,117 @@
+"""OI Alignment's stack, assembled from panels and patched between selections.
+
+The Patch only saves anything if applying it to the figure already on screen gives the
+figure a full rebuild would have sent. That is checked here by applying it, with a
+small stand-in for the browser's patch handling, to stacks of throwaway panels. What the
+panels draw does not matter, only where their traces, rects and legend entries land, so
+no store is needed.
+"""
+import copy
+
+import plotly.graph_objects as go
+import pytest
+
+from components import panel_stack
+from components.plot_layout import get_make_subplots_for_plots
+from components.plot_traces import add_legend_lines
+
+# Which panels carry a secondary axis, as the registry would say.
+SECONDARY = {"price": True, "index": False, "zscore": True, "macd": False}
+
+
+def panel(plot):
+    specs = [[{"secondary_y": SECONDARY[plot]}]]
+    fig = get_make_subplots_for_plots(1, 1, None, specs)
+    fig.add_trace(go.Scatter(x=[1, 2], y=[3, 4], name=plot), row=1, col=1)
+    if SECONDARY[plot]:
+        fig.add_trace(go.Scatter(x=[1, 2], y=[5, 6], name=f"{plot} price"),
+                      row=1, col=1, secondary_y=True)
+    # A rect of the panel's own: one every panel drew alike would be merged down the
+    # column (see test_plot_shapes), and this wants to see where each panel's lands.
+    fig.add_vrect(x0=1, x1=2 + list(SECONDARY).index(plot), row=1, col=1)
+    fig.update_yaxes(title_text=plot, row=1, col=1)
+    add_legend_lines(fig, "Open Interest", "#abcdef")
+    return panel_stack.to_fragment(fig)
+
+
+def stack_for(plots, num_cols=1):
+    num_rows = -(-len(plots) // num_cols)
+    specs = [[None] * num_cols for _ in range(num_rows)]
+    for i, p in enumerate(plots):
+        specs[i // num_cols][i % num_cols] = {"secondary_y": SECONDARY[p]}
+    grid = get_make_subplots_for_plots(num_rows, num_cols, list(plots), specs)
+    stack = panel_stack.assemble(grid, [panel(p) for p in plots], num_cols)
+    return stack.figure(), stack.state(plots)
+
+
+def apply_patch(figure, patch):
+    """The operations dash-renderer applies for the three kinds stack_patch emits."""
+    figure = copy.deepcopy(figure)
+    for op in patch.to_plotly_json()["operations"]:
+        *parents, last = op["location"]
+        target = figure
+        for key in parents:
+            target = target[key]
+        if op["operation"] == "Delete":
+            del target[last]
+        elif op["operation"] == "Insert":
+            target[last].insert(op["params"]["index"], op["params"]["value"])
+        elif op["operation"] == "Assign":
+            target[last] = op["params"]["value"]
+        else:
+            raise AssertionError(op["operation"])
+    return figure
+
+
+def test_each_panel_lands_on_its_own_cell_axes():
+    fig, _ = stack_for(["price", "index", "zscore"])
+
+    placed = {t["name"]: (t["xaxis"], t["yaxis"]) for t in fig["data"] if t["x"] != [None]}
+    # make_subplots numbers y axes with the secondaries interleaved: price takes y and
+    # y2, so index is on y3, and zscore on y4 with its secondary on y5.
+    assert placed == {"price": ("x", "y"), "price price": ("x", "y2"),
+                      "index": ("x2", "y3"), "zscore": ("x3", "y4"),
+                      "zscore price": ("x3", "y5")}
+    assert [s["xref"] for s in fig["layout"]["shapes"]] == ["x", "x2", "x3"]
+    assert fig["layout"]["yaxis3"]["title"]["text"] == "index"
+
+
+def test_a_legend_entry_offered_by_every_panel_is_shown_once():
+    fig, _ = stack_for(["price", "index", "zscore"])
+
+    shown = [t["name"] for t in fig["data"] if t["x"] == [None] and t.get("showlegend")]
+    assert shown == ["Open Interest"]
+
+
+@pytest.mark.parametrize("old, new, cols", [
+    (["price", "index"], ["price", "index", "zscore"], 1),      # add at the end
+    (["index", "zscore"], ["price", "index", "zscore"], 1),     # add at the top
+    (["price", "index", "zscore"], ["price", "zscore"], 1),     # remove from the middle
+    (["price", "index", "zscore"], ["index", "zscore"], 1),     # remove the legend's owner
+    (["price", "index", "zscore"], ["index", "macd"], 2),       # both, and a reflow
+])
+def test_the_patch_turns_the_old_stack_into_the_new_one(old, new, cols):
+    old_fig, old_state = stack_for(old, 1)
+    new_fig, new_state = stack_for(new, cols)
+
+    patch = panel_stack.stack_patch(old_state, new_state, new_fig)
+
+    assert apply_patch(old_fig, patch) == new_fig
+
+
+def test_the_patch_only_carries_the_panels_that_arrived():
+    old_fig, old_state = stack_for(["price", "index"])
+    new_fig, new_state = stack_for(["price", "index", "zscore"])
+
+    inserted = [op["params"]["value"]["name"]
+                for op in panel_stack.stack_patch(old_state, new_state,
+                                                  new_fig).to_plotly_json()["operations"]
+                if op["operation"] == "Insert"]
+    assert inserted == ["zscore", "zscore price", "Open Interest"]
+
+
+def test_a_reorder_is_sent_whole():
+    _, old_state = stack_for(["price", "index"])
+    new_fig, new_state = stack_for(["index", "price"])
+
+    assert panel_stack.stack_patch(old_state, new_state, new_fig) is None
@@ -0,0 +1,91 @@
+"""Shaded bands, queued on the figure and written once, merged.
+
+The shaders ask for a rect per run per subplot. What reaches the layout has to shade the
+same weeks on the same subplots: runs of one colour that overlap or touch are drawn as
+one, a band every row of a shared-x column carries is drawn once down the column, and
+nothing else changes. Throwaway grids only, so no store is needed.
+"""
+import pandas as pd
+
+from components import panel_stack, plot_shapes, plot_traces
+from components.plot_layout import get_make_subplots_for_plots, get_update_layout_for_plots
+
+INDEX = pd.date_range("2000-01-04", periods=60, freq="W-TUE")
+RED, GREEN = "rgba(255, 0, 0, 0.05)", "rgba(0, 255, 0, 0.05)"
+
+
+def grid(rows, cols=1, shared=True):
+    specs = [[{"secondary_y": True}] * cols for _ in range(rows)]
+    return get_make_subplots_for_plots(rows, cols, None, specs, shared_xaxes=shared)
+
+
+def bands(fig):
+    return [(s.fillcolor, s.xref, s.yref, s.x0, s.x1) for s in fig.layout.shapes]
+
+
+def test_overlapping_and_touching_runs_merge_and_a_gap_does_not():
+    segments = [(5, 9), (1, 3), (3, 4), (2, 3), (10, 12)]
+
+    assert plot_shapes.coalesce(segments) == [(1, 4), (5, 9), (10, 12)]
+
+
+def test_nothing_reaches_the_layout_until_the_figure_is_finished():
+    fig = grid(2)
+    plot_traces.fast_add_vrects(fig, [(INDEX[0], INDEX[3])], RED, [(1, 1)])
+    plot_traces.fast_add_vrects(fig, [(INDEX[2], INDEX[6])], RED, [(1, 1)])
+    assert not fig.layout.shapes
+
+    get_update_layout_for_plots(fig, 2, 1)
+    assert bands(fig) == [(RED, "x", "y domain", INDEX[0], INDEX[6])]
+    get_update_layout_for_plots(fig, 2, 1)
+    assert len(fig.layout.shapes) == 1
+
+
+def test_a_band_on_every_row_of_a_column_is_drawn_once_paper_high():
+    fig = grid(3)
+    everywhere = [(INDEX[1], INDEX[4]), (INDEX[20], INDEX[25])]
+    plot_traces.fast_add_vrects(fig, everywhere, RED, [(1, 1), (2, 1), (3, 1)])
+    plot_traces.fast_add_vrects(fig, [(INDEX[30], INDEX[31])], RED, [(1, 1), (2, 1)])
+    get_update_layout_for_plots(fig, 3, 1)
+
+    top, bottom = fig.layout.yaxis.domain, fig.layout.yaxis5.domain
+    paper = [s for s in fig.layout.shapes if s.yref == "paper"]
+    assert [(s.x0, s.x1) for s in paper] == everywhere
+    assert all((s.y0, s.y1) == (bottom[0], top[1]) for s in paper)
+    # Two rows of three is not the column: those stay one per row.
+    assert [(s.xref, s.yref) for s in fig.layout.shapes if s.yref != "paper"] == [
+        ("x", "y domain"), ("x2", "y3 domain")]
+
+
+def test_columns_whose_x_axes_are_not_tied_keep_a_band_per_row():
+    fig = grid(2, shared=False)
+    plot_traces.fast_add_vrects(fig, [(INDEX[1], INDEX[4])], GREEN, [(1, 1), (2, 1)])
+    get_update_layout_for_plots(fig, 2, 1)
+
+    assert [s.yref for s in fig.layout.shapes] == ["y domain", "y3 domain"]
+
+
+def test_each_column_of_a_grid_is_merged_on_its_own():
+    fig = grid(2, cols=2)
+    plot_traces.fast_add_vrects(fig, [(INDEX[1], INDEX[4])], GREEN,
+                                [(1, 1), (2, 1), (1, 2), (2, 2)])
+    plot_traces.fast_add_vrects(fig, [(INDEX[9], INDEX[12])], RED, [(1, 2)])
+    get_update_layout_for_plots(fig, 2, 2)
+
+    merged = [(s.xref, s.yref) for s in fig.layout.shapes if s.fillcolor == GREEN]
+    assert sorted(merged) == [(fig.layout.xaxis.matches, "paper"),
+                              (fig.layout.xaxis2.matches, "paper")]
+
+
+def test_a_stack_merges_the_bands_its_panels_drew_alike():
+    def panel(extra):
+        fig = grid(1)
+        plot_traces.fast_add_vrects(fig, [(INDEX[1], INDEX[4])], RED, [(1, 1)])
+        if extra:
+            plot_traces.fast_add_vrects(fig, [(INDEX[8], INDEX[9])], GREEN, [(1, 1)])
+        return panel_stack.to_fragment(fig)
+
+    stack = panel_stack.assemble(grid(3), [panel(False), panel(True), panel(False)], 1)
+
+    assert [(s["fillcolor"], s["yref"]) for s in stack.shapes] == [
+        (RED, "paper"), (GREEN, "y3 domain")]
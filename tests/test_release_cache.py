@@ -0,0 +1,122 @@
+"""The release caches: one LRU per artifact, every one of them emptied by a new week.
+
+The Heatmap and the Strip read the same matrix through `release_cache.matrix_data`, so a
+palette flip or a re-sort is a render of a frame already built. What has to hold for
+that to be safe is checked here without a store: the key carries the release, eviction is
+least-recently-USED rather than least-recently-built, and a new week leaves nothing
+behind in any registered cache.
+"""
+import release_cache
+from release_cache import ReleaseCache
+
+
+def test_a_hit_does_not_rebuild():
+    cache = ReleaseCache("t", maxsize=4)
+    calls = []
+    build = lambda: calls.append(1) or "frame"    # noqa: E731
+
+    assert cache.get(("w1", "a"), build) == "frame"
+    assert cache.get(("w1", "a"), build) == "frame"
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_eviction_drops_the_least_recently_read_entry():
+    """A default view read on every page load must outlive a one-off selection."""
+    cache = ReleaseCache("t", maxsize=2)
+    cache.get("default", lambda: 1)
+    cache.get("adhoc", lambda: 2)
+    cache.get("default", lambda: 1)      # read again, so it is the newer of the two
+    cache.get("third", lambda: 3)
+
+    rebuilt = []
+    cache.get("default", lambda: rebuilt.append("default") or 1)
+    cache.get("adhoc", lambda: rebuilt.append("adhoc") or 2)
+    assert rebuilt == ["adhoc"]
+
+
+def test_a_byte_budget_evicts_by_size_not_by_count():
+    """Serialized figures range from KBs to MBs, so the figure cache is bounded in bytes."""
+    cache = ReleaseCache("figs", max_bytes=10)
+    cache.get("one panel", lambda: "xxx")
+    cache.get("two panels", lambda: "xxxxxx")
+    cache.get("three panels", lambda: "xxxxx")     # 14 bytes held, so the oldest goes
+
+    assert cache.stats()["bytes"] <= 10
+    rebuilt = []
+    cache.get("one panel", lambda: rebuilt.append(1) or "xxx")
+    assert rebuilt == [1]
+
+
+def test_an_entry_larger_than_the_whole_budget_is_served_but_not_kept():
+    cache = ReleaseCache("figs", max_bytes=4)
+    cache.get("small", lambda: "xx")
+
+    assert cache.get("huge", lambda: "x" * 100) == "x" * 100
+    assert len(cache) == 1 and cache.stats()["bytes"] == 2
+
+
+def test_a_new_week_empties_every_registered_cache():
+    a = ReleaseCache("a", maxsize=4)
+    b = ReleaseCache("b", maxsize=4)
+    a.get("k", lambda: 1)
+    b.get("k", lambda: 1)
+
+    release_cache.invalidate_all()
+
+    assert len(a) == 0 and len(b) == 0
+
+
+def test_the_release_is_part_of_the_matrix_key():
+    """The key alone must keep weeks apart, whether or not anything cleared the cache."""
+    assert (release_cache.matrix_key("2026-08-04", ["Metals"], "26", None)
+            != release_cache.matrix_key("2026-08-11", ["Metals"], "26", None))
+
+
+def test_the_class_order_is_part_of_the_matrix_key():
+    """The matrix emits rows class by class, so two orders are two different grids."""
+    assert (release_cache.matrix_key("w", ["Metals", "Grains"], "26", None)
+            != release_cache.matrix_key("w", ["Grains", "Metals"], "26", None))
+
+
+def test_no_target_date_and_an_empty_one_share_an_entry():
+    """The date control reads None before it is populated and "" after it is cleared."""
+    assert (release_cache.matrix_key("w", ["Metals"], "26", "")
+            == release_cache.matrix_key("w", ["Metals"], "26", None))
+
+
+# ── the post-release warm-up ──────────────────────────────────────────────────
+
+def test_the_warm_up_covers_every_lookback_and_model_once_per_release(monkeypatch):
+    calls = []
+    monkeypatch.setattr(release_cache, "_WARMERS", [])
+    monkeypatch.setattr(release_cache, "_warmed_for", None)
+    monkeypatch.setattr(release_cache, "current_db_time", lambda: "2026-08-11")
+    release_cache.register_warmer("matrix", lambda lb, m: calls.append(("matrix", lb, m)),
+                                  by_model=False)
+    release_cache.register_warmer("rows", lambda lb, m: calls.append(("rows", lb, m)))
+
+    release_cache.warm(lookbacks=("26", "52"), model_keys=("raw_pf", "npf"))
+    release_cache.warm(lookbacks=("26", "52"), model_keys=("raw_pf", "npf"))
+
+    assert calls == [("matrix", "26", None), ("matrix", "52", None),
+                     ("rows", "26", "raw_pf"), ("rows", "26", "npf"),
+                     ("rows", "52", "raw_pf"), ("rows", "52", "npf")]
+
+
+def test_one_failing_warmer_does_not_cost_the_rest(monkeypatch):
+    calls = []
+
+    def broken(_lb, _m):
+        raise RuntimeError("store mid-sync")
+
+    monkeypatch.setattr(release_cache, "_WARMERS", [])
+    monkeypatch.setattr(release_cache, "_warmed_for", None)
+    monkeypatch.setattr(release_cache, "current_db_time", lambda: "2026-08-11")
+    release_cache.register_warmer("broken", broken)
+    release_cache.register_warmer("cards", lambda lb, m: calls.append(lb), by_model=False)
+
+    release_cache.warm(lookbacks=("Custom",), model_keys=("raw_pf",))
+
+    assert calls == ["Custom"]
@@ -0,0 +1,98 @@
+"""OI Alignment's signal board, memoized per report row for the crosshair.
+
+Scrubbing a chart revisits the same weeks over and over, and each visit used to run
+both card builders again. The memo has to key on the row the cards would actually
+render, not on whatever date the browser sent, and it has to keep models, palettes and
+releases apart. The builders are replaced with counters, so no store is needed.
+"""
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import release_cache
+from pages.analytics import oi_alignment
+
+FRAME = pd.DataFrame({"x": range(4)},
+                     index=pd.date_range("2026-07-21", periods=4, freq="W-TUE"))
+MODEL = SimpleNamespace(key="raw_pf")
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def panel(df, asset, color_palette, target_date=None, model=None):
+        calls.append(("panel", target_date, model.key))
+        return f"panel@{target_date}"
+
+    def card(df, color_palette, target_date=None, asset=None):
+        calls.append(("card", target_date))
+        return f"card@{target_date}", False
+
+    monkeypatch.setattr(oi_alignment.helpers, "build_signal_panel", panel)
+    monkeypatch.setattr(oi_alignment, "build_executive_synthesis_card", card)
+    monkeypatch.setattr(release_cache, "current_db_time", lambda: "2026-08-11")
+    oi_alignment._signal_cache.clear()
+    return calls
+
+
+def test_scrubbing_back_to_a_week_is_a_lookup(builds):
+    week = FRAME.index[1]
+    first = oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None, week)
+    oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None, FRAME.index[2])
+    again = oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None, week)
+
+    assert again == first
+    assert [c for c in builds if c[0] == "panel"] == [
+        ("panel", week, "raw_pf"), ("panel", FRAME.index[2], "raw_pf")]
+
+
+def test_a_date_between_reports_shares_the_latest_rows_entry(builds):
+    """Both builders fall back to the latest row for a date that is not a report."""
+    oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None)
+    off_row = oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None,
+                                         pd.Timestamp("2026-07-30"))
+
+    assert off_row == ("panel@None", "card@None")
+    assert len(builds) == 2
+
+
+def test_model_palette_and_release_each_get_their_own_board(builds, monkeypatch):
+    oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None)
+    oi_alignment._signal_board(FRAME, "Gold", "26", SimpleNamespace(key="npf"), None)
+    oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, "Muted")
+    monkeypatch.setattr(release_cache, "current_db_time", lambda: "2026-08-18")
+    oi_alignment._signal_board(FRAME, "Gold", "26", MODEL, None)
+
+    assert len([c for c in builds if c[0] == "panel"]) == 4
+
+
+def _trigger(monkeypatch, prop_id):
+    monkeypatch.setattr(oi_alignment.dash, "callback_context",
+                        SimpleNamespace(triggered=[{"prop_id": prop_id, "value": None}]))
+    monkeypatch.setattr(oi_alignment, "get_indexer",
+                        lambda: SimpleNamespace(get_symbols_data=lambda *a: FRAME))
+    monkeypatch.setattr(oi_alignment, "get_collapsible_signals_accordion",
+                        lambda signal_row, asset: signal_row)
+
+
+def test_a_palette_change_repaints_the_panel_without_a_click(builds, monkeypatch):
+    """The figure recolours in the browser; the HTML panel beside it must follow."""
+    _trigger(monkeypatch, "session_palette_theme_asset_store.data")
+
+    panel, figure = oi_alignment.sync_signal_board_to_crosshair(
+        None, None, "Muted", "26", "Gold", None)
+
+    assert figure is oi_alignment.no_update
+    assert panel is not oi_alignment.no_update
+    assert ("panel", None, oi_alignment._panel_model(None).key) in builds
+
+
+def test_a_palette_change_keeps_the_zoomed_week(builds, monkeypatch):
+    _trigger(monkeypatch, "session_palette_theme_asset_store.data")
+    zoom = {"xEnd": str(FRAME.index[2].date())}
+
+    oi_alignment.sync_signal_board_to_crosshair(None, zoom, "Muted", "26", "Gold", None)
+
+    assert [c[1] for c in builds if c[0] == "panel"] == [FRAME.index[2]]
@@ -16,6 +16,7 @@ deep inside the bullish band.
 """
 import cotmetrics.constants as const
 import cotmetrics.models as models
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -137,6 +138,19 @@ def test_each_model_reads_its_own_verdict_column():
     assert st._verdict_colour(raw, COLORS) is None
 
 
+def test_the_figure_colours_its_heads_by_the_same_rule():
+    df = frame(matrix_row("Orange Juice", "Softs", 96, 0, 100),
+               matrix_row("Canadian Dollar", "FX", 100, 0, 0, state_cls=const.SETUP_BULL),
+               matrix_row("Cocoa", "Softs", 3, 100, 80, state_cls=const.SETUP_NEAR_BEAR))
+    rows, _ = st.build_rows(df, models.RAW_PF)
+    fig = st.build_figure(rows, models.RAW_PF, COLORS, PALETTE)
+
+    heads = [t for t in fig.data if t.type == "scatter" and t.hoverinfo == "text"][0]
+    marks = [st._mark_colour(r, COLORS, PALETTE) for r in rows if r.kind == "market"]
+    assert list(heads.marker.color) == marks
+    assert set(marks) == {COLORS.dim, COLORS.bull, COLORS.bear_near}
+
+
 # ── grouping, ordering and what gets left out ─────────────────────────────────
 
 def test_classes_get_a_header_and_markets_sort_by_crowding_within_them():
@@ -388,6 +402,29 @@ def test_the_two_filters_never_contradict_each_other():
     assert drawn(show=st.SHOW_SETUPS, side=st.SIDE_BEAR) == ["Cocoa"]
 
 
+def test_the_board_is_filtered_as_a_whole_by_the_same_rule_as_one_row():
+    """`keep_mask` is what build_rows filters with; `keeps` is the rule as prose."""
+    columns = st.strip_columns(board(), models.RAW_PF)
+    rows = [r for r in st.build_rows(board(), models.RAW_PF)[0] if r.kind == "market"]
+    by_label = {r.label: r for r in rows}
+    for show in st.SHOW_STATES:
+        for side in (st.SIDE_BOTH, st.SIDE_BULL, st.SIDE_BEAR):
+            mask = st.keep_mask(columns, show, side)
+            assert mask.tolist() == [st.keeps(by_label[label], show, side)
+                                     for label in columns.label]
+
+
+def test_the_gate_mask_agrees_with_the_one_leg_rule():
+    """Including where a number is missing: NaN has to count as None does, not at all."""
+    m = models.RAW_PF
+    cases = [(100, 0, False), (100, 50, False), (0, 100, False), (50, 0, False),
+             (100, 0, True), (100, None, False), (None, 0, False)]
+    comm, leg, equity = (np.array(col, dtype=dtype)
+                         for col, dtype in zip(zip(*cases), (float, float, bool)))
+    assert st.gate_mask(comm, leg, m, equity).tolist() == [
+        st.is_gate_leg(c, v, m, e) for c, v, e in cases]
+
+
 def test_a_class_emptied_by_a_filter_loses_its_header():
     """Otherwise a heading sits over nothing, which reads as a class with no data."""
     rows, _ = st.build_rows(board(), models.RAW_PF, show=st.SHOW_SETUPS,
@@ -0,0 +1,50 @@
+"""What the trace builders send for dates and per-point colours.
+
+A date has no typed-array form, so an evenly spaced series sends its dates as `x0` and
+`dx` (`dated_x`), and per-point bar colours go as an int8 index into a colourscale
+(`coded_marker`). Both only save anything if the browser ends up with the same dates and
+the same colours it got before. Store-free: the frames are synthetic.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+from dash._utils import to_json
+
+from components import plot_traces
+from components.plot_layout import get_make_subplots_for_plots
+
+WEEKLY = pd.date_range("1990-01-02", periods=300, freq="W-TUE")
+
+
+def test_an_even_index_goes_as_a_start_and_a_step():
+    assert plot_traces.dated_x(WEEKLY) == {"x0": "1990-01-02T00:00:00", "dx": 7 * 86400000}
+
+
+def test_an_index_with_a_gap_keeps_its_dates():
+    gapped = WEEKLY.delete(100)
+
+    assert list(plot_traces.dated_x(gapped)) == ["x"]
+
+
+def test_the_dates_read_back_are_the_index():
+    df = pd.DataFrame({"v": np.arange(len(WEEKLY), dtype=float)}, index=WEEKLY)
+    fig = get_make_subplots_for_plots(1, 1, None, [[{"secondary_y": False}]])
+    plot_traces.add_trace_to_all(fig, df, "v", 1, 1, "v", "#abcdef", 0)
+
+    assert fig.data[0].x is None
+    assert (plot_traces.trace_dates(fig.data[0]) == WEEKLY.values).all()
+    sent = json.loads(to_json(fig))["data"][0]
+    assert "x" not in sent and sent["y"]["dtype"] == "f8"
+
+
+def test_every_point_keeps_exactly_its_colour():
+    colors = ["#22c55e", "#bbf7d0", "#ef4444", "#fecaca", "gray"]
+    codes = np.array([4, 0, 1, 2, 3, 3, 0])
+    marker = plot_traces.coded_marker(codes, colors)
+
+    scale = dict((pos, c) for pos, c in marker["colorscale"])
+    span = marker["cmax"] - marker["cmin"]
+    assert [scale[(k - marker["cmin"]) / span] for k in marker["color"]] == \
+        [colors[k] for k in codes]
+    assert marker["color"].dtype == np.int8
@@ -0,0 +1,65 @@
+"""Thinning old history out of line series without changing what the chart shows.
+
+The panels go out with everything before the opening window thinned to each bucket's
+extremes. That is only safe if the thinned line keeps the highs and lows a reader looks
+for, keeps a gap a gap, leaves the window itself untouched, and leaves alone the traces
+whose points are readings rather than a curve. Store-free: the series are synthetic.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from components import plot_traces
+
+INDEX = pd.date_range("2000-01-04", periods=400, freq="W-TUE")
+
+
+def walk(seed=1):
+    return np.random.default_rng(seed).normal(0, 1, len(INDEX)).cumsum()
+
+
+def test_every_buckets_extremes_survive_and_the_window_is_whole():
+    y = walk()
+    keep = plot_traces.lod_indices(y, 300, bucket=8)
+
+    assert (keep[keep >= 296] == np.arange(296, 400)).all()
+    for start in range(0, 296, 8):
+        block = y[start:start + 8]
+        assert start + block.argmin() in keep
+        assert start + block.argmax() in keep
+    assert keep[0] == 0
+    assert len(keep) < 200
+
+
+def test_a_gap_in_the_history_stays_a_gap():
+    y = walk()
+    y[80:96] = np.nan
+    keep = plot_traces.lod_indices(y, 300, bucket=8)
+
+    assert np.isnan(y[keep][(keep >= 80) & (keep < 96)]).all()
+    assert ((keep >= 80) & (keep < 96)).any()
+
+
+def test_only_plain_dated_lines_are_thinned():
+    fig = go.Figure([
+        go.Scattergl(x=INDEX, y=walk(1)),
+        go.Scatter(x=INDEX, y=walk(2), mode="markers"),
+        go.Bar(x=INDEX, y=walk(3)),
+        go.Scatter(x=INDEX, y=walk(4), customdata=np.arange(len(INDEX))),
+        go.Scatter(x=list(range(len(INDEX))), y=walk(5)),
+    ])
+    line = fig.data[0].y.copy()
+
+    thinned = plot_traces.decimate_traces(fig, INDEX[300])
+
+    assert thinned == [0]
+    assert [len(t.x) for t in fig.data[1:]] == [len(INDEX)] * 4
+    assert fig.data[0].y.max() == line.max() and fig.data[0].y.min() == line.min()
+    assert (pd.to_datetime(fig.data[0].x[-100:]) == INDEX[-100:]).all()
+
+
+def test_a_short_history_is_left_whole():
+    fig = go.Figure(go.Scattergl(x=INDEX[:40], y=walk()[:40]))
+
+    assert plot_traces.decimate_traces(fig, INDEX[10]) == []
+    assert len(fig.data[0].x) == 40
@@ -0,0 +1,100 @@
+"""Visitor logging off the request path.
+
+The request only enqueues; the writer resolves and inserts. What has to hold is that
+the rows that land are the rows the old hook wrote, that a visitor is located once
+rather than per request, and that a full queue costs a dropped visit rather than a
+stalled page. The schema comes from CotDatabase against a temporary file, and the
+resolvers are stand-ins, so neither a store nor the network is needed.
+"""
+import sqlite3
+
+import pytest
+from cotmetrics.CotDatabase import CotDatabase
+
+import visit_log
+
+
+@pytest.fixture
+def db(tmp_path):
+    return CotDatabase(db_name=str(tmp_path / "cot.db")).db_name
+
+
+@pytest.fixture
+def lookups():
+    return []
+
+
+@pytest.fixture
+def log(db, lookups, monkeypatch):
+    def online(ip):
+        lookups.append(ip)
+        return ("Paris", "France")
+
+    out = visit_log.VisitLog(db, online_resolver=online)
+    # No writer thread: each test drains the queue itself with flush().
+    monkeypatch.setattr(out, "start", lambda: None)
+    return out
+
+
+def rows(db):
+    with sqlite3.connect(db) as conn:
+        return conn.execute("SELECT ip_address, path, city, country, kind, is_bot "
+                            "FROM visitor_logs ORDER BY id").fetchall()
+
+
+def test_a_batch_lands_as_the_old_rows_and_each_visitor_is_located_once(log, db, lookups):
+    for path in ("/", "/heatmap", "/oi_alignment"):
+        log.enqueue("8.8.8.8", path, "Mozilla")
+    log.enqueue("127.0.0.1", "/", "curl")
+    log.flush()
+
+    assert rows(db) == [("8.8.8.8", "/", "Paris", "France", "landing", 0),
+                        ("8.8.8.8", "/heatmap", "Paris", "France", "landing", 0),
+                        ("8.8.8.8", "/oi_alignment", "Paris", "France", "landing", 0),
+                        ("127.0.0.1", "/", "Internal", "Local", "landing", 0)]
+    assert lookups == ["8.8.8.8"]
+
+
+def test_a_failed_lookup_is_recorded_and_not_retried_per_visit(db):
+    calls = []
+
+    def down(ip):
+        calls.append(ip)
+        raise TimeoutError
+
+    log = visit_log.VisitLog(db, online_resolver=down)
+    assert log.locate("1.1.1.1") == visit_log.LOOKUP_ERROR
+    assert log.locate("1.1.1.1") == visit_log.LOOKUP_ERROR
+    assert calls == ["1.1.1.1"]
+
+
+def test_an_offline_resolver_that_knows_the_address_keeps_it_off_the_network(db, lookups):
+    log = visit_log.VisitLog(db, offline_resolver=lambda ip: ("Lyon", "France"),
+                             online_resolver=lambda ip: lookups.append(ip))
+
+    assert log.locate("9.9.9.9") == ("Lyon", "France")
+    assert lookups == []
+
+
+def test_a_full_queue_drops_the_visit_instead_of_waiting(db, monkeypatch):
+    log = visit_log.VisitLog(db, online_resolver=None, maxsize=2)
+    monkeypatch.setattr(log, "start", lambda: None)
+    for _ in range(5):
+        log.enqueue("10.0.0.1", "/", "Mozilla")
+
+    assert log.stats()["dropped"] == 3
+    log.flush()
+    assert len(rows(db)) == 2
+
+
+def test_a_cached_location_expires():
+    now = [0.0]
+    cache = visit_log.GeoCache(maxsize=2, clock=lambda: now[0])
+    cache.put("a", ("X", "Y"), ttl=10)
+    cache.put("b", ("X", "Y"), ttl=10)
+    cache.get("a")
+    cache.put("c", ("X", "Y"), ttl=10)
+
+    assert cache.get("b") is None          # least recently used, evicted
+    now[0] = 11
+    assert cache.get("a") is None          # expired